@@ -0,0 +1,283 @@
+"""
+Benchmarks for the Valley Teacher Coverage App on large synthetic schedules.
+
+Usage:
+    python benchmark.py loaders --rows 1000 10000 50000
+    python benchmark.py duties --staff 1000 5000 20000
+    python benchmark.py assign --staff 500 2000 10000 --out 40
+    python benchmark.py optimal --staff 200 1000 5000 --out-ratio 0.1
+    python benchmark.py tracker --history 10000 100000 500000
+    python benchmark.py report --history 10000 100000 500000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import coverage_report
+import main
+
+
+def make_schedule_rows(rows):
+    """Yields header + data rows for a synthetic district-sized schedule."""
+    periods = [main.add_ordinal_suffix(p) for p in range(1, 12)]
+    yield ['Name', 'Need Coverage'] + periods + [f'Duty {p}' for p in periods]
+    for i in range(rows):
+        name = f'Teacher{i:06d}, Staff'
+        partner = f'Teacher{(i + 1) % rows:06d}'
+        cells = [f'Class CT {partner}' if (i + p) % 7 == 0 else 'Class' for p in range(1, 12)]
+        duties = [None] * 11
+        duties[i % 11] = name if i % 3 else f'ISS {name}'
+        yield [name, '1,4,5/6,8/9,11'] + cells + duties
+
+
+def write_synthetic_workbook(rows, directory):
+    """Writes a synthetic schedule with openpyxl's write-only mode and returns its path."""
+    from openpyxl import Workbook
+
+    path = os.path.join(directory, f'schedule_{rows}.xlsx')
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for row in make_schedule_rows(rows):
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def measure(func):
+    """
+    Returns (seconds, transient MiB) for one call. Time comes from an untraced
+    run; transient memory is the traced peak minus what the result retains,
+    i.e. the loader's own working set.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, (peak - current) / (1024 * 1024)
+
+
+def bench_loaders(args):
+    """Compares the streaming read-only loader with the whole-sheet pandas loader."""
+    print(f"{'rows':>8} | {'streaming s':>11} {'extra MiB':>9} | {'pandas s':>9} {'extra MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            path = write_synthetic_workbook(rows, directory)
+            results = []
+            for streaming in (True, False):
+                # Ingestion only (read + columnar row parsing); duty matching is benchmarked separately
+                def run():
+                    return [row for chunk in main._iter_schedule_chunks(path, streaming)
+                            for row in main._parse_teacher_rows(chunk)]
+                results.append(measure(run))
+            (stream_s, stream_mb), (pandas_s, pandas_mb) = results
+            print(f"{rows:>8} | {stream_s:>11.2f} {stream_mb:>9.1f} | {pandas_s:>9.2f} {pandas_mb:>9.1f}")
+
+
+def bench_duties(args):
+    """Times duty-name resolution alone as staff size grows; per-teacher cost should stay flat."""
+    print(f"{'staff':>8} | {'seconds':>8} | {'us/teacher':>10}")
+    for staff in args.staff:
+        rows = list(make_schedule_rows(staff))
+        header, data = rows[0], rows[1:]
+        duty_columns = [i for i, column in enumerate(header) if str(column).startswith('Duty ')]
+        duty_grid = {
+            period: [str(row[col]).strip().lower() for row in data if row[col] is not None]
+            for period, col in enumerate(duty_columns, start=1)
+        }
+        teachers = {row[0]: main.Teacher(row[0], []) for row in data}
+        schedule = main.ScheduleModel('synthetic', teachers, {}, duty_grid)
+
+        start = time.perf_counter()
+        main._parse_duties(schedule)
+        elapsed = time.perf_counter() - start
+        print(f"{staff:>8} | {elapsed:>8.3f} | {elapsed / staff * 1e6:>10.1f}")
+
+
+def make_staff(staff, out, seed=0, free=2):
+    """Builds a synthetic staff where `out` teachers need most of their periods covered."""
+    rng = random.Random(seed)
+    periods = [str(p) for p in range(1, 12)]
+    teachers = {}
+    for i in range(staff):
+        teacher = main.Teacher(f'Teacher{i:06d}, Staff', [])
+        # Most of the day is taught; one or two free periods plus the odd duty
+        teacher.periods_available = rng.sample(periods, rng.randint(0, free))
+        teacher.evenDayPeriods_available = rng.sample(periods, rng.randint(0, 1))
+        teacher.oddDayPeriods_available = rng.sample(periods, rng.randint(0, 1))
+        teacher.iss_periods_available = rng.sample(periods, rng.randint(0, 1))
+        teacher.otherDutyPeriods_available = rng.sample(periods, rng.randint(0, 1))
+        teachers[teacher.name] = teacher
+    for name in rng.sample(list(teachers), out):
+        teachers[name].is_out = True
+        teachers[name].periods_need_covered = ['1', '2', '3', '5/6', '7', '8/9', '10', '11']
+    return teachers
+
+
+def bench_assign(args):
+    """Times one coverage run per engine as staff size grows."""
+    print(f"{'staff':>8} | " + " | ".join(f"{engine + ' s':>10}" for engine in main.ASSIGNMENT_ENGINES))
+    for staff in args.staff:
+        timings = []
+        for engine in main.ASSIGNMENT_ENGINES:
+            teachers = make_staff(staff, args.out)
+            # A fresh directory per run: the journal and snapshot of an earlier run would make
+            # this one replay it and undo the same date first
+            with tempfile.TemporaryDirectory() as directory:
+                main.APP_DATA_DIR = main.Path(directory)
+                tracker = os.path.join(directory, 'coverage_tracker.json')
+                start = time.perf_counter()
+                main.determineCoverage_and_save(teachers, '2026-01-05', tracker, True, engine=engine)
+                timings.append(time.perf_counter() - start)
+        print(f"{staff:>8} | " + " | ".join(f"{seconds:>10.3f}" for seconds in timings))
+
+
+def plan_stats(plan):
+    """Returns (filled lines, lines on a duty fallback, sum of squared per-teacher assignments)."""
+    filled = fallback = 0
+    per_teacher = {}
+    for lines in plan.values():
+        for _, _, name, iss_covered, otherDuty_covered in lines:
+            if name:
+                filled += 1
+                fallback += bool(iss_covered or otherDuty_covered)
+                per_teacher[name] = per_teacher.get(name, 0) + 1
+    return filled, fallback, sum(count * count for count in per_teacher.values())
+
+
+def bench_optimal(args):
+    """Compares the greedy plan with the min-cost-flow plan on the same day."""
+    print(f"{'staff':>8} {'out':>5} {'lines':>6} | {'greedy s':>8} {'filled':>6} {'duty':>5} {'sq':>6} | "
+          f"{'optimal s':>9} {'filled':>6} {'duty':>5} {'sq':>6}")
+    for staff in args.staff:
+        out = max(1, int(staff * args.out_ratio))
+        row = []
+        for optimal in (False, True):
+            teachers = make_staff(staff, out, seed=staff, free=args.free)
+            teachers_out = [name for name, teacher in teachers.items() if teacher.is_out]
+            queue = main._LeastUsedQueue((name, 0) for name in teachers if name not in teachers_out)
+            start = time.perf_counter()
+            if optimal:
+                plan = main._assign_optimal(teachers, teachers_out, queue, True)
+            else:
+                free_index = main._FreeTeacherIndex(teachers, [name for name, _ in queue], True)
+                plan = main._assign_greedy(teachers, teachers_out, queue, True, free_index=free_index)
+            row.append((time.perf_counter() - start,) + plan_stats(plan))
+        lines = sum(len(lines) for lines in plan.values())
+        (g_s, g_filled, g_duty, g_sq), (o_s, o_filled, o_duty, o_sq) = row
+        print(f"{staff:>8} {out:>5} {lines:>6} | {g_s:>8.3f} {g_filled:>6} {g_duty:>5} {g_sq:>6} | "
+              f"{o_s:>9.3f} {o_filled:>6} {o_duty:>5} {o_sq:>6}")
+
+
+def bench_tracker(args):
+    """Times loading the day's counts as coverage history grows, per tracker format."""
+    print(f"{'history':>8} | {'legacy json s':>13} {'MiB':>6} | {'journal s':>9} {'MiB':>6} | {'sqlite s':>8} {'MiB':>6}")
+    staff = [f'Teacher{i:04d}, Staff' for i in range(args.staff)]
+    with tempfile.TemporaryDirectory() as directory:
+        for history in args.history:
+            path = os.path.join(directory, f'tracker_{history}.json')
+            legacy = {name: {'times_covered': 0, 'coverage_log': []} for name in staff}
+            tracker = main.CoverageTracker(path).load()
+            tracker.register(staff)
+            for i in range(history):
+                name = staff[i % len(staff)]
+                entry = {'date': f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}', 'covered_for': staff[-1 - i % len(staff)],
+                         'period': str(i % 11 + 1)}
+                legacy[name]['times_covered'] += 1
+                legacy[name]['coverage_log'].append(entry)
+                tracker.record(entry['date'], name, entry['covered_for'], entry['period'])
+            tracker.save()
+            main.SQLiteCoverageTracker(path).load()  # Imports the journal once
+            legacy_path = os.path.join(directory, f'legacy_{history}.json')
+            with open(legacy_path, 'w') as f:
+                json.dump(legacy, f, indent=4)
+
+            def load_legacy():
+                with open(legacy_path) as f:
+                    return {name: data['times_covered'] for name, data in json.load(f).items()}
+
+            row = [measure(load_legacy),
+                   measure(lambda: main.CoverageTracker(path).load().counts),
+                   measure(lambda: main.SQLiteCoverageTracker(path).load().counts)]
+            print(f"{history:>8} | " + " | ".join(
+                f"{seconds:>{width}.3f} {mib:>6.1f}" for (seconds, mib), width in zip(row, (13, 9, 8))))
+
+
+def bench_report(args):
+    """Times loading tracker history into a frame, then computing the analytics tables from it."""
+    print(f"{'history':>8} | {'load s':>7} | {'aggregate s':>11}")
+    staff = [f'Teacher{i:04d}, Staff' for i in range(args.staff)]
+    departments = {name: f'Department {i % 12}' for i, name in enumerate(staff)}
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        for history in args.history:
+            path = os.path.join(directory, f'tracker_{history}.json')
+            tracker = main.CoverageTracker(path).load()
+            tracker.register(staff)
+            for i in range(history):
+                date = f'{2022 + i * 4 // history}-{i % 12 + 1:02d}-{i % 28 + 1:02d}'
+                period = str(i % 11 + 1)
+                if rng.random() < 0.05:
+                    tracker.record_unfilled(date, rng.choice(staff), period)
+                else:
+                    tracker.record(date, rng.choice(staff), rng.choice(staff), period,
+                                   rng.choice(('standard', 'standard', 'standard', 'iss', 'other')))
+            tracker.save()
+
+            start = time.perf_counter()
+            frame = coverage_report.load_history(path)
+            loaded = time.perf_counter() - start
+            start = time.perf_counter()
+            coverage_report.coverage_aggregates(frame, departments)
+            aggregated = time.perf_counter() - start
+            print(f"{history:>8} | {loaded:>7.2f} | {aggregated:>11.3f}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    loaders = subparsers.add_parser('loaders', help='streaming vs pandas schedule loading')
+    loaders.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    loaders.set_defaults(func=bench_loaders)
+
+    duties = subparsers.add_parser('duties', help='duty-name resolution vs staff size')
+    duties.add_argument('--staff', type=int, nargs='+', default=[1000, 5000, 20000])
+    duties.set_defaults(func=bench_duties)
+
+    assign = subparsers.add_parser('assign', help='coverage assignment vs staff size')
+    assign.add_argument('--staff', type=int, nargs='+', default=[500, 2000, 10000])
+    assign.add_argument('--out', type=int, default=40, help='teachers out')
+    assign.set_defaults(func=bench_assign)
+
+    optimal = subparsers.add_parser('optimal', help='greedy vs min-cost-flow plan quality and time')
+    optimal.add_argument('--staff', type=int, nargs='+', default=[200, 1000, 5000])
+    optimal.add_argument('--out-ratio', type=float, default=0.1, help='share of staff out')
+    optimal.add_argument('--free', type=int, default=4, help='most free periods per teacher')
+    optimal.set_defaults(func=bench_optimal)
+
+    tracker = subparsers.add_parser('tracker', help='loading coverage counts vs history length')
+    tracker.add_argument('--history', type=int, nargs='+', default=[10000, 100000, 500000])
+    tracker.add_argument('--staff', type=int, default=200)
+    tracker.set_defaults(func=bench_tracker)
+
+    report = subparsers.add_parser('report', help='coverage analytics vs history length')
+    report.add_argument('--history', type=int, nargs='+', default=[10000, 100000, 500000])
+    report.add_argument('--staff', type=int, default=200)
+    report.set_defaults(func=bench_report)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main_cli()
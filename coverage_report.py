@@ -0,0 +1,181 @@
+"""
+Coverage analytics for the Valley Teacher Coverage App.
+
+Loads the coverage history (live tracker plus archived school years) into
+one frame and writes per-teacher, per-month, per-department and per-period
+totals, "no available teacher" rates and ISS/other-duty fallback rates.
+
+Usage:
+    python coverage_report.py report.xlsx
+    python coverage_report.py report.csv --schedule Coverage_Schedule2.xlsx
+    python coverage_report.py report.xlsx --tracker path/to/coverage_tracker.json --backend sqlite
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+import main
+
+HISTORY_COLUMNS = ['date', 'teacher', 'covered_for', 'period', 'duty', 'filled']
+
+
+def load_history(tracker_path=None, backend=None, include_archive=True):
+    """
+    Loads coverage history into a frame with one row per period that needed
+    cover: date, teacher (missing when unfilled), covered_for, period, duty
+    ('standard', 'iss', 'other', or 'unknown' for covers recorded before the
+    tracker kept it) and filled. Reads the live tracker and, unless
+    include_archive is False, every archived school year.
+    """
+    tracker_path = str(tracker_path or main.APP_DATA_DIR / "coverage_tracker.json")
+    sources = [main.open_coverage_tracker(tracker_path, backend).iter_events()]
+    if include_archive:
+        sources.append(main.CoverageArchive(tracker_path).load().iter_events())
+
+    rows = [
+        (event.get('date'), event.get('teacher'), event.get('covered_for'), event.get('period'),
+         event.get('duty', 'unknown') if event['event'] == 'cover' else None, event['event'] == 'cover')
+        for events in sources for event in events
+        if event.get('event') in ('cover', 'unfilled')
+    ]
+    history = pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+    history['date'] = pd.to_datetime(history['date'], format='%Y-%m-%d', errors='coerce')
+    history['filled'] = history['filled'].astype(bool)
+    # Few distinct values per column, so categories keep the frame small and the group-bys fast
+    for column in ('teacher', 'covered_for', 'period', 'duty'):
+        history[column] = history[column].astype('category')
+    return history
+
+
+def load_departments(schedule_path):
+    """
+    Returns {teacher: department} from a schedule file: its 'Department'
+    column, or else the unlabeled column right after 'Name' that the
+    district template uses for departments.
+    """
+    if schedule_path.endswith('.csv'):
+        schedule_df = pd.read_csv(schedule_path, header=0, skipinitialspace=True)
+    else:
+        schedule_df = pd.read_excel(schedule_path, sheet_name=0)
+    columns = [str(column).strip() for column in schedule_df.columns]
+    schedule_df.columns = columns
+    if 'Name' not in columns:
+        print(f"Warning: No 'Name' column in {schedule_path}. Reporting without departments.")
+        return {}
+
+    department_column = next((column for column in columns if column.lower() == 'department'), None)
+    if department_column is None:
+        following = columns.index('Name') + 1
+        if following < len(columns) and columns[following].startswith('Unnamed'):
+            department_column = columns[following]
+    if department_column is None:
+        print(f"Warning: No department column in {schedule_path}. Reporting without departments.")
+        return {}
+
+    names = main._parse_name_column(schedule_df['Name'])
+    departments = schedule_df.loc[names.index, department_column]
+    known = departments.notna()
+    return dict(zip(names[known], departments[known].astype(str).str.strip()))
+
+
+def _outcome_table(grouped):
+    """Periods needing cover, covered, unfilled and fallback counts and rates per group."""
+    table = grouped.agg(
+        periods=('filled', 'size'),
+        covered=('filled', 'sum'),
+        no_available_teacher=('unfilled', 'sum'),
+        iss_fallback=('iss', 'sum'),
+        other_duty_fallback=('other', 'sum'),
+    )
+    table['no_available_rate'] = table['no_available_teacher'] / table['periods']
+    covered = table['covered'].where(table['covered'] > 0)
+    table['iss_fallback_rate'] = (table['iss_fallback'] / covered).fillna(0.0)
+    table['other_duty_fallback_rate'] = (table['other_duty_fallback'] / covered).fillna(0.0)
+    return table
+
+
+def coverage_aggregates(history, departments=None):
+    """
+    Computes the report tables from a load_history() frame with vectorized
+    group-bys. Returns {table name: DataFrame}; 'by_department' is included
+    when a {teacher: department} mapping is given.
+    """
+    frame = history.assign(
+        month=history['date'].dt.to_period('M'),
+        unfilled=~history['filled'],
+        iss=history['duty'] == 'iss',
+        other=history['duty'] == 'other',
+    )
+    covers = frame[frame['filled']]
+
+    tables = {'summary': _outcome_table(frame.assign(scope='all').groupby('scope'))}
+    tables['by_month'] = _outcome_table(frame.groupby('month'))
+    tables['by_month'].index = tables['by_month'].index.astype(str)
+    by_period = _outcome_table(frame.groupby('period', observed=True))
+    tables['by_period'] = by_period.reindex(main.sort_periods(by_period.index.tolist()))
+    tables['by_absent_teacher'] = _outcome_table(frame.groupby('covered_for', observed=True))
+
+    by_teacher = covers.groupby('teacher', observed=True).agg(
+        covered=('filled', 'size'),
+        iss_fallback=('iss', 'sum'),
+        other_duty_fallback=('other', 'sum'),
+        first_date=('date', 'min'),
+        last_date=('date', 'max'),
+    )
+    tables['by_teacher'] = by_teacher.sort_values('covered', ascending=False, kind='stable')
+    by_teacher_month = covers.groupby(['teacher', 'month'], observed=True).size().unstack(fill_value=0)
+    by_teacher_month.columns = by_teacher_month.columns.astype(str)
+    tables['by_teacher_month'] = by_teacher_month
+
+    if departments:
+        # Periods needing cover by the absent teacher's department, periods covered by the coverer's;
+        # mapping a categorical only looks up its categories
+        absent_department = frame['covered_for'].map(departments).astype(object).fillna('Unknown')
+        by_department = _outcome_table(frame.assign(department=absent_department).groupby('department'))
+        covering_department = covers['teacher'].map(departments).astype(object).fillna('Unknown')
+        covered_by = covering_department.value_counts().rename('covered_by_department')
+        by_department = by_department.join(covered_by, how='outer').fillna(0)
+        counts = [column for column in by_department.columns if not column.endswith('_rate')]
+        tables['by_department'] = by_department.astype({column: int for column in counts})
+    return tables
+
+
+def write_report(tables, path):
+    """
+    Writes the tables as sheets of one workbook when `path` ends in .xlsx,
+    otherwise as one <stem>_<table>.csv file per table. Returns the paths written.
+    """
+    if path.lower().endswith('.xlsx'):
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            for name, table in tables.items():
+                table.to_excel(writer, sheet_name=name)
+        return [path]
+
+    stem = os.path.splitext(path)[0]
+    written = []
+    for name, table in tables.items():
+        table.to_csv(f"{stem}_{name}.csv")
+        written.append(f"{stem}_{name}.csv")
+    return written
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help='report.xlsx, or report.csv for one CSV per table')
+    parser.add_argument('--tracker', help='coverage_tracker.json path (default: the app data directory)')
+    parser.add_argument('--backend', help="tracker backend (default: TRACKER_BACKEND from config.json)")
+    parser.add_argument('--schedule', help='schedule file to read departments from')
+    parser.add_argument('--no-archive', action='store_true', help='leave out archived school years')
+    args = parser.parse_args()
+
+    backend = args.backend or main.load_config().get("TRACKER_BACKEND")
+    history = load_history(args.tracker, backend, include_archive=not args.no_archive)
+    departments = load_departments(args.schedule) if args.schedule else None
+    for path in write_report(coverage_aggregates(history, departments), args.output):
+        print(f"Wrote {path}")
+
+
+if __name__ == '__main__':
+    main_cli()
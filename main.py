@@ -1,12 +1,33 @@
+import atexit
+import bisect
+import collections
+import copy
+import csv
 import dearpygui.dearpygui as dpg
 import datetime
+import hashlib
+import heapq
+import io
+import itertools
 import json
 import os
 import pandas as pd
+import pickle
+import queue
 import re
+import sqlite3
+import stat
 import sys
+import threading
+import time
+import zipfile
 from pathlib import Path
 
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
 # --- CONFIGURATION CONSTANTS ---
 
 # Get proper paths for bundled vs development mode
@@ -26,6 +47,9 @@ def get_app_data_dir():
 # Set config file path to writable location
 APP_DATA_DIR = get_app_data_dir()
 CONFIG_FILENAME = str(APP_DATA_DIR / "config.json")
+SCHEDULE_CACHE_FILENAME = str(APP_DATA_DIR / "schedule_cache.pickle")
+# Bump whenever the cached payload or the Teacher model changes shape
+SCHEDULE_CACHE_VERSION = 3
 # -------------------------------
 
 # --- CONFIGURATION MANAGEMENT FUNCTIONS ---
@@ -34,6 +58,13 @@ def load_config():
     """Loads settings from config.json or returns defaults if not found."""
     default_config = {
         "SCHEDULE_FILE_PATH": None,
+        "ASSIGNMENT_ENGINE": "lists",  # 'lists', 'bitmask' or 'optimal'
+        "TRACKER_BACKEND": "journal",  # 'journal' or 'sqlite'
+        "FAIRNESS_METRIC": "all_time",  # 'all_time', 'rolling', 'term' or 'decay'
+        "FAIRNESS_WINDOW_DAYS": 60,  # School days counted by 'rolling'
+        "TERM_STARTS": [],  # 'YYYY-MM-DD' term start dates for 'term'
+        "FAIRNESS_HALF_LIFE_DAYS": 30,  # Days for a cover to count half under 'decay'
+        "OUTPUT_FORMATS": ["text"],  # coverage_{date} files to write: 'text', 'csv', 'json'
         # Future settings can be added here
     }
     try:
@@ -73,16 +104,463 @@ class Teacher:
         self.oddDayPeriods_available = []
         self.coverage_time_preference = None  # None = Full day, 'AM' = periods 1-4, 'PM' = periods 5-11
 
+class ScheduleModel:
+    """
+    The parsed schedule, built once per file and shared by CT validation and
+    the assignment engine so neither has to go back to the workbook.
+    """
+    def __init__(self, filepath, teachers, period_grid, duty_grid):
+        self.filepath = filepath
+        self.teachers = teachers        # {name: Teacher}, in schedule order
+        self.period_grid = period_grid  # {'1st': [non-null cell strings], ...}
+        self.duty_grid = duty_grid      # {1: [lower-cased duty cell strings], ...}
+        # Lower-cased name -> schedule names, for case-insensitive lookups
+        self.name_index = {}
+        for name in teachers:
+            self.name_index.setdefault(name.lower(), []).append(name)
+        # Co-teacher graph, filled in by _build_ct_graph
+        self.ct_columns = {}    # {'2nd': (primary, fallback)}
+        self.ct_partners = {}   # {(teacher name, CT period): co-teacher name}
+        self.diagnostics = []   # Data problems found while parsing, for the user to fix
+
+    def coteacher_for(self, teacher_name, period):
+        """Returns the co-teacher for a teacher's CT period (e.g. '2' or '5/6'), or None."""
+        coteacher = self.ct_partners.get((teacher_name, period))
+        if coteacher:
+            return coteacher
+        # Search all sub-periods of a split period, in order
+        for check_period in period.split('/'):
+            column = self.ct_columns.get(add_ordinal_suffix(check_period.strip()))
+            if column:
+                primary, fallback = column
+                coteacher = fallback if teacher_name == primary else primary
+                if coteacher:
+                    return coteacher
+        return None
+
+class TeacherSearchIndex:
+    """
+    Finds teachers by name as the user types in the list's search box. One-
+    and two-character queries match word prefixes ("sm", "jo" for "Smith,
+    John") by bisecting a sorted word list; longer queries match anywhere in
+    the name by intersecting trigram postings. Results keep roster order.
+    """
+    def __init__(self, names):
+        self.names = list(names)
+        self._lowered = [name.lower() for name in self.names]
+        self._words = sorted((word, i) for i, name in enumerate(self._lowered) for word in re.findall(r'\w+', name))
+        self._trigrams = {}  # {3-character substring: [name indexes, ascending]}
+        for i, name in enumerate(self._lowered):
+            for start in range(len(name) - 2):
+                postings = self._trigrams.setdefault(name[start:start + 3], [])
+                if not postings or postings[-1] != i:
+                    postings.append(i)
+
+    def search(self, query):
+        """Returns the names matching `query`, or every name for a blank query."""
+        query = query.strip().lower()
+        if not query:
+            return self.names
+        if len(query) < 3:
+            hits = set()
+            for word, i in itertools.islice(self._words, bisect.bisect_left(self._words, (query,)), None):
+                if not word.startswith(query):
+                    break
+                hits.add(i)
+        else:
+            postings = sorted((self._trigrams.get(query[start:start + 3], ()) for start in range(len(query) - 2)), key=len)
+            hits = set(postings[0]).intersection(*postings[1:])
+            # Trigrams can all appear without the whole query appearing
+            hits = {i for i in hits if query in self._lowered[i]}
+        return [self.names[i] for i in sorted(hits)]
+
+
+# Table rows (two teachers each) kept in the teacher list; they are re-pointed at whichever
+# teachers are scrolled into view, so the list holds the same widgets for any roster size
+TEACHER_LIST_POOL_ROWS = 12
+# Fixed row height, so a scroll offset maps straight to a row
+TEACHER_LIST_ROW_HEIGHT = 40
+
+
+def _teacher_list_window(scroll_y, total_rows, pool_rows=TEACHER_LIST_POOL_ROWS, row_height=TEACHER_LIST_ROW_HEIGHT):
+    """
+    Returns (first_row, top_pad, bottom_pad) for the teacher list scrolled to
+    `scroll_y`: the first row the pool shows and the spacer heights above and
+    below it that stand in for the rows not built.
+    """
+    first_row = max(0, min(int(scroll_y // row_height), total_rows - pool_rows))
+    shown = min(pool_rows, total_rows - first_row)
+    return first_row, first_row * row_height, (total_rows - first_row - shown) * row_height
+
+
+# --- GUI SCREENS ---
+# One DearPyGui context and viewport serve every screen. Each screen builds its
+# window, runs frames until one of its callbacks calls finish_screen(), and then
+# deletes what it built; themes are registered once and shared.
+
+_gui_started = False
+_viewport_shown = False
+_screen_finished = False
+
+
+def register_themes():
+    """Registers every theme the screens bind to; called once per context."""
+    # Modern Slate/Navy Theme
+    with dpg.theme(tag="modern_theme"):
+        with dpg.theme_component(dpg.mvAll):
+            # Main background - slate 900
+            dpg.add_theme_color(dpg.mvThemeCol_WindowBg, (15, 23, 42, 255))
+            # Text - slate 100
+            dpg.add_theme_color(dpg.mvThemeCol_Text, (241, 245, 249, 255))
+            # Borders - slate 700
+            dpg.add_theme_color(dpg.mvThemeCol_Border, (51, 65, 85, 255))
+            # Separator - slate 600
+            dpg.add_theme_color(dpg.mvThemeCol_Separator, (71, 85, 105, 255))
+            # Frame background - slate 800
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (30, 41, 59, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBgHovered, (51, 65, 85, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBgActive, (71, 85, 105, 255))
+            # Rounded corners everywhere
+            dpg.add_theme_style(dpg.mvStyleVar_WindowRounding, 12)
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
+            dpg.add_theme_style(dpg.mvStyleVar_ChildRounding, 10)
+            dpg.add_theme_style(dpg.mvStyleVar_GrabRounding, 8)
+            dpg.add_theme_style(dpg.mvStyleVar_PopupRounding, 10)
+            # Better padding
+            dpg.add_theme_style(dpg.mvStyleVar_WindowPadding, 20, 20)
+            dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 12, 8)
+            dpg.add_theme_style(dpg.mvStyleVar_ItemSpacing, 8, 8)
+            dpg.add_theme_style(dpg.mvStyleVar_ItemInnerSpacing, 8, 6)
+
+    # Primary accent button (sky blue)
+    with dpg.theme(tag="primary_btn_theme"):
+        with dpg.theme_component(dpg.mvButton):
+            dpg.add_theme_color(dpg.mvThemeCol_Button, (14, 165, 233, 255))  # Sky 500
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (56, 189, 248, 255))  # Sky 400
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (2, 132, 199, 255))  # Sky 600
+            dpg.add_theme_color(dpg.mvThemeCol_Text, (255, 255, 255, 255))
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
+            dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 12, 10)
+
+    # Secondary button (slate)
+    with dpg.theme(tag="secondary_btn_theme"):
+        with dpg.theme_component(dpg.mvButton):
+            dpg.add_theme_color(dpg.mvThemeCol_Button, (51, 65, 85, 255))  # Slate 700
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (71, 85, 105, 255))  # Slate 600
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (30, 41, 59, 255))  # Slate 800
+            dpg.add_theme_color(dpg.mvThemeCol_Text, (148, 163, 184, 255))  # Slate 400
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
+            dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 10, 8)
+
+    # Time preference button (default state)
+    with dpg.theme(tag="am_pm_theme"):
+        with dpg.theme_component(dpg.mvButton):
+            dpg.add_theme_color(dpg.mvThemeCol_Button, (30, 41, 59, 255))  # Slate 800
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (51, 65, 85, 255))  # Slate 700
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (71, 85, 105, 255))  # Slate 600
+            dpg.add_theme_color(dpg.mvThemeCol_Text, (148, 163, 184, 255))  # Slate 400
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 6)
+            dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 6, 4)
+
+    # Time preference button (selected state - emerald)
+    with dpg.theme(tag="am_pm_selected_theme"):
+        with dpg.theme_component(dpg.mvButton):
+            dpg.add_theme_color(dpg.mvThemeCol_Button, (16, 185, 129, 255))  # Emerald 500
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (52, 211, 153, 255))  # Emerald 400
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (5, 150, 105, 255))  # Emerald 600
+            dpg.add_theme_color(dpg.mvThemeCol_Text, (255, 255, 255, 255))
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 6)
+            dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 6, 4)
+
+    # Card/Child window theme
+    with dpg.theme(tag="card_theme"):
+        with dpg.theme_component(dpg.mvChildWindow):
+            dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (30, 41, 59, 255))  # Slate 800
+            dpg.add_theme_color(dpg.mvThemeCol_Border, (51, 65, 85, 255))  # Slate 700
+            dpg.add_theme_style(dpg.mvStyleVar_ChildRounding, 12)
+            dpg.add_theme_style(dpg.mvStyleVar_WindowPadding, 12, 12)
+
+    # Checkbox theme
+    with dpg.theme(tag="checkbox_theme"):
+        with dpg.theme_component(dpg.mvCheckbox):
+            dpg.add_theme_color(dpg.mvThemeCol_CheckMark, (14, 165, 233, 255))  # Sky 500
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (51, 65, 85, 255))  # Slate 700
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBgHovered, (71, 85, 105, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBgActive, (14, 165, 233, 255))
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 4)
+
+    # Radio button theme
+    with dpg.theme(tag="radio_theme"):
+        with dpg.theme_component(dpg.mvRadioButton):
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (51, 65, 85, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBgHovered, (71, 85, 105, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBgActive, (14, 165, 233, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_CheckMark, (14, 165, 233, 255))
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 10)
+
+    # Input text theme
+    with dpg.theme(tag="input_theme"):
+        with dpg.theme_component(dpg.mvInputText):
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (30, 41, 59, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBgHovered, (51, 65, 85, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBgActive, (51, 65, 85, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_Text, (241, 245, 249, 255))
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
+            dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 10, 8)
+
+    # Modern theme for results window
+    with dpg.theme(tag="results_modern_theme"):
+        with dpg.theme_component(dpg.mvAll):
+            dpg.add_theme_color(dpg.mvThemeCol_WindowBg, (15, 23, 42, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_Text, (241, 245, 249, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (30, 41, 59, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_Button, (14, 165, 233, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (56, 189, 248, 255))
+            dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (2, 132, 199, 255))
+            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
+            dpg.add_theme_style(dpg.mvStyleVar_WindowRounding, 12)
+            dpg.add_theme_style(dpg.mvStyleVar_WindowPadding, 20, 20)
+
+
+def start_gui():
+    """Creates the shared context, themes and viewport the first time a screen needs them."""
+    global _gui_started, _viewport_shown
+    if _gui_started:
+        return
+    dpg.create_context()
+    register_themes()
+    dpg.create_viewport(title='Teacher Coverage', width=800, height=800)
+    dpg.setup_dearpygui()
+    _gui_started, _viewport_shown = True, False
+
+
+def stop_gui():
+    """Destroys the shared context; the next screen starts a new one."""
+    global _gui_started
+    if _gui_started:
+        dpg.destroy_context()
+        _gui_started = False
+
+
+def gui_closed():
+    """True once the user has closed the viewport (or Exit stopped it)."""
+    return _gui_started and not dpg.is_dearpygui_running()
+
+
+def begin_screen():
+    """Starts the GUI if needed and returns the items that exist before the screen builds its own."""
+    start_gui()
+    return set(dpg.get_all_items())
+
+
+def finish_screen():
+    """Ends the screen being shown and hands control back to main(), leaving the viewport up."""
+    global _screen_finished
+    _screen_finished = True
+
+
+def run_screen(window, title, width, height, items_before, font_scale=2.0):
+    """
+    Shows `window` as the viewport's only window and renders frames until
+    finish_screen() is called or the viewport is closed, then deletes every
+    item built since `items_before` (from begin_screen). Returns True when the
+    screen finished, False when the user closed the app.
+    """
+    global _screen_finished, _viewport_shown
+    _screen_finished = False
+    dpg.set_viewport_title(title)
+    dpg.set_viewport_width(width)
+    dpg.set_viewport_height(height)
+    dpg.set_global_font_scale(font_scale)
+    dpg.set_primary_window(window, True)
+    if not _viewport_shown:
+        dpg.show_viewport()
+        _viewport_shown = True
+    while dpg.is_dearpygui_running() and not _screen_finished:
+        dpg.render_dearpygui_frame()
+    # Deleting a parent takes its children with it, so skip items already gone
+    for item in dpg.get_all_items():
+        if item not in items_before and dpg.does_item_exist(item):
+            dpg.delete_item(item)
+    return _screen_finished
+
+
 class TeacherCoverageApp:
-    def __init__(self, schedule_filepath):
+    def __init__(self, schedule_filepath, writer=None):
         self.date = ""
+        # BackgroundWriter still writing earlier runs' coverage files, if any; undo drops the date's
+        self.writer = writer
         # The schedule_filepath is an absolute path passed from main()
         self.schedule_filepath = schedule_filepath 
-        self.teacherObjects, self.critical_error_message = parseSchedule(schedule_filepath) 
+        # Filled in by load_schedule() once the background parse finishes
+        self.schedule_model = None
+        self.critical_error_message = None
+        self.teacherObjects = {}
+        self.parse_progress = ScheduleParseProgress()
+        self._parse_result = None    # (ScheduleModel or None, error) from the parse thread
         self.evenDay = False
-        self.file_changed = False
+        # Selections live here rather than in per-teacher DPG values, since list rows come and go
+        self.selected_teachers = set()  # Teachers marked out; kept in step with each checkbox click
+        self.time_preferences = {}   # {name: 'AM' or 'PM'}; absent means full day
+        self.visible_names = []      # Teachers matching the search, in roster order
+        self._search_index = None    # Built on first search
+        self._slot_names = []        # Teacher shown in each pool slot, or None
+        self._first_row = None       # First list row the pool shows
+        self.previewer = None        # CoveragePreviewer, started once the schedule is loaded
+        self._preview_result = None  # (plan, error) posted by the preview worker for the next frame
+
+    def start_parsing(self):
+        """Parses the schedule on a worker thread; load_schedule() picks up the result."""
+        filepath, progress = self.schedule_filepath, self.parse_progress
+
+        def parse():
+            try:
+                result = parseScheduleModel(filepath, progress=progress)
+            except Exception as e:
+                # parseScheduleModel only catches read errors; anything later must still reach the error screen
+                result = None, f"Failed to read the schedule file. Details: {type(e).__name__}: {e}"
+            # A parse of a file the user has since switched away from is dropped
+            if progress is self.parse_progress:
+                self._parse_result = result
+        threading.Thread(target=parse, name="schedule-parse", daemon=True).start()
+
+    def change_schedule(self, schedule_filepath):
+        """Switches to another schedule file in place: clears the selections and parses the new file."""
+        if self.previewer is not None:
+            self.previewer.close()
+            self.previewer = None
+        self.schedule_filepath = schedule_filepath
+        self.schedule_model = None
+        self.teacherObjects = {}
+        self.parse_progress = ScheduleParseProgress()
+        self._parse_result = None
+        self.selected_teachers.clear()
+        self.time_preferences.clear()
+        self.visible_names = []
+        self._search_index = None
+
+        dpg.set_value("file_status", os.path.basename(schedule_filepath))
+        dpg.set_value("teacher_search", "")
+        dpg.configure_item("teacher_search", enabled=False)
+        dpg.set_value("teacher_match_text", "")
+        dpg.set_value("schedule_progress_text", self.parse_progress.describe())
+        dpg.show_item("schedule_loading")
+        dpg.set_value("preview_text", "")
+        dpg.set_value("preview_status", "Select the teachers who are out to see a preview.")
+        self.sync_teacher_list(scroll_y=0, force=True)
+        self.update_selected_count()
+        self.start_parsing()
+
+    def load_schedule(self):
+        """
+        Uses the parsed schedule if the worker has finished. Also the place to report
+        errors: it stops the GUI so main() can show them with display_fatal_error_gui.
+        Returns True once the schedule is loaded.
+        """
+        if self.schedule_model is not None:
+            return True
+        if self._parse_result is None:
+            return False
+        self.schedule_model, self.critical_error_message = self._parse_result
+        if self.critical_error_message:
+            self.schedule_model = None
+            return False
+        self.teacherObjects = self.schedule_model.teachers
+        for message in self.schedule_model.diagnostics:
+            print(f"Warning: {message}")
+        self.visible_names = list(self.teacherObjects)
+        return True
+
+    def poll_schedule_parse(self, sender=None, app_data=None, user_data=None):
+        """Runs every frame until the schedule is loaded: shows progress, then fills in the teacher list."""
+        if self.schedule_model is not None:
+            return
+        if not self.load_schedule():
+            if self.critical_error_message:
+                finish_screen()
+            else:
+                dpg.set_value("schedule_progress_text", self.parse_progress.describe())
+            return
+        dpg.hide_item("schedule_loading")
+        dpg.configure_item("teacher_search", enabled=True)
+        self.sync_teacher_list(scroll_y=0, force=True)
+        self.start_preview()
+
+    def start_preview(self):
+        """Starts the live preview worker with the same settings main() submits with."""
+        config = load_config()
+        coverage_file = str(APP_DATA_DIR / "coverage_tracker.json")
+        fairness_options = {
+            'window_days': config.get("FAIRNESS_WINDOW_DAYS"),
+            'term_starts': config.get("TERM_STARTS"),
+            'half_life_days': config.get("FAIRNESS_HALF_LIFE_DAYS"),
+        }
+
+        def compute(request, cancelled):
+            if request is None:
+                return None
+            date, selected, time_preferences, evenDay = request
+            return preview_coverage(
+                self.schedule_model, date, selected, time_preferences, evenDay, coverage_file,
+                engine=config.get("ASSIGNMENT_ENGINE"), tracker_backend=config.get("TRACKER_BACKEND"),
+                fairness_metric=config.get("FAIRNESS_METRIC"), fairness_options=fairness_options,
+                cancelled=cancelled
+            )
+
+        def post(request, plan, error):
+            # Shown by poll_preview on the next frame
+            self._preview_result = (plan, error)
+
+        self.previewer = CoveragePreviewer(compute, post)
+        self.request_preview()
+
+    def request_preview(self, sender=None, app_data=None, user_data=None):
+        """Called on every change that affects the plan; the previewer debounces and drops stale runs."""
+        if self.previewer is None:
+            return
+        date_string = dpg.get_value("date_input")
+        try:
+            datetime.date.fromisoformat(date_string)
+        except ValueError:
+            date_string = None
+        if date_string is None or not self.selected_teachers:
+            # Planned as "nothing", so the old plan is cleared and a run under way for it dropped
+            self.previewer.request(None)
+            hint = "Enter a valid date (YYYY-MM-DD) to see a preview." if date_string is None \
+                else "Select the teachers who are out to see a preview."
+            dpg.set_value("preview_status", hint)
+            return
+        dpg.set_value("preview_status", "Updating preview...")
+        self.previewer.request((
+            date_string,
+            frozenset(self.selected_teachers),
+            dict(self.time_preferences),
+            dpg.get_value("day_type_radio") == "Even Day",
+        ))
+
+    def poll_preview(self, sender=None, app_data=None, user_data=None):
+        """Runs every frame: shows the preview worker's latest plan once it arrives."""
+        result, self._preview_result = self._preview_result, None
+        if result is None:
+            return
+        plan, error = result
+        if error:
+            dpg.set_value("preview_status", f"Preview failed: {error}")
+        elif plan is None:
+            dpg.set_value("preview_text", "")
+        else:
+            dpg.set_value("preview_text", render_coverage_text(plan))
+            unfilled = len(plan.unfilled())
+            dpg.set_value("preview_status", "Not saved until Submit." +
+                          (f" {unfilled} period{'s' if unfilled != 1 else ''} without a teacher." if unfilled else ""))
 
     def validate_and_proceed(self):
+        if self.schedule_model is None:
+            with dpg.window(label="Please Wait", modal=True, no_resize=True, no_close=True) as popup_window:
+                dpg.add_text("The schedule is still loading.")
+                dpg.add_button(label="Ok", callback=lambda: dpg.delete_item(popup_window))
+            return
+
         date_string = dpg.get_value("date_input")
         
         # 1. Check Date Format
@@ -96,12 +574,7 @@ class TeacherCoverageApp:
             return # Stop execution if date is invalid
 
         # 2. Check if at least one teacher is selected
-        selected_teachers_count = 0
-        for name in self.teacherObjects.keys():
-            if dpg.get_value(f"teacher_{name}"):
-                selected_teachers_count += 1
-        
-        if selected_teachers_count == 0:
+        if not self.selected_teachers:
             with dpg.window(label="Warning", modal=True, no_resize=True, no_close=True) as popup_window:
                 dpg.add_text("Please select at least one teacher who is out.")
                 dpg.add_button(label="Ok", callback=lambda: dpg.delete_item(popup_window))
@@ -110,66 +583,142 @@ class TeacherCoverageApp:
         # If validation passes, proceed to calculation
         self.receiveValues_and_stop()
 
+    def undo_date_run(self):
+        """Removes the coverage already recorded for the entered date from the tracker."""
+        date_string = dpg.get_value("date_input")
+        try:
+            datetime.date.fromisoformat(date_string)
+        except ValueError:
+            with dpg.window(label="Error", modal=True, no_resize=True, no_close=True) as popup_window:
+                dpg.add_text("Invalid date format. Please use YYYY-MM-DD.")
+                dpg.add_button(label="Ok", callback=lambda: dpg.delete_item(popup_window))
+            return
+
+        coverage_file = str(APP_DATA_DIR / "coverage_tracker.json")
+        try:
+            removed = undo_coverage_run(date_string, coverage_file, load_config().get("TRACKER_BACKEND"),
+                                        writer=self.writer)
+            message = f"Removed {removed} coverage entries for {date_string}." if removed \
+                else f"No coverage is recorded for {date_string}."
+        except TimeoutError as e:
+            message = str(e)
+        with dpg.window(label="Undo Coverage", modal=True, no_resize=True, no_close=True) as popup_window:
+            dpg.add_text(message)
+            dpg.add_button(label="Ok", callback=lambda: dpg.delete_item(popup_window))
+        # The counts the preview ranks by have changed
+        self.request_preview()
+
     def receiveValues_and_stop(self):
-        for name in self.teacherObjects.keys():
-            self.teacherObjects[name].is_out = dpg.get_value(f"teacher_{name}")
-            # Get time preference and convert string "None" to Python None
-            time_pref = dpg.get_value(f"teacher_time_pref_{name}")
-            self.teacherObjects[name].coverage_time_preference = None if time_pref == "None" else time_pref
+        # Teachers start out present with no preference, so only the selected ones need setting
+        for name in self.selected_teachers:
+            self.teacherObjects[name].is_out = True
+            # No entry means full day (None)
+            self.teacherObjects[name].coverage_time_preference = self.time_preferences.get(name)
         self.evenDay = dpg.get_value("day_type_radio") == "Even Day"
-        dpg.stop_dearpygui() # Stops DPG loop and returns control to main to run logic
+        if self.previewer is not None:
+            self.previewer.close()
+        finish_screen() # Returns control to main to run logic
 
     def clear_all_teachers(self):
         """Resets all teacher checkboxes to False and time preferences to None."""
-        for name in self.teacherObjects.keys():
-            dpg.set_value(f"teacher_{name}", False)
-            dpg.set_value(f"teacher_time_pref_{name}", "None")
+        self.selected_teachers.clear()
+        self.time_preferences.clear()
+        self.refresh_teacher_slots()
+        self.update_selected_count()
+        self.request_preview()
+
+    def toggle_teacher(self, sender, app_data, user_data):
+        """
+        Checkbox callback. `user_data` is (teacher, time preference button) for
+        the checkbox's slot, so only that teacher and that button are touched.
+        """
+        teacher_name, button = user_data
+        if app_data:
+            self.selected_teachers.add(teacher_name)
+        else:
+            self.selected_teachers.discard(teacher_name)
+        dpg.configure_item(button, show=app_data)
         self.update_selected_count()
+        self.request_preview()
 
     def toggle_time_preference(self, sender, app_data, user_data):
         """Cycles through time preference states: None -> AM -> PM -> None"""
         teacher_name = user_data
-        current_pref = dpg.get_value(f"teacher_time_pref_{teacher_name}")
+        current_pref = self.time_preferences.get(teacher_name)
         
         # Cycle: None -> AM -> PM -> None
-        if current_pref == "None":
-            new_pref = "AM"
+        if current_pref is None:
+            self.time_preferences[teacher_name] = "AM"
         elif current_pref == "AM":
-            new_pref = "PM"
+            self.time_preferences[teacher_name] = "PM"
         else:
-            new_pref = "None"
+            del self.time_preferences[teacher_name]
         
-        dpg.set_value(f"teacher_time_pref_{teacher_name}", new_pref)
-        self.update_time_pref_button_appearance(teacher_name)
+        self.update_time_pref_button_appearance(sender, teacher_name)
+        self.request_preview()
 
-    def update_time_pref_button_appearance(self, teacher_name):
-        """Updates the button appearance based on current time preference"""
-        current_pref = dpg.get_value(f"teacher_time_pref_{teacher_name}")
+    def update_time_pref_button_appearance(self, button, teacher_name):
+        """Updates a slot's button appearance based on the teacher's time preference"""
+        current_pref = self.time_preferences.get(teacher_name)
         
-        if current_pref == "None":
-            dpg.configure_item(f"time_pref_btn_{teacher_name}", label="Full")
-            dpg.bind_item_theme(f"time_pref_btn_{teacher_name}", "am_pm_theme")
-        elif current_pref == "AM":
-            dpg.configure_item(f"time_pref_btn_{teacher_name}", label="AM")
-            dpg.bind_item_theme(f"time_pref_btn_{teacher_name}", "am_pm_selected_theme")
-        else:  # PM
-            dpg.configure_item(f"time_pref_btn_{teacher_name}", label="PM")
-            dpg.bind_item_theme(f"time_pref_btn_{teacher_name}", "am_pm_selected_theme")
+        if current_pref is None:
+            dpg.configure_item(button, label="Full")
+            dpg.bind_item_theme(button, "am_pm_theme")
+        else:  # AM or PM
+            dpg.configure_item(button, label=current_pref)
+            dpg.bind_item_theme(button, "am_pm_selected_theme")
 
     def update_selected_count(self, sender=None, app_data=None, user_data=None):
-        """Updates the live selected teacher count label and button visibility."""
-        # Update count
-        count = sum(1 for name in self.teacherObjects.keys() if dpg.get_value(f"teacher_{name}"))
+        """Updates the live selected teacher count label."""
+        count = len(self.selected_teachers)
         label = f"{count} teacher{'s' if count != 1 else ''} selected"
         dpg.set_value("selected_count_text", label)
-        
-        # Update button visibility based on checkbox state
-        for name in self.teacherObjects.keys():
-            is_checked = dpg.get_value(f"teacher_{name}")
-            if is_checked:
-                dpg.show_item(f"time_pref_btn_{name}")
-            else:
-                dpg.hide_item(f"time_pref_btn_{name}")
+
+    def filter_teachers(self, sender, app_data, user_data=None):
+        """Search box callback: shows only teachers matching the typed text, from the top."""
+        if self._search_index is None:
+            self._search_index = TeacherSearchIndex(self.teacherObjects)
+        self.visible_names = self._search_index.search(app_data)
+        total = len(self.teacherObjects)
+        dpg.set_value("teacher_match_text", "" if len(self.visible_names) == total
+                      else f"{len(self.visible_names)} of {total} shown")
+        dpg.set_y_scroll("teacher_list", 0)
+        self.sync_teacher_list(scroll_y=0, force=True)
+
+    def sync_teacher_list(self, sender=None, app_data=None, user_data=None, scroll_y=None, force=False):
+        """
+        Runs every frame: when the list has scrolled to a new row, re-points
+        the pooled rows at the teachers now in view.
+        """
+        if scroll_y is None:
+            scroll_y = dpg.get_y_scroll("teacher_list")
+        total_rows = (len(self.visible_names) + 1) // 2
+        first_row, top_pad, bottom_pad = _teacher_list_window(scroll_y, total_rows)
+        if first_row == self._first_row and not force:
+            return
+        self._first_row = first_row
+        dpg.configure_item("teacher_list_top_pad", height=max(top_pad, 1))
+        dpg.configure_item("teacher_list_bottom_pad", height=max(bottom_pad, 1))
+        start = first_row * 2
+        self._slot_names = [
+            self.visible_names[start + slot] if start + slot < len(self.visible_names) else None
+            for slot in range(TEACHER_LIST_POOL_ROWS * 2)
+        ]
+        self.refresh_teacher_slots()
+
+    def refresh_teacher_slots(self):
+        """Shows each pooled slot's teacher, checkbox state and time preference."""
+        for slot, name in enumerate(self._slot_names):
+            checkbox, button = f"teacher_slot_{slot}", f"time_pref_btn_{slot}"
+            if name is None:
+                dpg.configure_item(checkbox, show=False)
+                dpg.configure_item(button, show=False)
+                continue
+            is_out = name in self.selected_teachers
+            dpg.configure_item(checkbox, label=name, user_data=(name, button), show=True)
+            dpg.set_value(checkbox, is_out)
+            dpg.configure_item(button, user_data=name, show=is_out)
+            self.update_time_pref_button_appearance(button, name)
             
     # --- MODIFIED: ADDED BUTTON CALLBACK TO RE-OPEN FILE DIALOG ---
     def open_file_dialog(self):
@@ -177,235 +726,134 @@ class TeacherCoverageApp:
         dpg.show_item("file_dialog_tag")
 
     def create_gui(self):
-        dpg.create_context()
-        
-        # Set Global Font Scale to 2.0 (Twice the size)
-        dpg.set_global_font_scale(2.0)
-
-        # Modern Slate/Navy Theme
-        with dpg.theme(tag="modern_theme"):
-            with dpg.theme_component(dpg.mvAll):
-                # Main background - slate 900
-                dpg.add_theme_color(dpg.mvThemeCol_WindowBg, (15, 23, 42, 255))
-                # Text - slate 100
-                dpg.add_theme_color(dpg.mvThemeCol_Text, (241, 245, 249, 255))
-                # Borders - slate 700
-                dpg.add_theme_color(dpg.mvThemeCol_Border, (51, 65, 85, 255))
-                # Separator - slate 600
-                dpg.add_theme_color(dpg.mvThemeCol_Separator, (71, 85, 105, 255))
-                # Frame background - slate 800
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (30, 41, 59, 255))
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBgHovered, (51, 65, 85, 255))
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBgActive, (71, 85, 105, 255))
-                # Rounded corners everywhere
-                dpg.add_theme_style(dpg.mvStyleVar_WindowRounding, 12)
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
-                dpg.add_theme_style(dpg.mvStyleVar_ChildRounding, 10)
-                dpg.add_theme_style(dpg.mvStyleVar_GrabRounding, 8)
-                dpg.add_theme_style(dpg.mvStyleVar_PopupRounding, 10)
-                # Better padding
-                dpg.add_theme_style(dpg.mvStyleVar_WindowPadding, 20, 20)
-                dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 12, 8)
-                dpg.add_theme_style(dpg.mvStyleVar_ItemSpacing, 8, 8)
-                dpg.add_theme_style(dpg.mvStyleVar_ItemInnerSpacing, 8, 6)
-
-        # Primary accent button (sky blue)
-        with dpg.theme(tag="primary_btn_theme"):
-            with dpg.theme_component(dpg.mvButton):
-                dpg.add_theme_color(dpg.mvThemeCol_Button, (14, 165, 233, 255))  # Sky 500
-                dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (56, 189, 248, 255))  # Sky 400
-                dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (2, 132, 199, 255))  # Sky 600
-                dpg.add_theme_color(dpg.mvThemeCol_Text, (255, 255, 255, 255))
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
-                dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 12, 10)
-
-        # Secondary button (slate)
-        with dpg.theme(tag="secondary_btn_theme"):
-            with dpg.theme_component(dpg.mvButton):
-                dpg.add_theme_color(dpg.mvThemeCol_Button, (51, 65, 85, 255))  # Slate 700
-                dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (71, 85, 105, 255))  # Slate 600
-                dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (30, 41, 59, 255))  # Slate 800
-                dpg.add_theme_color(dpg.mvThemeCol_Text, (148, 163, 184, 255))  # Slate 400
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
-                dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 10, 8)
-
-        # Time preference button (default state)
-        with dpg.theme(tag="am_pm_theme"):
-            with dpg.theme_component(dpg.mvButton):
-                dpg.add_theme_color(dpg.mvThemeCol_Button, (30, 41, 59, 255))  # Slate 800
-                dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (51, 65, 85, 255))  # Slate 700
-                dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (71, 85, 105, 255))  # Slate 600
-                dpg.add_theme_color(dpg.mvThemeCol_Text, (148, 163, 184, 255))  # Slate 400
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 6)
-                dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 6, 4)
-
-        # Time preference button (selected state - emerald)
-        with dpg.theme(tag="am_pm_selected_theme"):
-            with dpg.theme_component(dpg.mvButton):
-                dpg.add_theme_color(dpg.mvThemeCol_Button, (16, 185, 129, 255))  # Emerald 500
-                dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (52, 211, 153, 255))  # Emerald 400
-                dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (5, 150, 105, 255))  # Emerald 600
-                dpg.add_theme_color(dpg.mvThemeCol_Text, (255, 255, 255, 255))
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 6)
-                dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 6, 4)
-
-        # Card/Child window theme
-        with dpg.theme(tag="card_theme"):
-            with dpg.theme_component(dpg.mvChildWindow):
-                dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (30, 41, 59, 255))  # Slate 800
-                dpg.add_theme_color(dpg.mvThemeCol_Border, (51, 65, 85, 255))  # Slate 700
-                dpg.add_theme_style(dpg.mvStyleVar_ChildRounding, 12)
-                dpg.add_theme_style(dpg.mvStyleVar_WindowPadding, 12, 12)
-
-        # Checkbox theme
-        with dpg.theme(tag="checkbox_theme"):
-            with dpg.theme_component(dpg.mvCheckbox):
-                dpg.add_theme_color(dpg.mvThemeCol_CheckMark, (14, 165, 233, 255))  # Sky 500
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (51, 65, 85, 255))  # Slate 700
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBgHovered, (71, 85, 105, 255))
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBgActive, (14, 165, 233, 255))
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 4)
-
-        # Radio button theme
-        with dpg.theme(tag="radio_theme"):
-            with dpg.theme_component(dpg.mvRadioButton):
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (51, 65, 85, 255))
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBgHovered, (71, 85, 105, 255))
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBgActive, (14, 165, 233, 255))
-                dpg.add_theme_color(dpg.mvThemeCol_CheckMark, (14, 165, 233, 255))
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 10)
-
-        # Input text theme
-        with dpg.theme(tag="input_theme"):
-            with dpg.theme_component(dpg.mvInputText):
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (30, 41, 59, 255))
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBgHovered, (51, 65, 85, 255))
-                dpg.add_theme_color(dpg.mvThemeCol_FrameBgActive, (51, 65, 85, 255))
-                dpg.add_theme_color(dpg.mvThemeCol_Text, (241, 245, 249, 255))
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
-                dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 10, 8)
+        # The window opens while the schedule is parsed; the teacher list fills in when it's done
+        self.start_parsing()
+        items_before = begin_screen()
 
         with dpg.value_registry():
             dpg.add_string_value(default_value=str(datetime.date.today()), tag="date_input")
             dpg.add_string_value(default_value="Even Day", tag="day_type_radio")
-            # Initialize bool sources for each teacher's checkbox state
-            for name in self.teacherObjects.keys():
-                dpg.add_bool_value(default_value=False, tag=f"teacher_{name}")
-            # Initialize string values for each teacher's time preference (None, 'AM', 'PM')
-            for name in self.teacherObjects.keys():
-                dpg.add_string_value(default_value="None", tag=f"teacher_time_pref_{name}")
-
-        dpg.create_viewport(title='Teacher Coverage', width=800, height=800)
-        
-        with dpg.window(tag="main_window", label="main_window", no_move=True, no_resize=True, no_title_bar=True, pos=(0, 0), width=800, height=800):
-            with dpg.group(tag="main_group", horizontal=False):
-                # Modern header with accent color
-                with dpg.group(horizontal=True):
-                    dpg.add_text("Valley Teacher Coverage", tag="title_text", color=(56, 189, 248, 255))
-                dpg.add_spacer(height=5)
-                dpg.add_separator()
-                dpg.add_spacer(height=10)
-
-                # Schedule file info card (non-scrolling)
-                with dpg.group() as file_card:
+
+        with dpg.window(tag="main_window", label="main_window", no_move=True, no_resize=True, no_title_bar=True, pos=(0, 0), width=1300, height=800):
+            with dpg.group(horizontal=True):
+                with dpg.group(tag="main_group", horizontal=False, width=760):
+                    # Modern header with accent color
+                    with dpg.group(horizontal=True):
+                        dpg.add_text("Valley Teacher Coverage", tag="title_text", color=(56, 189, 248, 255))
+                    dpg.add_spacer(height=5)
+                    dpg.add_separator()
+                    dpg.add_spacer(height=10)
+
+                    # Schedule file info card (non-scrolling)
+                    with dpg.group() as file_card:
+                        with dpg.group(horizontal=True):
+                            dpg.add_text("Schedule:", color=(148, 163, 184, 255))
+                            dpg.add_spacer(width=5)
+                            dpg.add_text(f"{os.path.basename(self.schedule_filepath)}", tag="file_status")
+                        dpg.add_spacer(height=5)
+                        change_btn = dpg.add_button(label="Change Schedule File", callback=self.open_file_dialog)
+                        dpg.bind_item_theme(change_btn, "secondary_btn_theme")
+                    dpg.bind_item_theme(file_card, "card_theme")
+                    dpg.add_spacer(height=15)
+
+                    # Teachers Out section header
+                    with dpg.group(horizontal=True):
+                        dpg.add_text("Teachers Out", color=(241, 245, 249, 255))
+                        dpg.add_spacer(width=10)
+                        dpg.add_text("0 teachers selected", tag="selected_count_text", color=(148, 163, 184, 255))
+                    dpg.add_spacer(height=8)
+
+                    with dpg.group(tag="schedule_loading", horizontal=True):
+                        dpg.add_loading_indicator(style=1, radius=1.5, color=(56, 189, 248, 255))
+                        dpg.add_text(self.parse_progress.describe(), tag="schedule_progress_text",
+                                     color=(148, 163, 184, 255))
+
+                    search_input = dpg.add_input_text(tag="teacher_search", hint="Search teachers",
+                                                      callback=self.filter_teachers, width=-1, enabled=False)
+                    dpg.bind_item_theme(search_input, "input_theme")
+                    dpg.add_text("", tag="teacher_match_text", color=(100, 116, 139, 255))
+
+                    # Scrollable teacher list in card container. Only a fixed pool of rows is built;
+                    # spacers stand in for the rows above and below it so the scrollbar covers the whole roster
+                    with dpg.child_window(tag="teacher_list", height=320, border=True) as teacher_card:
+                        dpg.add_spacer(tag="teacher_list_top_pad", height=1)
+                        with dpg.table(header_row=False, resizable=True, policy=dpg.mvTable_SizingStretchProp, borders_outerV=False, borders_innerV=False, borders_outerH=False, borders_innerH=True):
+                            dpg.add_table_column()
+                            dpg.add_table_column()
+
+                            for row in range(TEACHER_LIST_POOL_ROWS):
+                                with dpg.table_row(height=TEACHER_LIST_ROW_HEIGHT):
+                                    for slot in (row * 2, row * 2 + 1):
+                                        with dpg.table_cell():
+                                            with dpg.group(horizontal=True, horizontal_spacing=8):
+                                                cb = dpg.add_checkbox(
+                                                    tag=f"teacher_slot_{slot}",
+                                                    callback=self.toggle_teacher,
+                                                    show=False
+                                                )
+                                                dpg.bind_item_theme(cb, "checkbox_theme")
+                                                dpg.add_spacer(width=4)
+                                                time_btn = dpg.add_button(
+                                                    label="Full",
+                                                    tag=f"time_pref_btn_{slot}",
+                                                    callback=self.toggle_time_preference,
+                                                    width=65,
+                                                    height=26,
+                                                    show=False
+                                                )
+                                                dpg.bind_item_theme(time_btn, "am_pm_theme")
+                        dpg.add_spacer(tag="teacher_list_bottom_pad", height=1)
+                    dpg.bind_item_theme(teacher_card, "card_theme")
+                    # Re-points the pooled rows whenever the list scrolls. Child windows take no visible
+                    # handler, so it rides on the count label, which is on screen every frame
+                    with dpg.item_handler_registry() as teacher_list_handlers:
+                        dpg.add_item_visible_handler(callback=self.poll_schedule_parse)
+                        dpg.add_item_visible_handler(callback=self.sync_teacher_list)
+                        dpg.add_item_visible_handler(callback=self.poll_preview)
+                    dpg.bind_item_handler_registry("selected_count_text", teacher_list_handlers)
+
+                    dpg.add_spacer(height=12)
+                    clear_btn = dpg.add_button(label="Clear All Selections", callback=self.clear_all_teachers, width=-1)
+                    dpg.bind_item_theme(clear_btn, "secondary_btn_theme")
+                    dpg.add_spacer(height=15)
+
+                    # Date input section
                     with dpg.group(horizontal=True):
-                        dpg.add_text("Schedule:", color=(148, 163, 184, 255))
+                        dpg.add_text("Date", color=(148, 163, 184, 255))
                         dpg.add_spacer(width=5)
-                        dpg.add_text(f"{os.path.basename(self.schedule_filepath)}", tag="file_status")
+                        dpg.add_text(f"(today: {datetime.date.today()})", color=(100, 116, 139, 255))
+                    date_input = dpg.add_input_text(source="date_input", width=280, hint="YYYY-MM-DD",
+                                                    callback=self.request_preview)
+                    dpg.bind_item_theme(date_input, "input_theme")
+                    dpg.add_spacer(height=15)
+
+                    # Day Type section with modern radio buttons
+                    dpg.add_text("Day Type", color=(148, 163, 184, 255))
                     dpg.add_spacer(height=5)
-                    change_btn = dpg.add_button(label="Change Schedule File", callback=self.open_file_dialog)
-                    dpg.bind_item_theme(change_btn, "secondary_btn_theme")
-                dpg.bind_item_theme(file_card, "card_theme")
-                dpg.add_spacer(height=15)
-
-                # Teachers Out section header
-                with dpg.group(horizontal=True):
-                    dpg.add_text("Teachers Out", color=(241, 245, 249, 255))
-                    dpg.add_spacer(width=10)
-                    dpg.add_text("0 teachers selected", tag="selected_count_text", color=(148, 163, 184, 255))
-                dpg.add_spacer(height=8)
-
-                # Scrollable teacher list in card container
-                with dpg.child_window(height=360, border=True) as teacher_card:
-                    with dpg.table(header_row=False, resizable=True, policy=dpg.mvTable_SizingStretchProp, borders_outerV=False, borders_innerV=False, borders_outerH=False, borders_innerH=True):
-                        dpg.add_table_column()
-                        dpg.add_table_column()
-                        
-                        teacher_names = list(self.teacherObjects.keys())
-                        for i in range(0, len(teacher_names), 2):
-                            with dpg.table_row():
-                                # First teacher in row
-                                with dpg.table_cell():
-                                    with dpg.group(horizontal=True, horizontal_spacing=8):
-                                        cb = dpg.add_checkbox(
-                                            label=teacher_names[i],
-                                            source=f"teacher_{teacher_names[i]}",
-                                            callback=self.update_selected_count
-                                        )
-                                        dpg.bind_item_theme(cb, "checkbox_theme")
-                                        dpg.add_spacer(width=4)
-                                        time_btn = dpg.add_button(
-                                            label="Full",
-                                            tag=f"time_pref_btn_{teacher_names[i]}",
-                                            callback=self.toggle_time_preference,
-                                            user_data=teacher_names[i],
-                                            width=65,
-                                            height=26,
-                                            show=False
-                                        )
-                                        dpg.bind_item_theme(time_btn, "am_pm_theme")
-                                
-                                # Second teacher in row (if exists)
-                                if i + 1 < len(teacher_names):
-                                    with dpg.table_cell():
-                                        with dpg.group(horizontal=True, horizontal_spacing=8):
-                                            cb = dpg.add_checkbox(
-                                                label=teacher_names[i+1],
-                                                source=f"teacher_{teacher_names[i+1]}",
-                                                callback=self.update_selected_count
-                                            )
-                                            dpg.bind_item_theme(cb, "checkbox_theme")
-                                            dpg.add_spacer(width=4)
-                                            time_btn = dpg.add_button(
-                                                label="Full",
-                                                tag=f"time_pref_btn_{teacher_names[i+1]}",
-                                                callback=self.toggle_time_preference,
-                                                user_data=teacher_names[i+1],
-                                                width=65,
-                                                height=26,
-                                                show=False
-                                            )
-                                            dpg.bind_item_theme(time_btn, "am_pm_theme")
-                dpg.bind_item_theme(teacher_card, "card_theme")
-
-                dpg.add_spacer(height=12)
-                clear_btn = dpg.add_button(label="Clear All Selections", callback=self.clear_all_teachers, width=-1)
-                dpg.bind_item_theme(clear_btn, "secondary_btn_theme")
-                dpg.add_spacer(height=15)
-
-                # Date input section
-                with dpg.group(horizontal=True):
-                    dpg.add_text("Date", color=(148, 163, 184, 255))
-                    dpg.add_spacer(width=5)
-                    dpg.add_text(f"(today: {datetime.date.today()})", color=(100, 116, 139, 255))
-                date_input = dpg.add_input_text(source="date_input", width=280, hint="YYYY-MM-DD")
-                dpg.bind_item_theme(date_input, "input_theme")
-                dpg.add_spacer(height=15)
-
-                # Day Type section with modern radio buttons
-                dpg.add_text("Day Type", color=(148, 163, 184, 255))
-                dpg.add_spacer(height=5)
-                day_radio = dpg.add_radio_button(
-                    items=["Even Day", "Odd Day"],
-                    source="day_type_radio",
-                    horizontal=True
-                )
-                dpg.bind_item_theme(day_radio, "radio_theme")
-                dpg.add_spacer(height=20)
-
-                # Submit button with primary theme
-                submit_btn = dpg.add_button(label="Submit", callback=self.validate_and_proceed, width=-1, height=45)
-                dpg.bind_item_theme(submit_btn, "primary_btn_theme")
+                    day_radio = dpg.add_radio_button(
+                        items=["Even Day", "Odd Day"],
+                        source="day_type_radio",
+                        horizontal=True,
+                        callback=self.request_preview
+                    )
+                    dpg.bind_item_theme(day_radio, "radio_theme")
+                    dpg.add_spacer(height=20)
+
+                    # Submit button with primary theme
+                    submit_btn = dpg.add_button(label="Submit", callback=self.validate_and_proceed, width=-1, height=45)
+                    dpg.bind_item_theme(submit_btn, "primary_btn_theme")
+                    dpg.add_spacer(height=8)
+                    undo_btn = dpg.add_button(label="Undo Coverage for Date", callback=self.undo_date_run, width=-1)
+                    dpg.bind_item_theme(undo_btn, "secondary_btn_theme")
+
+                # Live preview of the plan for the current selections; nothing is saved until Submit
+                with dpg.child_window(tag="preview_pane", width=-1, height=-1, border=True) as preview_card:
+                    dpg.add_text("Preview", color=(241, 245, 249, 255))
+                    dpg.add_text("Select the teachers who are out to see a preview.", tag="preview_status",
+                                 color=(148, 163, 184, 255), wrap=440)
+                    dpg.add_spacer(height=5)
+                    dpg.add_input_text(tag="preview_text", multiline=True, readonly=True, width=-1, height=-1)
+                dpg.bind_item_theme(preview_card, "card_theme")
 
             # File dialog configuration (must be inside window context)
             with dpg.file_dialog(
@@ -422,12 +870,14 @@ class TeacherCoverageApp:
                 dpg.add_file_extension("", color=(148, 163, 184, 255)) 
 
         dpg.bind_item_theme("main_window", "modern_theme")
-        dpg.set_primary_window("main_window", True)
+        self.sync_teacher_list(scroll_y=0, force=True)
+        # A cached schedule is usually parsed already
+        self.poll_schedule_parse()
         
-        dpg.setup_dearpygui()
-        dpg.show_viewport()
-        dpg.start_dearpygui()
-        dpg.destroy_context()
+        # Font scale 2.0 (twice the size)
+        run_screen("main_window", 'Teacher Coverage', 1300, 800, items_before)
+        if self.previewer is not None:
+            self.previewer.close()
 
 # --- FILE DIALOG CALLBACK ---
 
@@ -444,10 +894,12 @@ def file_dialog_callback(sender, app_data, user_data):
         config['SCHEDULE_FILE_PATH'] = selected_file_path
         save_config(config)
         
-        # 2. Mark that a file change triggered the stop, then stop DPG
-        if user_data and hasattr(user_data, 'file_changed'):
-            user_data.file_changed = True
-        dpg.stop_dearpygui()
+        # 2. Reload in place from the main screen, or hand the path back from the file selection screen
+        if user_data and hasattr(user_data, 'change_schedule'):
+            dpg.configure_item("file_dialog_tag", show=False)
+            user_data.change_schedule(selected_file_path)
+        else:
+            finish_screen()
     else:
         # User cancelled or selected an invalid file, just close the dialog
         dpg.configure_item("file_dialog_tag", show=False)
@@ -457,7 +909,7 @@ def file_dialog_callback(sender, app_data, user_data):
 
 def get_initial_file_path():
     """
-    Checks config for file path. If not found, runs a temporary DPG context 
+    Checks config for file path. If not found, shows a file selection screen
     with a file dialog to get the path from the user.
     """
     config = load_config()
@@ -467,12 +919,10 @@ def get_initial_file_path():
         return file_path, None
 
     # --- Run File Selection GUI ---
-    dpg.create_context()
-    dpg.set_global_font_scale(2.0)
-    dpg.create_viewport(title='Select Schedule File', width=600, height=200)
+    items_before = begin_screen()
 
     # Use a temporary window for instructions
-    with dpg.window(label="Schedule File Required", no_resize=True, no_close=True, no_title_bar=True, pos=(0, 0), width=600, height=200):
+    with dpg.window(tag="file_select_window", label="Schedule File Required", no_resize=True, no_close=True, no_title_bar=True, pos=(0, 0), width=600, height=200):
         dpg.add_text("Please locate and select your schedule file (.xlsx or .csv).", wrap=550)
         dpg.add_spacer(height=10)
         dpg.add_button(label="Browse for File", callback=lambda: dpg.show_item("file_dialog_tag"))
@@ -490,10 +940,7 @@ def get_initial_file_path():
         dpg.add_file_extension(".csv", color=(150, 150, 255, 255))
         dpg.add_file_extension("", color=(255, 255, 255, 255)) 
 
-    dpg.setup_dearpygui()
-    dpg.show_viewport()
-    dpg.start_dearpygui() 
-    dpg.destroy_context()
+    run_screen("file_select_window", 'Select Schedule File', 600, 200, items_before)
 
     # Re-read config after the GUI stops (i.e., after a file was successfully selected/saved)
     new_config = load_config()
@@ -564,77 +1011,114 @@ def _is_ct_entry(entry):
     ]
     return any(pattern in sanitized for pattern in ct_patterns)
 
-def _find_coteacher_in_entry(entry, teacher_name, all_teachers):
-    """Find co-teacher using flexible name matching for CT entries"""
-    # Sanitize the entry first to handle formatting issues
-    sanitized = _sanitize_period_entry(entry).lower()
+def _word_found_at_first_occurrence(text, word):
+    """True if the first occurrence of word in text is not inside a longer word."""
+    match_pos = text.find(word)
+    if match_pos == -1:
+        return False
+    # Check word boundaries
+    end_pos = match_pos + len(word)
+    after_char = text[end_pos] if end_pos < len(text) else ''
+    before_char = text[match_pos - 1] if match_pos > 0 else ''
     
-    for name in all_teachers:
-        if name == teacher_name:
-            continue  # Skip self
-            
-        name_lower = name.lower().strip()
-        
-        # Try multiple matching strategies
-        
-        # 1. Full name match (Last, First format)
-        match_pos = sanitized.find(name_lower)
-        if match_pos != -1:
-            # Check word boundaries
-            end_pos = match_pos + len(name_lower)
-            after_char = sanitized[end_pos] if end_pos < len(sanitized) else ''
-            before_char = sanitized[match_pos - 1] if match_pos > 0 else ''
-            
-            valid_before = match_pos == 0 or not before_char.isalpha()
-            valid_after = end_pos >= len(sanitized) or not after_char.isalpha()
-            
-            if valid_before and valid_after:
-                return name
-        
-        # 2. First name only match (handle "Class CT Costello" vs "Costello, Elizabeth")
-        if ',' in name_lower:
-            first_name = name_lower.split(',')[1].strip()
-            first_name_pos = sanitized.find(first_name)
-            if first_name_pos != -1:
-                # Check word boundaries for first name
-                end_pos = first_name_pos + len(first_name)
-                after_char = sanitized[end_pos] if end_pos < len(sanitized) else ''
-                before_char = sanitized[first_name_pos - 1] if first_name_pos > 0 else ''
-                
-                valid_before = first_name_pos == 0 or not before_char.isalpha()
-                valid_after = end_pos >= len(sanitized) or not after_char.isalpha()
-                
-                if valid_before and valid_after:
-                    return name
-        
-        # 3. Last name only match (handle "CT Smith" vs "Smith, John")
-        last_name = name_lower.split(',')[0].strip()
-        last_name_pos = sanitized.find(last_name)
-        if last_name_pos != -1:
-            # Check word boundaries for last name
-            end_pos = last_name_pos + len(last_name)
-            after_char = sanitized[end_pos] if end_pos < len(sanitized) else ''
-            before_char = sanitized[last_name_pos - 1] if last_name_pos > 0 else ''
-            
-            valid_before = last_name_pos == 0 or not before_char.isalpha()
-            valid_after = end_pos >= len(sanitized) or not after_char.isalpha()
-            
-            if valid_before and valid_after:
-                return name
-                
-    return None
+    valid_before = match_pos == 0 or not before_char.isalpha()
+    valid_after = end_pos >= len(text) or not after_char.isalpha()
+    return valid_before and valid_after
+
+def _name_keys(name):
+    """Returns the (full, first, last) lower-cased match keys for a 'Last, First' name."""
+    name_lower = name.lower().strip()
+    first_name = name_lower.split(',')[1].strip() if ',' in name_lower else None
+    last_name = name_lower.split(',')[0].strip()
+    return name_lower, first_name, last_name
+
+def _entry_names_teacher(sanitized, name):
+    """True if a sanitized, lower-cased CT entry refers to the named teacher."""
+    full_name, first_name, last_name = _name_keys(name)
+    
+    # Try multiple matching strategies
+    
+    # 1. Full name match (Last, First format)
+    if _word_found_at_first_occurrence(sanitized, full_name):
+        return True
+    
+    # 2. First name only match (handle "Class CT Costello" vs "Costello, Elizabeth")
+    if first_name is not None and _word_found_at_first_occurrence(sanitized, first_name):
+        return True
+    
+    # 3. Last name only match (handle "CT Smith" vs "Smith, John")
+    return _word_found_at_first_occurrence(sanitized, last_name)
+
+def _build_ct_graph(schedule):
+    """
+    Resolves co-teachers once at parse time. check_coteachers takes the first
+    CT entry in the period column that names someone other than the absent
+    teacher, so per column this records (primary, fallback): the co-teacher
+    found for everyone else, and the one found for the primary teacher
+    themself. CT entries that name nobody become parse diagnostics.
+    """
+    teachers = schedule.teachers
+    order = {name: i for i, name in enumerate(teachers)}
+    keyed = []
+    always_check = []  # Names with an empty key match at any non-letter start
+    for name in teachers:
+        for key in _name_keys(name):
+            if key is None:
+                continue
+            if key:
+                keyed.append((key, name))
+            else:
+                always_check.append(name)
+    matcher = _NameMatcher(keyed)
+
+    for period_col, entries in schedule.period_grid.items():
+        primary = fallback = None
+        for entry in entries:
+            if not _is_ct_entry(entry):
+                continue
+            sanitized = _sanitize_period_entry(entry).lower()
+            candidates = set(always_check)
+            for pattern_id in matcher.first_occurrences(sanitized):
+                candidates.update(matcher.targets[pattern_id])
+            # The first two names in schedule order are all that any lookup can need
+            matches = list(itertools.islice(
+                (name for name in sorted(candidates, key=order.get) if _entry_names_teacher(sanitized, name)), 2
+            ))
+            if not matches:
+                schedule.diagnostics.append(
+                    f"CT entry '{_sanitize_period_entry(entry)}' in the {period_col} column does not name a known teacher."
+                )
+                continue
+            if primary is None:
+                primary = matches[0]
+            if fallback is None:
+                others = [name for name in matches if name != primary]
+                fallback = others[0] if others else None
+        if primary is None:
+            continue
+        schedule.ct_columns[period_col] = (primary, fallback)
 
-def check_coteachers(teachers, filepath):
+    for name, teacher in teachers.items():
+        for period in teacher.periods_need_covered_CT:
+            coteacher = schedule.coteacher_for(name, period)
+            if coteacher:
+                schedule.ct_partners[(name, period)] = coteacher
+            else:
+                schedule.diagnostics.append(f"No co-teacher found for {name} in CT period {period}.")
+
+def check_coteachers(teachers, schedule):
     """
     Checks the schedule for co-teachers (CT). If a co-teacher for a period is 
     NOT out, the period is removed from the principal teacher's CT coverage list.
+    `schedule` is the ScheduleModel from parseScheduleModel; a file path is
+    still accepted and parsed (or served from the cache) on the spot.
     """
-    try:
-        schedule_df = _load_schedule_df(filepath)  # Use same function as parseSchedule
-    except Exception as e:
-        # If we can't load the schedule, skip CT validation
-        print(f"Warning: Could not load schedule for CT validation: {e}")
-        return
+    if not isinstance(schedule, ScheduleModel):
+        schedule, error = parseScheduleModel(schedule)
+        if error:
+            # If we can't load the schedule, skip CT validation
+            print(f"Warning: Could not load schedule for CT validation: {error}")
+            return
         
     for teacher_key in teachers:
         teacher = teachers[teacher_key]
@@ -643,29 +1127,10 @@ def check_coteachers(teachers, filepath):
             
         # Iterate over a copy to avoid mutating the list mid-loop
         for period in list(teacher.periods_need_covered_CT):
-            if '/' in period:
-                period1, period2 = period.split('/')
-                check_periods = [period1.strip(), period2.strip()]
-            else:
-                check_periods = [period.strip()]
-
-            # Search all sub-periods to find the co-teacher before making any decision
-            coteacher_name = None
-            for check_period in check_periods:
-                period_suffix = add_ordinal_suffix(check_period)
-                
-                if period_suffix not in schedule_df.columns:
-                    continue
-                    
-                period_data = schedule_df[period_suffix].dropna().astype(str)
-                for entry in period_data:
-                    if _is_ct_entry(entry):
-                        found_name = _find_coteacher_in_entry(entry, teacher.name, teachers.keys())
-                        if found_name:
-                            coteacher_name = found_name
-                            break
-                if coteacher_name:
-                    break
+            # Co-teachers were resolved when the schedule was parsed
+            coteacher_name = schedule.coteacher_for(teacher.name, period)
+            if coteacher_name not in teachers:
+                coteacher_name = None
 
             if coteacher_name:
                 if teachers[coteacher_name].is_out:
@@ -691,18 +1156,220 @@ def _load_schedule_df(filepath):
     """Loads the schedule file into a DataFrame, handling both .xlsx and .csv formats."""
     if filepath.endswith('.csv'):
         schedule_df = pd.read_csv(filepath, header=0, skipinitialspace=True)
-        schedule_df = schedule_df.loc[:, ~schedule_df.columns.str.match('^Unnamed|^$')]
-        schedule_df.columns = schedule_df.columns.str.strip()
-        if 'Name' not in schedule_df.columns:
-            for col in schedule_df.columns:
-                if schedule_df[col].notna().any() and any(schedule_df[col].dropna().astype(str).str.contains(',')):
-                    schedule_df = schedule_df.rename(columns={col: 'Name'})
-                    break
+        schedule_df, _ = _normalize_csv_columns(schedule_df)
     else:
         schedule_df = pd.read_excel(filepath, sheet_name=0)
     return schedule_df
 
 
+def _normalize_csv_columns(schedule_df, name_column=None):
+    """
+    Drops unnamed CSV columns, strips header whitespace and, when there is no
+    'Name' header, renames the first column containing commas to 'Name'.
+    Returns (frame, renamed column or None); pass name_column to reuse an
+    earlier chunk's choice instead of detecting it again.
+    """
+    schedule_df = schedule_df.loc[:, ~schedule_df.columns.str.match('^Unnamed|^$')]
+    schedule_df.columns = schedule_df.columns.str.strip()
+    if name_column:
+        return schedule_df.rename(columns={name_column: 'Name'}), name_column
+    if 'Name' not in schedule_df.columns:
+        for col in schedule_df.columns:
+            if schedule_df[col].notna().any() and any(schedule_df[col].dropna().astype(str).str.contains(',')):
+                return schedule_df.rename(columns={col: 'Name'}), col
+    return schedule_df, None
+
+
+# Rows handed to the columnar parser at a time by the streaming loaders
+SCHEDULE_CHUNK_ROWS = 2000
+
+
+def _excel_header_names(header_row):
+    """Names header cells the way pandas does: blanks become 'Unnamed: i', repeats get '.1', '.2'..."""
+    names = []
+    seen = {}
+    for i, cell in enumerate(header_row):
+        name = f"Unnamed: {i}" if cell is None else cell
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _iter_excel_chunks(filepath, chunk_rows=None):
+    """
+    Streams the first worksheet through openpyxl's read-only row iterator,
+    yielding small DataFrames of at most chunk_rows rows. The full sheet is
+    never materialised, so peak memory is bounded by the chunk size.
+    """
+    from openpyxl import load_workbook
+
+    chunk_rows = chunk_rows or SCHEDULE_CHUNK_ROWS
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            yield pd.DataFrame()
+            return
+        columns = _excel_header_names(header_row)
+        width = len(columns)
+        chunk = []
+        yielded = False
+        for row in rows:
+            # Read-only rows can be ragged when the sheet has no stored dimensions
+            if len(row) != width:
+                row = (tuple(row) + (None,) * width)[:width]
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield pd.DataFrame(chunk, columns=columns, dtype=object)
+                chunk = []
+                yielded = True
+        if chunk or not yielded:
+            yield pd.DataFrame(chunk, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+
+def _iter_csv_chunks(filepath, chunk_rows=None):
+    """Streams a CSV schedule in chunks; the 'Name' column is chosen from the first chunk."""
+    name_column = None
+    first_chunk = True
+    reader = pd.read_csv(filepath, header=0, skipinitialspace=True, dtype=str,
+                         chunksize=chunk_rows or SCHEDULE_CHUNK_ROWS)
+    with reader:
+        for chunk in reader:
+            if first_chunk:
+                chunk, name_column = _normalize_csv_columns(chunk)
+                first_chunk = False
+            else:
+                chunk, _ = _normalize_csv_columns(chunk, name_column)
+            yield chunk
+
+
+def _iter_schedule_chunks(filepath, streaming=True):
+    """
+    Yields the schedule as a sequence of DataFrames. .xlsx/.xlsm and .csv
+    files are streamed in chunks; other formats (and streaming=False) fall
+    back to a single pandas read of the whole sheet.
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    if streaming and extension in ('.xlsx', '.xlsm'):
+        yield from _iter_excel_chunks(filepath)
+    elif streaming and extension == '.csv':
+        yield from _iter_csv_chunks(filepath)
+    else:
+        yield _load_schedule_df(filepath)
+
+
+# --- PARSED SCHEDULE CACHE ---
+
+def _hash_file(filepath, chunk_size=1 << 20):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_fingerprint(filepath):
+    """Returns the (path, mtime, size) part of the cache key for a schedule file."""
+    stat = os.stat(filepath)
+    return {
+        'path': os.path.abspath(filepath),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+    }
+
+
+def _load_schedule_cache(filepath):
+    """
+    Returns the cached ScheduleModel for filepath, or None on a cache miss.
+    A hit requires the same path and size plus an identical content hash; a
+    file that was only touched (new mtime, same bytes) is still a hit.
+    """
+    try:
+        fingerprint = _file_fingerprint(filepath)
+        with open(SCHEDULE_CACHE_FILENAME, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception:
+        # Missing schedule, missing cache, or a cache written by another version
+        return None
+
+    if (not isinstance(entry, dict) or
+            entry.get('version') != SCHEDULE_CACHE_VERSION or
+            entry.get('path') != fingerprint['path'] or
+            entry.get('size') != fingerprint['size']):
+        return None
+
+    if entry.get('mtime_ns') != fingerprint['mtime_ns']:
+        try:
+            if _hash_file(filepath) != entry.get('sha256'):
+                return None
+        except OSError:
+            return None
+        # Same contents under a new mtime: refresh the key so the next lookup is cheap
+        entry['mtime_ns'] = fingerprint['mtime_ns']
+        _write_schedule_cache(entry)
+    return entry['payload']
+
+
+def _save_schedule_cache(filepath, payload):
+    """Stores a freshly parsed ScheduleModel in the on-disk schedule cache."""
+    try:
+        entry = _file_fingerprint(filepath)
+        entry['sha256'] = _hash_file(filepath)
+    except OSError as e:
+        print(f"Warning: Could not fingerprint schedule for caching: {e}")
+        return
+    entry['version'] = SCHEDULE_CACHE_VERSION
+    entry['payload'] = payload
+    _write_schedule_cache(entry)
+
+
+def _write_schedule_cache(entry):
+    """Writes a cache entry via a temp file so a crash never leaves a torn cache."""
+    temp_path = SCHEDULE_CACHE_FILENAME + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, SCHEDULE_CACHE_FILENAME)
+    except Exception as e:
+        print(f"Warning: Could not write schedule cache: {e}")
+
+
+def _build_period_grid(schedule_df, grid=None):
+    """
+    Returns {period column: [non-null cell strings]} for the 1st-11th columns.
+    Pass an existing grid to extend it with another chunk of rows.
+    """
+    grid = {} if grid is None else grid
+    for period in range(1, 12):
+        period_suffix = add_ordinal_suffix(period)
+        if period_suffix in schedule_df.columns:
+            grid.setdefault(period_suffix, []).extend(schedule_df[period_suffix].dropna().astype(str))
+    return grid
+
+
+def _build_duty_grid(schedule_df, grid=None):
+    """
+    Returns {period number: [lower-cased duty cell strings]} for the Duty columns.
+    Pass an existing grid to extend it with another chunk of rows.
+    """
+    grid = {} if grid is None else grid
+    for period in range(1, 12):
+        duty_col = f'Duty {add_ordinal_suffix(period)}'
+        if duty_col in schedule_df.columns:
+            grid.setdefault(period, []).extend(
+                str(duty_raw).strip().lower() for duty_raw in schedule_df[duty_col].dropna()
+            )
+    return grid
+
+
 def _parse_name(raw):
     """
     Validates and normalises a raw Name cell value.
@@ -803,26 +1470,86 @@ def _merge_teacher_periods(existing, needs_coverage, needs_coverage_CT):
     )
 
 
-def _parse_duties(schedule_df, teachers):
-    """Populates each teacher's availability lists from the Duty columns."""
-    for period in range(1, 12):
-        period_suffix = add_ordinal_suffix(period)
-        duty_col = f'Duty {period_suffix}'
-        if duty_col not in schedule_df.columns:
-            continue
-        for duty_raw in schedule_df[duty_col].dropna():
-            duty_raw = str(duty_raw).strip().lower()
+class _NameMatcher:
+    """
+    Aho-Corasick automaton over lower-cased names. One pass over a cell finds
+    the first occurrence of every name in it, instead of one str.find per
+    teacher per cell.
+    """
+    def __init__(self, keyed_targets):
+        self.targets = []        # pattern id -> [target names sharing that key]
+        self._goto = [{}]        # state -> {char: next state}
+        self._fail = [0]
+        self._out = [[]]         # state -> pattern ids ending at this state
+        self._out_link = [0]     # state -> nearest fail-chain state with output (0 = none)
+        pattern_ids = {}
+        for key, target in keyed_targets:
+            if not key:
+                continue
+            if key in pattern_ids:
+                self.targets[pattern_ids[key]].append(target)
+                continue
+            pattern_ids[key] = len(self.targets)
+            self.targets.append([target])
+            state = 0
+            for ch in key:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._out_link.append(0)
+                state = next_state
+            self._out[state].append(pattern_ids[key])
+
+        # Breadth-first pass to fill in failure and output links
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out_link[child] = target if self._out[target] else self._out_link[target]
+
+    def first_occurrences(self, text):
+        """Returns {pattern id: end index of its first occurrence} for names found in text."""
+        goto, fail, out, out_link = self._goto, self._fail, self._out, self._out_link
+        found = {}
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            match_state = state if out[state] else out_link[state]
+            while match_state:
+                for pattern_id in out[match_state]:
+                    if pattern_id not in found:
+                        found[pattern_id] = i + 1
+                match_state = out_link[match_state]
+        return found
+
+
+def _parse_duties(schedule, progress=None):
+    """Populates each teacher's availability lists from the model's duty grid."""
+    teachers = schedule.teachers
+    matcher = _NameMatcher((name.strip().lower(), name) for name in teachers)
+    for period, duty_cells in schedule.duty_grid.items():
+        for duty_raw in duty_cells:
             duty_type = _classify_duty(duty_raw)
-            for teacher_name, teacher in teachers.items():
-                teacher_name_lower = teacher_name.strip().lower()
-                match_pos = duty_raw.find(teacher_name_lower)
-                if match_pos == -1:
-                    continue
-                end_pos = match_pos + len(teacher_name_lower)
+            for pattern_id, end_pos in matcher.first_occurrences(duty_raw).items():
+                # Only the first occurrence counts, and it must not run into another word
                 after_char = duty_raw[end_pos] if end_pos < len(duty_raw) else ''
                 if after_char.isalpha():
                     continue
-                _get_duty_list(teacher, duty_type).append(str(period))
+                for teacher_name in matcher.targets[pattern_id]:
+                    _get_duty_list(teachers[teacher_name], duty_type).append(str(period))
+            if progress is not None:
+                progress.duties_resolved += 1
 
 
 def _detect_ct_periods_from_row(row, needs_coverage):
@@ -858,62 +1585,226 @@ def _detect_ct_periods_from_row(row, needs_coverage):
     return regular_periods, ct_periods
 
 
-def parseSchedule(filepath):
+# Same markers as _is_ct_entry, as one regex for whole-column matching
+_CT_MARKER_REGEX = r' ct |ct | ct|ct-|\(ct\)'
+
+
+def _parse_name_column(raw_names):
     """
-    Parses the schedule file and returns a tuple: (teachers_dict, error_message or None).
+    Column-wise equivalent of _parse_name.
+    Returns a Series of cleaned names, containing only the rows to keep.
     """
-    try:
-        schedule_df = _load_schedule_df(filepath)
-    except FileNotFoundError:
-        return {}, f"File not found at saved path: '{filepath}'. Please re-select the file."
-    except Exception as e:
-        return {}, f"Failed to read the schedule file. Details: {type(e).__name__}: {e}"
+    keep = raw_names.notna() & ~raw_names.isin([False])  # `not raw` also rejects 0/False
+    names = raw_names[keep].astype(str).str.strip()
+    valid = (
+        ~names.str.lower().isin(['name', '', 'nan']) &
+        ~names.str.startswith('Duty') &
+        ~names.str.startswith('Plan') &
+        (names.str.len() >= 2)
+    )
+    names = names[valid].str.split('(', n=1).str[0].str.strip()
+    return names[names != '']
 
-    teachers = {}
-    for _, row in schedule_df.iterrows():
-        name = _parse_name(row.get('Name'))
-        if not name:
-            continue
-        needs_coverage, needs_coverage_CT = _parse_coverage(str(row.get('Need Coverage', '')).strip())
-        
-        # Auto-detect CT periods from period columns if no CT- format in Need Coverage
-        if not needs_coverage_CT and needs_coverage:
-            needs_coverage, needs_coverage_CT = _detect_ct_periods_from_row(row, needs_coverage)
-        
-        # Include teachers even if they have no coverage needs
-        if name in teachers:
-            _merge_teacher_periods(teachers[name], needs_coverage, needs_coverage_CT)
-        else:
-            teachers[name] = _make_teacher(name, needs_coverage, needs_coverage_CT)
 
-    _parse_duties(schedule_df, teachers)
-    return teachers, None
+def _whole_number_text(value):
+    """Writes a whole-number cell (5 or 5.0) as '5'; other values are returned unchanged."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and float(value).is_integer():
+        return str(int(value))
+    return value
 
-def _classify_duty(duty_raw):
-    """Returns a duty type string based on keywords found in the duty cell text."""
-    if "iss" in duty_raw:       return 'iss'
-    if "even days" in duty_raw: return 'even'
-    if "odd days" in duty_raw:  return 'odd'
-    if "-" in duty_raw:         return 'other'
-    return 'standard'
 
+def _sanitize_need_coverage_column(need_coverage):
+    """
+    Column-wise equivalent of _sanitize_need_coverage (after str().strip()).
+    A numeric cell reads as 5 through openpyxl but 5.0 through pandas, so
+    whole-number floats are written without the '.0' to keep both loaders alike.
+    """
+    need_coverage = need_coverage.map(_whole_number_text)
+    sanitized = need_coverage.where(need_coverage.notna(), '').astype(str).str.strip()
+    sanitized = sanitized.where(~sanitized.isin(['nan', 'None']), '')
+    for old, new in ((', ', ','), (' / ', '/'), (' /', '/'), ('/ ', '/'), ('CT -', 'CT-'), ('CT  ', 'CT ')):
+        sanitized = sanitized.str.replace(old, new, regex=False)
+    return sanitized
 
-def _get_duty_list(teacher, duty_type):
-    """Returns the correct availability list on a Teacher for a given duty type."""
-    return {
-        'iss':      teacher.iss_periods_available,
-        'even':     teacher.evenDayPeriods_available,
-        'odd':      teacher.oddDayPeriods_available,
-        'other':    teacher.otherDutyPeriods_available,
-        'standard': teacher.periods_available,
-    }[duty_type]
+
+def _explode_periods(period_strings):
+    """
+    Splits comma-separated period strings into one (row, period) item per
+    period, stripped, non-empty and de-duplicated within each row in order.
+    """
+    items = period_strings.dropna().str.split(',').explode().dropna().astype(str).str.strip()
+    items = items[items != '']
+    duplicated = pd.DataFrame({'row': items.index, 'period': items.values}).duplicated()
+    return items[~duplicated.values]
 
 
-def _filter_periods_by_time_preference(periods, time_preference):
+def _ct_marker_flags(period_column):
+    """Column-wise _is_ct_entry: True where the (sanitized) cell carries a CT marker."""
+    cells = period_column.where(period_column.notna() & ~period_column.isin([False]), '')
+    cells = cells.astype(str).str.strip().str.replace(r'\s+', ' ', regex=True)
+    cells = cells.str.replace('*Class CT', 'Class CT', regex=False).str.replace('*CT', 'CT', regex=False)
+    return cells.str.lower().str.contains(_CT_MARKER_REGEX, regex=True)
+
+
+def _parse_teacher_rows(schedule_df):
     """
-    Filters a list of periods based on time preference.
-    AM = periods 1-4, PM = periods 5-11, None = all periods.
-    Handles split periods like '5/6' by checking the first part.
+    Columnar parse of the Name / Need Coverage / period columns. Produces the
+    same per-row results as _parse_name + _parse_coverage +
+    _detect_ct_periods_from_row, as a list of (name, periods, ct_periods).
+    """
+    if 'Name' not in schedule_df.columns:
+        return []
+    schedule_df = schedule_df.reset_index(drop=True)
+    names = _parse_name_column(schedule_df['Name'])
+    if names.empty:
+        return []
+
+    if 'Need Coverage' in schedule_df.columns:
+        need_coverage = _sanitize_need_coverage_column(schedule_df['Need Coverage'].loc[names.index])
+    else:
+        need_coverage = pd.Series('', index=names.index)
+
+    # "1,4 CT-2,10" -> regular "1,4" and CT "2,10"; anything after a second CT- is ignored
+    parts = need_coverage.str.split(' CT-', n=2, expand=True)
+    regular = _explode_periods(parts[0])
+    explicit_ct = _explode_periods(parts[1]) if 1 in parts.columns else regular.iloc[:0]
+
+    # Rows without an explicit CT- list get CT periods auto-detected from the period columns
+    detect = regular[~regular.index.isin(explicit_ct.index)]
+    is_ct = pd.Series(False, index=detect.index)
+    if not detect.empty:
+        columns = detect.map({p: add_ordinal_suffix(p) for p in detect.unique()})
+        for column in columns.unique():
+            if column not in schedule_df.columns:
+                continue
+            in_column = (columns == column).values
+            flags = _ct_marker_flags(schedule_df[column])
+            is_ct[in_column] = flags.reindex(detect.index[in_column]).values
+    regular = pd.concat([regular[regular.index.isin(explicit_ct.index)], detect[~is_ct.values]])
+    ct = pd.concat([explicit_ct, detect[is_ct.values]])
+
+    regular_lists = _group_periods_by_row(regular)
+    ct_lists = _group_periods_by_row(ct)
+    return [
+        (name, regular_lists.get(row, []), ct_lists.get(row, []))
+        for row, name in zip(names.index.tolist(), names.tolist())
+    ]
+
+
+def _group_periods_by_row(items):
+    """Collects (row, period) items into {row: [periods]} keeping their order."""
+    grouped = {}
+    for row, period in zip(items.index.tolist(), items.tolist()):
+        grouped.setdefault(row, []).append(period)
+    return grouped
+
+
+def parseSchedule(filepath):
+    """
+    Parses the schedule file and returns a tuple: (teachers_dict, error_message or None).
+    """
+    schedule, error = parseScheduleModel(filepath)
+    if error:
+        return {}, error
+    return schedule.teachers, None
+
+
+class ScheduleParseProgress:
+    """
+    Counters parseScheduleModel() updates as it goes, for a loading screen
+    that polls them from another thread. Plain attributes, so reading them
+    never holds up the parse.
+    """
+    def __init__(self):
+        self.stage = 'reading'      # 'reading', 'duties', 'co-teachers' or 'done'
+        self.rows_read = 0
+        self.teachers_found = 0
+        self.duty_cells = 0         # Duty cells to resolve; known once reading is done
+        self.duties_resolved = 0
+
+    def describe(self):
+        """One line for the loading screen."""
+        if self.stage == 'reading':
+            return f"Reading schedule... {self.rows_read} rows read, {self.teachers_found} teachers found"
+        if self.stage == 'duties':
+            return f"Resolving duties... {self.duties_resolved} of {self.duty_cells} ({self.teachers_found} teachers)"
+        if self.stage == 'co-teachers':
+            return f"Matching co-teachers... ({self.teachers_found} teachers)"
+        return f"Loaded {self.teachers_found} teachers"
+
+
+def parseScheduleModel(filepath, streaming=True, use_cache=True, progress=None):
+    """
+    Parses the schedule file into a ScheduleModel.
+    Returns a tuple: (ScheduleModel or None, error_message or None).
+    An unchanged file is served from the on-disk cache without re-reading the workbook.
+    Rows are streamed chunk by chunk unless streaming=False (see _iter_schedule_chunks).
+    Pass a ScheduleParseProgress to follow the parse from another thread.
+    """
+    progress = progress or ScheduleParseProgress()
+    if use_cache:
+        cached = _load_schedule_cache(filepath)
+        if cached is not None:
+            progress.teachers_found = len(cached.teachers)
+            progress.stage = 'done'
+            return cached, None
+
+    teachers = {}
+    period_grid = {}
+    duty_grid = {}
+    try:
+        for chunk in _iter_schedule_chunks(filepath, streaming):
+            for name, needs_coverage, needs_coverage_CT in _parse_teacher_rows(chunk):
+                # Include teachers even if they have no coverage needs
+                if name in teachers:
+                    _merge_teacher_periods(teachers[name], needs_coverage, needs_coverage_CT)
+                else:
+                    teachers[name] = _make_teacher(name, needs_coverage, needs_coverage_CT)
+            _build_period_grid(chunk, period_grid)
+            _build_duty_grid(chunk, duty_grid)
+            progress.rows_read += len(chunk)
+            progress.teachers_found = len(teachers)
+    except FileNotFoundError:
+        return None, f"File not found at saved path: '{filepath}'. Please re-select the file."
+    except Exception as e:
+        return None, f"Failed to read the schedule file. Details: {type(e).__name__}: {e}"
+
+    schedule = ScheduleModel(filepath, teachers, period_grid, duty_grid)
+    progress.duty_cells = sum(len(duty_cells) for duty_cells in duty_grid.values())
+    progress.stage = 'duties'
+    _parse_duties(schedule, progress)
+    progress.stage = 'co-teachers'
+    _build_ct_graph(schedule)
+    if use_cache:
+        _save_schedule_cache(filepath, schedule)
+    progress.stage = 'done'
+    return schedule, None
+
+def _classify_duty(duty_raw):
+    """Returns a duty type string based on keywords found in the duty cell text."""
+    if "iss" in duty_raw:       return 'iss'
+    if "even days" in duty_raw: return 'even'
+    if "odd days" in duty_raw:  return 'odd'
+    if "-" in duty_raw:         return 'other'
+    return 'standard'
+
+
+def _get_duty_list(teacher, duty_type):
+    """Returns the correct availability list on a Teacher for a given duty type."""
+    return {
+        'iss':      teacher.iss_periods_available,
+        'even':     teacher.evenDayPeriods_available,
+        'odd':      teacher.oddDayPeriods_available,
+        'other':    teacher.otherDutyPeriods_available,
+        'standard': teacher.periods_available,
+    }[duty_type]
+
+
+def _filter_periods_by_time_preference(periods, time_preference):
+    """
+    Filters a list of periods based on time preference.
+    AM = periods 1-4, PM = periods 5-11, None = all periods.
+    Handles split periods like '5/6' by checking the first part.
     """
     if time_preference is None:
         return periods
@@ -940,6 +1831,58 @@ def _filter_periods_by_time_preference(periods, time_preference):
     return filtered
 
 
+class _LeastUsedQueue:
+    """
+    Available teachers ordered by (times covered, insertion order), kept up to
+    date as coverage is assigned instead of being re-sorted for every period.
+    Teachers are bucketed by coverage count; each bucket stays sorted by the
+    teacher's original position so ties break exactly as a stable sort would.
+    Iterating yields (name, times_covered) pairs, least used first. `step` is
+    what one assignment adds to a count (fairness scores in finer units use
+    more than 1).
+    """
+
+    def __init__(self, counts, step=1):
+        self.step = step
+        self._buckets = {}
+        self._entries = {}
+        for order, (name, count) in enumerate(counts):
+            self._entries[name] = (count, order)
+            self._buckets.setdefault(count, []).append((order, name))
+        self._counts = sorted(self._buckets)
+
+    def __iter__(self):
+        for count in self._counts:
+            for _, name in self._buckets[count]:
+                yield name, count
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def rank(self, name):
+        """Sort key matching iteration order: (times covered, insertion order)."""
+        return self._entries[name]
+
+    def increment(self, name):
+        """Moves a teacher up one assignment's worth, keeping their tie-break position."""
+        count, order = self._entries[name]
+        bucket = self._buckets[count]
+        del bucket[bisect.bisect_left(bucket, (order, name))]
+        if not bucket:
+            del self._buckets[count]
+            self._counts.remove(count)
+
+        count += self.step
+        if count not in self._buckets:
+            self._buckets[count] = []
+            bisect.insort(self._counts, count)
+        bisect.insort(self._buckets[count], (order, name))
+        self._entries[name] = (count, order)
+
+
 def _try_assign_from_list(duty_type, teachers, sorted_available_teachers, periods, evenDay=None):
     """
     Attempts to find the least-used available teacher who has all requested
@@ -957,189 +1900,2311 @@ def _try_assign_from_list(duty_type, teachers, sorted_available_teachers, period
             avail = _get_duty_list(teacher, duty_type)
 
         if all(p in avail for p in periods):
-            if duty_type == 'standard':
-                # Remove from whichever source list actually held each period
-                for p in periods:
-                    if p in teacher.periods_available:
-                        teacher.periods_available.remove(p)
-                    elif evenDay and p in teacher.evenDayPeriods_available:
-                        teacher.evenDayPeriods_available.remove(p)
-                    elif not evenDay and p in teacher.oddDayPeriods_available:
-                        teacher.oddDayPeriods_available.remove(p)
-            else:
-                target = _get_duty_list(teacher, duty_type)
-                for p in periods:
-                    target.remove(p)
+            _claim_periods(teacher, duty_type, periods, evenDay)
+            return name
+    return None
+
+
+def _claim_periods(teacher, duty_type, periods, evenDay=None):
+    """Removes assigned periods from the teacher's availability lists."""
+    if duty_type == 'standard':
+        # Remove from whichever source list actually held each period
+        for p in periods:
+            if p in teacher.periods_available:
+                teacher.periods_available.remove(p)
+            elif evenDay and p in teacher.evenDayPeriods_available:
+                teacher.evenDayPeriods_available.remove(p)
+            elif not evenDay and p in teacher.oddDayPeriods_available:
+                teacher.oddDayPeriods_available.remove(p)
+    else:
+        target = _get_duty_list(teacher, duty_type)
+        for p in periods:
+            target.remove(p)
+
+
+# Assignment engines selectable via ASSIGNMENT_ENGINE in config.json
+ASSIGNMENT_ENGINES = ('lists', 'bitmask', 'optimal')
+
+
+class _AvailabilityMasks:
+    """
+    Bitmask form of every teacher's availability lists for one run, used by
+    the 'bitmask' assignment engine. Each period string gets one bit, so a
+    split period like '5/6' is a two-bit mask: checking that a teacher is
+    free in all of it is one AND, and claiming it is one AND-NOT.
+
+    The lists may hold a period more than once (e.g. two duty cells naming
+    the same teacher), and list.remove only drops one copy. To match that,
+    each list is stored as layers where layers[k] has the bits seen more
+    than k times; the first layer is the availability test.
+    """
+
+    def __init__(self, teachers, evenDay):
+        self.evenDay = evenDay
+        self._bits = {}
+        self._masks = {}
+        self._claims = []
+        for name, teacher in teachers.items():
+            self._masks[name] = {
+                'standard': self._layers(teacher.periods_available),
+                'day': self._layers(teacher.evenDayPeriods_available if evenDay
+                                    else teacher.oddDayPeriods_available),
+                'iss': self._layers(teacher.iss_periods_available),
+                'other': self._layers(teacher.otherDutyPeriods_available),
+            }
+
+    def mask(self, periods):
+        """Returns the combined bit mask for a list of period strings."""
+        combined = 0
+        for period in periods:
+            bit = self._bits.get(period)
+            if bit is None:
+                bit = self._bits[period] = 1 << len(self._bits)
+            combined |= bit
+        return combined
+
+    def _layers(self, periods):
+        layers = []
+        for period in periods:
+            bit = self.mask([period])
+            depth = 0
+            while depth < len(layers) and layers[depth] & bit:
+                depth += 1
+            if depth == len(layers):
+                layers.append(0)
+            layers[depth] |= bit
+        return layers
+
+    @staticmethod
+    def _top(layers):
+        return layers[0] if layers else 0
+
+    @staticmethod
+    def _remove(layers, bits):
+        """Drops one copy of each bit, from the highest layer holding it."""
+        for depth in range(len(layers) - 1, -1, -1):
+            hit = layers[depth] & bits
+            layers[depth] &= ~hit
+            bits &= ~hit
+
+    def claim(self, name, duty_type, periods):
+        """Claims all periods from one duty type if the teacher is free in all of them."""
+        needed = self.mask(periods)
+        masks = self._masks[name]
+        if duty_type == 'standard':
+            base, day = masks['standard'], masks['day']
+            from_base = needed & self._top(base)
+            if (from_base | self._top(day)) & needed != needed:
+                return False
+            self._remove(base, from_base)
+            self._remove(day, needed & ~from_base)
+        else:
+            layers = masks[duty_type]
+            if self._top(layers) & needed != needed:
+                return False
+            self._remove(layers, needed)
+        self._claims.append((name, duty_type, periods))
+        return True
+
+    def write_back(self, teachers):
+        """Applies the claims made so far to the Teacher lists, as the list engine would have."""
+        for name, duty_type, periods in self._claims:
+            _claim_periods(teachers[name], duty_type, periods, self.evenDay)
+        self._claims = []
+
+
+def _try_assign_from_masks(duty_type, masks, sorted_available_teachers, periods):
+    """Bitmask counterpart of _try_assign_from_list."""
+    for name, _ in sorted_available_teachers:
+        if masks.claim(name, duty_type, periods):
             return name
     return None
 
 
-def find_and_assign(p1, teachers, sorted_available_teachers, coverage_data, evenDay, p2=None):
-    """Core logic to find the least-used available teacher for a period (or split period)."""
+class _FreeTeacherIndex:
+    """
+    Inverted availability index for one run: (duty tier, period) -> the
+    teachers free in it, with how many copies of the period their list holds.
+    Candidate search only looks at teachers who are actually free and picks
+    the least used of them, instead of walking the whole staff in order.
+    The 'standard' tier covers the base list; the day list for the run's day
+    type is the 'day' tier, which standard assignments also draw on.
+    """
+
+    def __init__(self, teachers, names, evenDay):
+        self._index = {}
+        for name in names:
+            teacher = teachers[name]
+            for tier, periods in (
+                ('standard', teacher.periods_available),
+                ('day', teacher.evenDayPeriods_available if evenDay else teacher.oddDayPeriods_available),
+                ('iss', teacher.iss_periods_available),
+                ('other', teacher.otherDutyPeriods_available),
+            ):
+                for period in periods:
+                    free = self._index.setdefault((tier, period), {})
+                    free[name] = free.get(name, 0) + 1
+
+    def _free(self, tier, period):
+        return self._index.get((tier, period), {})
+
+    def copies(self, name, tier, period):
+        """How many copies of the period the teacher can still give in a duty tier."""
+        if tier == 'standard':
+            return self._free('standard', period).get(name, 0) + self._free('day', period).get(name, 0)
+        return self._free(tier, period).get(name, 0)
+
+    def free_teachers(self, duty_type, periods):
+        """Returns the set of indexed teachers free in every one of the periods."""
+        result = None
+        for period in periods:
+            if duty_type == 'standard':
+                free = self._free('standard', period).keys() | self._free('day', period).keys()
+            else:
+                free = set(self._free(duty_type, period))
+            result = free if result is None else result & free
+            if not result:
+                break
+        return result or set()
+
+    def find(self, duty_type, periods, sorted_available_teachers):
+        """Returns the least-used teacher free in all periods, or None."""
+        candidates = self.free_teachers(duty_type, periods)
+        if not candidates:
+            return None
+        return min(candidates, key=sorted_available_teachers.rank)
+
+    def claim(self, name, duty_type, periods):
+        """Consumes one copy of each period, from the same list _claim_periods would."""
+        for period in periods:
+            tier = duty_type
+            if duty_type == 'standard' and name not in self._free('standard', period):
+                tier = 'day'
+            free = self._free(tier, period)
+            if name in free:
+                free[name] -= 1
+                if not free[name]:
+                    del free[name]
+
+
+def find_and_assign(p1, teachers, sorted_available_teachers, coverage_data, evenDay, p2=None, masks=None,
+                    free_index=None):
+    """
+    Core logic to find the least-used available teacher for a period (or split period).
+    Pass `masks` (an _AvailabilityMasks) to use the bitmask engine instead of the lists.
+    Or pass `free_index` (a _FreeTeacherIndex) with a _LeastUsedQueue to only consider
+    teachers who are free, instead of walking the queue.
+    """
     periods = [p1, p2] if p2 else [p1]
 
+    def try_assign(duty_type):
+        if masks is not None:
+            return _try_assign_from_masks(duty_type, masks, sorted_available_teachers, periods)
+        if free_index is not None:
+            name = free_index.find(duty_type, periods, sorted_available_teachers)
+            if name:
+                free_index.claim(name, duty_type, periods)
+                _claim_periods(teachers[name], duty_type, periods, evenDay)
+            return name
+        return _try_assign_from_list(duty_type, teachers, sorted_available_teachers, periods, evenDay)
+
     # 1. Check Standard/Day-Dependent Availability
-    name = _try_assign_from_list('standard', teachers, sorted_available_teachers, periods, evenDay)
+    name = try_assign('standard')
     if name:
         return name, False, False
 
     # 2. Check ISS Availability (Fallback)
-    name = _try_assign_from_list('iss', teachers, sorted_available_teachers, periods)
+    name = try_assign('iss')
     if name:
         return name, True, False
 
     # 3. Check Other Duty Availability (Fallback)
-    name = _try_assign_from_list('other', teachers, sorted_available_teachers, periods)
+    name = try_assign('other')
     if name:
         return name, False, True
 
     return None, False, False
 
 
-def determineCoverage_and_save(teachers, date, coverage_tracker_json, evenDay):
+# --- COVERAGE TRACKER (JOURNAL + SNAPSHOT) ---
+
+# Seconds to keep retrying for the tracker lock before giving up, and the pause between tries
+TRACKER_LOCK_TIMEOUT = 30.0
+TRACKER_LOCK_RETRY_INTERVAL = 0.1
+
+
+class TrackerLock:
     """
-    Calculates coverage, updates the JSON tracker, saves to a text file, and 
-    returns the coverage text output.
+    Advisory lock on <tracker>.lock, held around a whole read-assign-write
+    cycle so overlapping runs on the same tracker take turns instead of
+    losing each other's counts. Retries until TRACKER_LOCK_TIMEOUT, then
+    raises TimeoutError.
     """
-    outputString = f"Date: {date}\n"
-    
-    if os.path.exists(coverage_tracker_json) and os.path.getsize(coverage_tracker_json) > 0:
+
+    def __init__(self, tracker_path, timeout=None):
+        self.lock_path = os.path.splitext(str(tracker_path))[0] + '.lock'
+        self.timeout = timeout
+        self._file = None
+
+    def __enter__(self):
+        timeout = TRACKER_LOCK_TIMEOUT if self.timeout is None else self.timeout
+        deadline = time.monotonic() + timeout
+        self._file = open(self.lock_path, 'a+b')
+        while True:
+            try:
+                if sys.platform == "win32":
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    raise TimeoutError(
+                        f"The coverage tracker is in use by another run and stayed locked for {timeout:g}s. "
+                        "Please try again once the other run has finished."
+                    )
+                time.sleep(TRACKER_LOCK_RETRY_INTERVAL)
+
+    def __exit__(self, *exc_info):
         try:
-            with open(coverage_tracker_json, 'r') as f:
-                coverage_data = json.load(f)
+            if sys.platform == "win32":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+def _write_file_atomic(path, text):
+    """Writes via a temp file, fsyncs it and renames it over `path`, so readers see old or new, never torn."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    if sys.platform != "win32":
+        # Make the rename itself durable
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+# Snapshot format version; bump when the snapshot layout changes
+TRACKER_SNAPSHOT_VERSION = 4
+# Journal events past the snapshot before it is rewritten
+JOURNAL_COMPACT_EVENTS = 500
+
+
+class CoverageTracker:
+    """
+    Coverage history kept as an append-only JSON-lines journal of events plus
+    a compacted snapshot of per-teacher counts. Loading reads the snapshot and
+    only the journal tail written after it; saving only appends the new events.
+
+    Files sit next to the legacy tracker path they are named after, e.g.
+    coverage_tracker.json -> coverage_tracker.journal.jsonl and
+    coverage_tracker.snapshot.json. A legacy coverage_tracker.json found with
+    no journal is migrated once; it is left in place but no longer updated.
+
+    Journal events:
+        {"event": "register", "teacher": name, "times_covered": base}
+        {"event": "run", "date": ..., "covers": n}
+        {"event": "cover", "date": ..., "teacher": name, "covered_for": ..., "period": ..., "duty": ...}
+        {"event": "unfilled", "date": ..., "covered_for": ..., "period": ...}
+        {"event": "undo", "date": ...}
+        {"event": "carry", "date": ..., "teacher": name, "covered": n}
+    Registration order is the tracker order used to break ties. "duty" is
+    the slot a cover came from ('standard', 'iss' or 'other'; absent on older
+    events) and "unfilled" records a period no one was free for. Each run's
+    n cover and unfilled events follow its "run" header, and the tracker keeps the byte offsets of
+    every date's headers (saved in the snapshot), so undoing a date reads back
+    only that date's entries. An "undo" cancels every run recorded for its
+    date before it. Per-date, per-teacher counts are kept alongside (also in
+    the snapshot) for the windowed fairness metrics; "carry" events restore
+    them for archived dates (see archive_before). Once decay_scores() has
+    been asked for a half-life, each teacher's running decayed score is
+    updated with every count and kept in the snapshot as well.
+    """
+
+    def __init__(self, tracker_path):
+        self.path = str(tracker_path)
+        base = os.path.splitext(self.path)[0]
+        self.journal_path = base + '.journal.jsonl'
+        self.snapshot_path = base + '.snapshot.json'
+        self.counts = {}            # {name: times_covered}, in tracker order
+        self._journal_end = 0       # Byte offset just past the last complete event
+        self._tail_events = 0       # Events applied on top of the snapshot
+        self._runs = {}             # {date: [byte offsets of its "run" headers]}
+        self._run_left = 0          # Events still expected for the run being replayed
+        self.daily = {}             # {date: {name: entries that day}}
+        self.decay = {}             # {name: (decayed score, as-of date)} for decay_half_life
+        self.decay_half_life = None
+        self._decay_rebuilt = False # Rebuilt for a new half-life; saved with the next snapshot
+        self._pending = []
+        self._pending_covers = []
+
+    def load(self):
+        """Loads counts from the snapshot plus the journal tail, migrating a legacy file first."""
+        if not os.path.exists(self.journal_path) and os.path.exists(self.path):
+            self._migrate_legacy()
+
+        self.counts, self._journal_end, self._tail_events, self._runs = {}, 0, 0, {}
+        self._run_left, self.daily = 0, {}
+        self.decay, self.decay_half_life = {}, None
+        snapshot = self._read_snapshot()
+        if snapshot:
+            self.counts = dict(snapshot['times_covered'])
+            self._journal_end = snapshot['journal_size']
+            self._runs = {date: list(offsets) for date, offsets in snapshot['runs'].items()}
+            self.daily = {date: dict(day) for date, day in snapshot['daily'].items()}
+            self.decay = {name: tuple(state) for name, state in snapshot['decay'].items()}
+            self.decay_half_life = snapshot['decay_half_life']
+        self._read_journal(self._journal_end, self._apply)
+        return self
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            if snapshot.get('version') != TRACKER_SNAPSHOT_VERSION:
+                return None
+            if snapshot['journal_size'] > os.path.getsize(self.journal_path):
+                # The journal was replaced or cut short; rebuild from it instead
+                return None
+            return snapshot
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _read_journal(self, offset, apply):
+        """Applies complete events from `offset` on; a torn final line is left for the next append."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    print(f"Warning: Skipping unreadable line in {self.journal_path}.")
+                    continue
+                apply(event, offset - len(line))
+        self._journal_end = max(self._journal_end, offset)
+
+    def _apply(self, event, offset):
+        name = event.get('teacher')
+        if event.get('event') == 'register':
+            self.counts.setdefault(name, event.get('times_covered', 0))
+        elif event.get('event') == 'cover':
+            self._count_cover(str(event.get('date')), name)
+            if self._run_left:
+                self._run_left -= 1
+            else:
+                # Written before runs had headers; index the entry on its own
+                self._runs.setdefault(str(event.get('date')), []).append(offset)
+        elif event.get('event') == 'unfilled':
+            self._run_left = max(self._run_left - 1, 0)
+        elif event.get('event') == 'run':
+            self._runs.setdefault(str(event.get('date')), []).append(offset)
+            self._run_left = event.get('covers', 0)
+        elif event.get('event') == 'undo':
+            self._roll_back(str(event.get('date')))
+        elif event.get('event') == 'carry':
+            date = str(event.get('date'))
+            day = self.daily.setdefault(date, {})
+            day[name] = day.get(name, 0) + event.get('covered', 0)
+            self._add_decay(name, date, event.get('covered', 0))
+        self._tail_events += 1
+
+    def _count_cover(self, date, name):
+        self.counts[name] = self.counts.get(name, 0) + 1
+        day = self.daily.setdefault(date, {})
+        day[name] = day.get(name, 0) + 1
+        self._add_decay(name, date, 1)
+
+    def _add_decay(self, name, date, entries):
+        if self.decay_half_life:
+            _decay_add(self.decay, name, date, entries, self.decay_half_life)
+
+    def _run_events(self, offset):
+        """Reads back the events of the run (or lone cover) that starts at `offset`."""
+        events = []
+        with open(self.journal_path, 'rb') as f:
+            f.seek(offset)
+            header = json.loads(f.readline())
+            if header.get('event') == 'cover':
+                return [header]
+            while len(events) < header.get('covers', 0):
+                line = f.readline()
+                if not line.endswith(b'\n'):
+                    break
+                if line.strip():
+                    events.append(json.loads(line))
+        return events
+
+    def _roll_back(self, date):
+        """Takes back the counts of every indexed run for `date`; returns how many covers that was."""
+        rolled_back = 0
+        for name, entries in self.daily.pop(date, {}).items():
+            self._add_decay(name, date, -entries)
+        for offset in self._runs.pop(date, []):
+            for event in self._run_events(offset):
+                if event.get('event') != 'cover':
+                    continue
+                name = event.get('teacher')
+                self.counts[name] = self.counts.get(name, 0) - 1
+                rolled_back += 1
+        return rolled_back
+
+    def iter_events(self):
+        """
+        Streams the journal's cover and unfilled events still in effect, oldest
+        first, with registrations and carried daily counts. Only reports and
+        exports need this; load() materializes counts alone, so a run's cost
+        stays flat as history grows.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        # Offsets of the runs still indexed; covers from undone runs are skipped
+        live_runs = {offset for offsets in self._runs.values() for offset in offsets}
+        run_left, run_is_live = 0, False
+        with open(self.journal_path, 'rb') as f:
+            offset = 0
+            for line in f:
+                start, offset = offset, offset + len(line)
+                if not line.endswith(b'\n') or not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                kind = event.get('event')
+                if kind == 'run':
+                    run_left, run_is_live = event.get('covers', 0), start in live_runs
+                elif kind in ('cover', 'unfilled'):
+                    if run_left:
+                        run_left -= 1
+                        if run_is_live:
+                            yield event
+                    elif start in live_runs:
+                        yield event
+                elif kind in ('register', 'carry'):
+                    yield event
+
+    def has_run(self, date):
+        """True if coverage entries are recorded for `date`."""
+        return bool(self._runs.get(str(date)))
+
+    def daily_counts(self, start_date=None, end_date=None):
+        """Yields (date, name, entries) per teacher per date, within inclusive ISO date bounds."""
+        for date, day in self.daily.items():
+            if (start_date is None or date >= start_date) and (end_date is None or date <= end_date):
+                for name, entries in day.items():
+                    yield date, name, entries
+
+    def decay_scores(self, half_life_days):
+        """
+        Each teacher's running decayed score as {name: (score, as-of date)}.
+        Kept up to date as covers are recorded and undone; rebuilt from the
+        per-date counts only when the half-life changes.
+        """
+        if half_life_days != self.decay_half_life:
+            self.decay, self.decay_half_life = _rebuild_decay(self.daily_counts(), half_life_days), half_life_days
+            self._decay_rebuilt = True
+        return self.decay
+
+    def coverage_log(self, teacher_name):
+        """A teacher's coverage_log entries ({'date', 'covered_for', 'period'}), oldest first."""
+        return [
+            {'date': event.get('date'), 'covered_for': event.get('covered_for'), 'period': event.get('period')}
+            for event in self.iter_events()
+            if event.get('event') == 'cover' and event.get('teacher') == teacher_name
+        ]
+
+    def register(self, names):
+        """Adds teachers not yet tracked, at the end of the tracker order."""
+        for name in names:
+            if name not in self.counts:
+                self.counts[name] = 0
+                self._pending.append({'event': 'register', 'teacher': name, 'times_covered': 0})
+
+    def record(self, date, teacher, covered_for, period, duty=None):
+        """Counts one covered period for `teacher`; `duty` is the slot it came from."""
+        self._count_cover(str(date), teacher)
+        event = {
+            'event': 'cover',
+            'date': date,
+            'teacher': teacher,
+            'covered_for': covered_for,
+            'period': period,
+        }
+        if duty:
+            event['duty'] = duty
+        self._pending_covers.append(event)
+
+    def record_unfilled(self, date, covered_for, period):
+        """Notes a period no one was free to cover; counts are unchanged."""
+        self._pending_covers.append({'event': 'unfilled', 'date': date, 'covered_for': covered_for, 'period': period})
+
+    def undo_date(self, date):
+        """
+        Rolls back every coverage entry recorded for `date`, reading only that
+        date's runs. Returns the number of entries rolled back; the undo is
+        written by the next save().
+        """
+        date = str(date)
+        if not self._runs.get(date):
+            return 0
+        self._pending.append({'event': 'undo', 'date': date})
+        return self._roll_back(date)
+
+    def save(self):
+        """Appends pending events and rewrites the snapshot once the tail is long enough."""
+        events = list(self._pending)
+        runs = {}
+        for event in self._pending_covers:
+            runs.setdefault(str(event['date']), []).append(event)
+        headers = []
+        for date, covers in runs.items():
+            headers.append(len(events))
+            events.append({'event': 'run', 'date': date, 'covers': len(covers)})
+            events.extend(covers)
+        if events:
+            offsets = self._append(events)
+            for i in headers:
+                self._runs.setdefault(events[i]['date'], []).append(offsets[i])
+            self._tail_events += len(events)
+            self._pending, self._pending_covers = [], []
+        if self._tail_events >= JOURNAL_COMPACT_EVENTS or self._decay_rebuilt or not os.path.exists(self.snapshot_path):
+            self.compact()
+
+    def _append(self, events):
+        """Appends events durably and returns the byte offset each one was written at."""
+        lines = [(json.dumps(event) + '\n').encode('utf-8') for event in events]
+        with open(self.journal_path, 'ab') as f:
+            offset = f.tell()
+            if offset > self._journal_end:
+                # Start on a fresh line after a torn write
+                lines.insert(0, b'\n')
+            offsets = []
+            for line in lines:
+                offsets.append(offset)
+                offset += len(line)
+            f.write(b''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+            self._journal_end = f.tell()
+        return offsets[-len(events):]
+
+    def compact(self):
+        """Writes the current counts as the snapshot covering the whole journal."""
+        snapshot = {
+            'version': TRACKER_SNAPSHOT_VERSION,
+            'journal_size': self._journal_end,
+            'times_covered': self.counts,
+            'runs': self._runs,
+            'daily': self.daily,
+            'decay': self.decay,
+            'decay_half_life': self.decay_half_life,
+        }
+        _write_file_atomic(self.snapshot_path, json.dumps(snapshot))
+        self._tail_events, self._decay_rebuilt = 0, False
+
+    def _migrate_legacy(self):
+        """One-time conversion of a coverage_tracker.json into journal events."""
+        self._journal_end = 0
+        self._append(list(_legacy_tracker_events(self.path)))
+        self.counts, self._tail_events, self._runs, self.daily = {}, 0, {}, {}
+        self._read_journal(0, self._apply)
+        self.compact()
+
+    def archive_before(self, cutoff, carry_from):
+        """
+        Drops cover and unfilled events dated before `cutoff` (ISO) once they
+        are archived: cover counts fold into each teacher's registered base,
+        and daily counts from `carry_from` on are kept as "carry" events. The
+        journal is rewritten with what stays live and the snapshot rebuilt
+        from it.
+        """
+        live = {}
+        live_counts = {}
+        for event in self.iter_events():
+            if event.get('event') in ('cover', 'unfilled') and not _is_closed_date(event.get('date'), cutoff):
+                live.setdefault(str(event.get('date')), []).append(event)
+                if event['event'] == 'cover':
+                    live_counts[event['teacher']] = live_counts.get(event['teacher'], 0) + 1
+
+        events = [{'event': 'register', 'teacher': name, 'times_covered': count - live_counts.get(name, 0)}
+                  for name, count in self.counts.items()]
+        for date, day in sorted(self.daily.items()):
+            if carry_from <= date and _is_closed_date(date, cutoff):
+                events.extend({'event': 'carry', 'date': date, 'teacher': name, 'covered': covered}
+                              for name, covered in day.items())
+        for date, covers in live.items():
+            events.append({'event': 'run', 'date': date, 'covers': len(covers)})
+            events.extend(covers)
+
+        # Without the snapshot a crash below just rebuilds from whichever journal is in place
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+        _write_file_atomic(self.journal_path, ''.join(json.dumps(event) + '\n' for event in events))
+        # Archived covers still count towards the decayed scores, so those carry over as they are
+        decay, half_life = self.decay, self.decay_half_life
+        self.load()
+        self.decay, self.decay_half_life = decay, half_life
+        self.compact()
+
+    def covered_for(self, teacher_out_name, start_date=None, end_date=None):
+        """Cover events for an absent teacher, optionally within inclusive date bounds."""
+        return [
+            event for event in self.iter_events()
+            if event.get('event') == 'cover' and event.get('covered_for') == teacher_out_name
+            and (start_date is None or str(event.get('date')) >= start_date)
+            and (end_date is None or str(event.get('date')) <= end_date)
+        ]
+
+
+def _legacy_tracker_events(path):
+    """Yields journal events for a legacy coverage_tracker.json: registrations, then a run per date."""
+    legacy = {}
+    if os.path.getsize(path) > 0:
+        try:
+            with open(path, 'r') as f:
+                legacy = json.load(f)
         except json.JSONDecodeError:
-            coverage_data = {}
+            print(f"Warning: {path} is corrupt. Starting a new coverage history.")
+            legacy = {}
+
+    covers = []
+    for name, data in legacy.items():
+        log = data.get('coverage_log', [])
+        # Keep hand-edited counts: the base is whatever the log doesn't explain
+        yield {'event': 'register', 'teacher': name,
+               'times_covered': data.get('times_covered', 0) - len(log)}
+        for entry in log:
+            covers.append({'event': 'cover', 'date': entry.get('date'), 'teacher': name,
+                           'covered_for': entry.get('covered_for'), 'period': entry.get('period')})
+    covers.sort(key=lambda event: str(event['date']))
+    for date, run in itertools.groupby(covers, key=lambda event: str(event['date'])):
+        run = list(run)
+        yield {'event': 'run', 'date': date, 'covers': len(run)}
+        yield from run
+
+
+class SQLiteCoverageTracker:
+    """
+    Coverage history in a local SQLite database (WAL mode), with the same
+    interface as CoverageTracker. Day-to-day counts are read from per-teacher
+    running totals kept by triggers, so loading never touches coverage_log,
+    and coverage_log is indexed by teacher, date and covered_for so history
+    questions are indexed lookups. coverage_daily holds per-date, per-teacher
+    counts, also kept by triggers, for the windowed fairness metrics, and
+    coverage_unfilled the periods no one was free to cover. teachers also
+    keeps each teacher's running decayed score for the half-life in
+    tracker_settings, updated on save() (see decay_scores).
+
+    The database sits next to the tracker path it is named after, e.g.
+    coverage_tracker.json -> coverage_tracker.sqlite3. When it is first
+    created it imports the journal if there is one, else a legacy
+    coverage_tracker.json.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS teachers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            base_covered INTEGER NOT NULL DEFAULT 0,
+            covered INTEGER NOT NULL DEFAULT 0,
+            decay_score REAL NOT NULL DEFAULT 0,
+            decay_as_of TEXT
+        );
+        CREATE TABLE IF NOT EXISTS coverage_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT,
+            teacher TEXT NOT NULL,
+            covered_for TEXT,
+            period TEXT,
+            duty TEXT
+        );
+        CREATE INDEX IF NOT EXISTS coverage_log_teacher ON coverage_log (teacher);
+        CREATE INDEX IF NOT EXISTS coverage_log_date ON coverage_log (date);
+        CREATE INDEX IF NOT EXISTS coverage_log_covered_for ON coverage_log (covered_for, date);
+        CREATE TABLE IF NOT EXISTS coverage_daily (
+            date TEXT NOT NULL,
+            teacher TEXT NOT NULL,
+            covered INTEGER NOT NULL,
+            PRIMARY KEY (date, teacher)
+        );
+        CREATE TABLE IF NOT EXISTS coverage_unfilled (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT,
+            covered_for TEXT,
+            period TEXT
+        );
+        CREATE INDEX IF NOT EXISTS coverage_unfilled_date ON coverage_unfilled (date);
+        CREATE TABLE IF NOT EXISTS tracker_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    # teachers.covered is a running count of coverage_log rows, so loading never scans the log
+    COUNT_TRIGGERS = """
+        CREATE TRIGGER IF NOT EXISTS coverage_log_counted AFTER INSERT ON coverage_log BEGIN
+            UPDATE teachers SET covered = covered + 1 WHERE name = NEW.teacher;
+        END;
+        CREATE TRIGGER IF NOT EXISTS coverage_log_uncounted AFTER DELETE ON coverage_log BEGIN
+            UPDATE teachers SET covered = covered - 1 WHERE name = OLD.teacher;
+        END;
+        CREATE TRIGGER IF NOT EXISTS coverage_log_daily_counted AFTER INSERT ON coverage_log
+        WHEN NEW.date IS NOT NULL BEGIN
+            INSERT INTO coverage_daily (date, teacher, covered) VALUES (NEW.date, NEW.teacher, 1)
+            ON CONFLICT (date, teacher) DO UPDATE SET covered = covered + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS coverage_log_daily_uncounted AFTER DELETE ON coverage_log
+        WHEN OLD.date IS NOT NULL BEGIN
+            UPDATE coverage_daily SET covered = covered - 1 WHERE date = OLD.date AND teacher = OLD.teacher;
+            DELETE FROM coverage_daily WHERE date = OLD.date AND teacher = OLD.teacher AND covered <= 0;
+        END;
+    """
+    SCHEMA_VERSION = 4
+
+    def __init__(self, tracker_path):
+        self.path = str(tracker_path)
+        self.db_path = os.path.splitext(self.path)[0] + '.sqlite3'
+        self.counts = {}
+        self._pending_teachers = []
+        self._pending_covers = []
+        self._pending_unfilled = []
+        self._pending_undos = []
+        self.decay = {}             # {name: (decayed score, as-of date)} for decay_half_life
+        self.decay_half_life = None
+        self._decay_changed = set() # Teachers whose decayed score save() writes
+        self._decay_rebuilt = False # Rebuilt for a new half-life; save() replaces every score
+
+    def _connect(self):
+        is_new = not os.path.exists(self.db_path)
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(self.SCHEMA)
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version < self.SCHEMA_VERSION:
+            self._upgrade_schema(connection, version)
+        if is_new:
+            self._import_history(connection)
+        return connection
+
+    def _upgrade_schema(self, connection, version):
+        """Adds the running, per-date and decayed counts and duty column to databases created before them."""
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(teachers)")}
+        log_columns = {row[1] for row in connection.execute("PRAGMA table_info(coverage_log)")}
+        with connection:
+            if 'covered' not in columns:
+                connection.execute("ALTER TABLE teachers ADD COLUMN covered INTEGER NOT NULL DEFAULT 0")
+                connection.execute(
+                    "UPDATE teachers SET covered = (SELECT COUNT(*) FROM coverage_log WHERE teacher = teachers.name)"
+                )
+            if version < 2:
+                connection.execute("DELETE FROM coverage_daily")
+                connection.execute(
+                    "INSERT INTO coverage_daily (date, teacher, covered) SELECT date, teacher, COUNT(*) "
+                    "FROM coverage_log WHERE date IS NOT NULL GROUP BY date, teacher"
+                )
+            if 'duty' not in log_columns:
+                connection.execute("ALTER TABLE coverage_log ADD COLUMN duty TEXT")
+            if 'decay_score' not in columns:
+                connection.execute("ALTER TABLE teachers ADD COLUMN decay_score REAL NOT NULL DEFAULT 0")
+                connection.execute("ALTER TABLE teachers ADD COLUMN decay_as_of TEXT")
+            connection.executescript(self.COUNT_TRIGGERS)
+            connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _import_history(self, connection):
+        journal = CoverageTracker(self.path)
+        if os.path.exists(journal.journal_path):
+            events = journal.load().iter_events()
+        elif os.path.exists(self.path):
+            events = _legacy_tracker_events(self.path)
+        else:
+            return
+        with connection:
+            for event in events:
+                if event.get('event') == 'register':
+                    connection.execute("INSERT OR IGNORE INTO teachers (name, base_covered) VALUES (?, ?)",
+                                       (event['teacher'], event.get('times_covered', 0)))
+                elif event.get('event') == 'cover':
+                    connection.execute("INSERT OR IGNORE INTO teachers (name) VALUES (?)", (event['teacher'],))
+                    connection.execute(
+                        "INSERT INTO coverage_log (date, teacher, covered_for, period, duty) VALUES (?, ?, ?, ?, ?)",
+                        (event.get('date'), event['teacher'], event.get('covered_for'), event.get('period'),
+                         event.get('duty'))
+                    )
+                elif event.get('event') == 'unfilled':
+                    connection.execute(
+                        "INSERT INTO coverage_unfilled (date, covered_for, period) VALUES (?, ?, ?)",
+                        (event.get('date'), event.get('covered_for'), event.get('period'))
+                    )
+                elif event.get('event') == 'carry':
+                    connection.execute(
+                        "INSERT INTO coverage_daily (date, teacher, covered) VALUES (?, ?, ?) "
+                        "ON CONFLICT (date, teacher) DO UPDATE SET covered = covered + excluded.covered",
+                        (event['date'], event['teacher'], event.get('covered', 0))
+                    )
+
+    def load(self):
+        """Loads every teacher's times_covered, in tracker order, from the running counts."""
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT name, base_covered + covered, decay_score, decay_as_of FROM teachers ORDER BY id"
+            ).fetchall()
+            half_life = connection.execute(
+                "SELECT value FROM tracker_settings WHERE key = 'decay_half_life'"
+            ).fetchone()
+        finally:
+            connection.close()
+        self.counts = {name: count for name, count, _, _ in rows}
+        self.decay = {name: (score, as_of) for name, _, score, as_of in rows if as_of is not None}
+        self.decay_half_life = float(half_life[0]) if half_life else None
+        self._decay_changed, self._decay_rebuilt = set(), False
+        return self
+
+    def register(self, names):
+        """Adds teachers not yet tracked, at the end of the tracker order."""
+        for name in names:
+            if name not in self.counts:
+                self.counts[name] = 0
+                self._pending_teachers.append((name,))
+
+    def record(self, date, teacher, covered_for, period, duty=None):
+        """Counts one covered period for `teacher`; `duty` is the slot it came from."""
+        self.counts[teacher] = self.counts.get(teacher, 0) + 1
+        self._add_decay(teacher, date, 1)
+        self._pending_covers.append((date, teacher, covered_for, period, duty))
+
+    def _add_decay(self, name, date, entries):
+        if self.decay_half_life:
+            _decay_add(self.decay, name, date, entries, self.decay_half_life)
+            self._decay_changed.add(name)
+
+    def record_unfilled(self, date, covered_for, period):
+        """Notes a period no one was free to cover; counts are unchanged."""
+        self._pending_unfilled.append((date, covered_for, period))
+
+    def has_run(self, date):
+        """True if coverage entries are recorded for `date`."""
+        connection = self._connect()
+        try:
+            return any(
+                connection.execute(f"SELECT 1 FROM {table} WHERE date = ? LIMIT 1", (date,)).fetchone()
+                for table in ('coverage_log', 'coverage_unfilled')
+            )
+        finally:
+            connection.close()
+
+    def daily_counts(self, start_date=None, end_date=None):
+        """Yields (date, name, entries) per teacher per date, within inclusive ISO date bounds."""
+        where, params = "WHERE covered > 0", []
+        if start_date is not None:
+            where, params = where + " AND date >= ?", params + [start_date]
+        if end_date is not None:
+            where, params = where + " AND date <= ?", params + [end_date]
+        connection = self._connect()
+        try:
+            rows = connection.execute("SELECT date, teacher, covered FROM coverage_daily " + where, params).fetchall()
+        finally:
+            connection.close()
+        # Dates undone since the last save are still in the table
+        undone = {date for date, in self._pending_undos}
+        yield from (row for row in rows if row[0] not in undone)
+
+    def decay_scores(self, half_life_days):
+        """
+        Each teacher's running decayed score as {name: (score, as-of date)}.
+        Kept up to date as covers are recorded and undone; rebuilt from the
+        per-date counts only when the half-life changes.
+        """
+        if half_life_days != self.decay_half_life:
+            pending = ((date, teacher, 1) for date, teacher, *_ in self._pending_covers)
+            self.decay = _rebuild_decay(itertools.chain(self.daily_counts(), pending), half_life_days)
+            self.decay_half_life = half_life_days
+            self._decay_changed, self._decay_rebuilt = set(self.decay), True
+        return self.decay
+
+    def undo_date(self, date):
+        """
+        Rolls back every coverage entry recorded for `date` (an indexed lookup).
+        Returns the number of entries rolled back; the rows are deleted by the
+        next save().
+        """
+        if not self.has_run(date):
+            return 0
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT teacher, COUNT(*) FROM coverage_log WHERE date = ? GROUP BY teacher", (date,)
+            ).fetchall()
+        finally:
+            connection.close()
+        for teacher, entries in rows:
+            self.counts[teacher] = self.counts.get(teacher, 0) - entries
+            self._add_decay(teacher, date, -entries)
+        self._pending_undos.append((date,))
+        return sum(entries for _, entries in rows)
+
+    def save(self):
+        """Writes pending undos, teachers, coverage entries and decayed scores in one transaction."""
+        if not (self._pending_undos or self._pending_teachers or self._pending_covers or self._pending_unfilled
+                or self._decay_changed or self._decay_rebuilt):
+            return
+        connection = self._connect()
+        try:
+            with connection:
+                # The delete trigger takes the undone rows back out of the running counts
+                connection.executemany("DELETE FROM coverage_log WHERE date = ?", self._pending_undos)
+                connection.executemany("DELETE FROM coverage_unfilled WHERE date = ?", self._pending_undos)
+                connection.executemany("INSERT OR IGNORE INTO teachers (name) VALUES (?)", self._pending_teachers)
+                connection.executemany(
+                    "INSERT INTO coverage_log (date, teacher, covered_for, period, duty) VALUES (?, ?, ?, ?, ?)",
+                    self._pending_covers
+                )
+                connection.executemany(
+                    "INSERT INTO coverage_unfilled (date, covered_for, period) VALUES (?, ?, ?)",
+                    self._pending_unfilled
+                )
+                if self._decay_rebuilt:
+                    connection.execute("UPDATE teachers SET decay_score = 0, decay_as_of = NULL")
+                    connection.execute("INSERT OR REPLACE INTO tracker_settings (key, value) VALUES (?, ?)",
+                                       ('decay_half_life', str(self.decay_half_life)))
+                connection.executemany(
+                    "UPDATE teachers SET decay_score = ?, decay_as_of = ? WHERE name = ?",
+                    [(*self.decay[name], name) for name in self._decay_changed if name in self.decay]
+                )
+        finally:
+            connection.close()
+        self._decay_changed, self._decay_rebuilt = set(), False
+        self._pending_undos = []
+        self._pending_teachers = []
+        self._pending_covers = []
+        self._pending_unfilled = []
+
+    def _events(self, where="", params=()):
+        """Streams matching coverage_log rows as cover events, oldest first."""
+        connection = self._connect()
+        try:
+            cursor = connection.execute(
+                "SELECT date, teacher, covered_for, period, duty FROM coverage_log " + where + " ORDER BY id",
+                params
+            )
+            for date, teacher, covered_for, period, duty in cursor:
+                event = {'event': 'cover', 'date': date, 'teacher': teacher, 'covered_for': covered_for, 'period': period}
+                if duty:
+                    event['duty'] = duty
+                yield event
+        finally:
+            connection.close()
+
+    def _unfilled_events(self):
+        connection = self._connect()
+        try:
+            cursor = connection.execute("SELECT date, covered_for, period FROM coverage_unfilled ORDER BY id")
+            for date, covered_for, period in cursor:
+                yield {'event': 'unfilled', 'date': date, 'covered_for': covered_for, 'period': period}
+        finally:
+            connection.close()
+
+    def iter_events(self):
+        """
+        Streams every cover event, oldest first, then every unfilled event
+        (registrations are not stored as events).
+        """
+        yield from self._events()
+        yield from self._unfilled_events()
+
+    def coverage_log(self, teacher_name):
+        """A teacher's coverage_log entries ({'date', 'covered_for', 'period'}), oldest first."""
+        return [
+            {'date': event['date'], 'covered_for': event['covered_for'], 'period': event['period']}
+            for event in self._events("WHERE teacher = ?", (teacher_name,))
+        ]
+
+    def archive_before(self, cutoff, carry_from):
+        """
+        Deletes coverage_log and coverage_unfilled rows dated before `cutoff`
+        (ISO) once they are archived, in one transaction: their counts fold into base_covered and
+        only daily counts from `carry_from` on are kept.
+        """
+        closed = "date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]' AND date < ?"
+        connection = self._connect()
+        try:
+            with connection:
+                carried = connection.execute(
+                    "SELECT date, teacher, covered FROM coverage_daily WHERE date >= ? AND date < ?",
+                    (carry_from, cutoff)
+                ).fetchall()
+                connection.execute(
+                    "UPDATE teachers SET base_covered = base_covered + "
+                    f"(SELECT COUNT(*) FROM coverage_log WHERE teacher = teachers.name AND {closed})",
+                    (cutoff,)
+                )
+                # The delete triggers keep teachers.covered and coverage_daily in step
+                connection.execute(f"DELETE FROM coverage_log WHERE {closed}", (cutoff,))
+                connection.execute(f"DELETE FROM coverage_unfilled WHERE {closed}", (cutoff,))
+                connection.executemany(
+                    "INSERT OR REPLACE INTO coverage_daily (date, teacher, covered) VALUES (?, ?, ?)", carried
+                )
+                # Counts carried by an earlier archive have no log rows for the triggers to remove
+                connection.execute("DELETE FROM coverage_daily WHERE date < ?", (carry_from,))
+        finally:
+            connection.close()
+        self.load()
+
+    def covered_for(self, teacher_out_name, start_date=None, end_date=None):
+        """Cover events for an absent teacher, optionally within inclusive date bounds."""
+        where, params = "WHERE covered_for = ?", [teacher_out_name]
+        if start_date is not None:
+            where, params = where + " AND date >= ?", params + [start_date]
+        if end_date is not None:
+            where, params = where + " AND date <= ?", params + [end_date]
+        return list(self._events(where, params))
+
+
+# Coverage tracker backends selectable via TRACKER_BACKEND in config.json
+TRACKER_BACKENDS = {
+    'journal': CoverageTracker,
+    'sqlite': SQLiteCoverageTracker,
+}
+
+
+def open_coverage_tracker(tracker_path, backend=None):
+    """Returns a loaded tracker for `tracker_path` using the named backend (default 'journal')."""
+    if backend and backend not in TRACKER_BACKENDS:
+        print(f"Warning: Unknown tracker backend '{backend}'. Using 'journal'.")
+        backend = None
+    return TRACKER_BACKENDS[backend or 'journal'](tracker_path).load()
+
+
+# --- FAIRNESS METRICS ---
+
+# What the least-used ranking counts: every cover ever, the last N school
+# days, the current term, or an exponentially decayed score
+FAIRNESS_METRICS = ('all_time', 'rolling', 'term', 'decay')
+# Month the school year starts; 'term' counts from here when no TERM_STARTS apply
+SCHOOL_YEAR_START_MONTH = 8
+# Covers older than this many half-lives are left out of a 'decay' scan (each weighs < 0.1%)
+DECAY_HORIZON_HALF_LIVES = 10
+# 'decay' scores are integers in these units, so one cover today adds this much
+DECAY_SCORE_UNITS = 100
+
+
+def school_year_start(date):
+    """First day of the school year containing `date` (a datetime.date)."""
+    year = date.year if date.month >= SCHOOL_YEAR_START_MONTH else date.year - 1
+    return datetime.date(year, SCHOOL_YEAR_START_MONTH, 1)
+
+
+def _decay_add(decay, name, date, entries, half_life_days):
+    """
+    Adds `entries` covers on `date` (negative to take them back) to a running
+    decayed score in `decay` ({name: (score, as-of date)}). A cover after the
+    as-of date ages the score to it first: score * 2^(-days/half-life) + 1.
+    """
+    if not _ISO_DATE_PATTERN.match(str(date)):
+        return
+    score, as_of = decay.get(name, (0.0, date))
+    age = (datetime.date.fromisoformat(date) - datetime.date.fromisoformat(as_of)).days
+    if age >= 0:
+        score, as_of = score * 0.5 ** (age / half_life_days) + entries, date
     else:
-        coverage_data = {}
+        score += entries * 0.5 ** (-age / half_life_days)
+    # Taking every cover back can leave rounding dust
+    decay[name] = (score if score > 1e-9 else 0.0, as_of)
 
-    for name in teachers.keys():
-        if name not in coverage_data:
-            coverage_data[name] = {'times_covered': 0, 'coverage_log': []}
 
-    teachers_out = [name for name, teacher in teachers.items() if teacher.is_out]
+def _rebuild_decay(daily_counts, half_life_days):
+    """Running decayed scores built from (date, name, entries) counts."""
+    decay = {}
+    for date, name, entries in daily_counts:
+        _decay_add(decay, name, date, entries, half_life_days)
+    return decay
 
-    for teacher_out_name in teachers_out:
-        outputString += f"{teacher_out_name}:\n"
-        teacher_out_obj = teachers[teacher_out_name]
-
-        all_periods_to_cover_raw = []
-        # Filter periods based on time preference
-        filtered_periods = _filter_periods_by_time_preference(
-            teacher_out_obj.periods_need_covered,
-            teacher_out_obj.coverage_time_preference
-        )
-        for period in filtered_periods:
-            all_periods_to_cover_raw.append((period, False)) 
-        
-        # Filter CT periods based on time preference
-        filtered_ct_periods = _filter_periods_by_time_preference(
-            teacher_out_obj.periods_need_covered_CT,
-            teacher_out_obj.coverage_time_preference
-        )
-        for period in filtered_ct_periods:
-            all_periods_to_cover_raw.append((period, True)) 
-        
-        all_periods_to_cover = sort_periods(all_periods_to_cover_raw) 
 
-        for period, is_ct in all_periods_to_cover:
-            # Re-sort before each assignment to reflect updated coverage counts
-            sorted_available_teachers = sorted([
-                (name, data['times_covered']) for name, data in coverage_data.items()
-                if name not in teachers_out and name in teachers
-            ], key=lambda x: x[1])
+def fairness_scores(tracker, date, metric=None, window_days=60, term_starts=(), half_life_days=30):
+    """
+    Returns ({name: score}, step) for ranking teachers on `date` (ISO string),
+    in tracker order; `step` is what one more cover adds to a score. The
+    windowed metrics read the tracker's per-date counts for the window only,
+    never the coverage log, and covers after `date` are ignored. 'decay'
+    scales each teacher's running decayed score to `date`.
+    """
+    if metric and metric not in FAIRNESS_METRICS:
+        print(f"Warning: Unknown fairness metric '{metric}'. Using 'all_time'.")
+        metric = None
+    if not metric or metric == 'all_time':
+        return dict(tracker.counts), 1
+
+    day = datetime.date.fromisoformat(date)
+    scores = dict.fromkeys(tracker.counts, 0)
+    if metric == 'decay':
+        decay = tracker.decay_scores(half_life_days)
+        if any(as_of > date for _, as_of in decay.values()):
+            # Planning a date before later covers: sum the per-date counts up to it instead
+            horizon = day - datetime.timedelta(days=int(half_life_days * DECAY_HORIZON_HALF_LIVES))
+            weights = {}
+            for covered_on, name, entries in tracker.daily_counts(horizon.isoformat(), date):
+                if covered_on not in weights:
+                    age = (day - datetime.date.fromisoformat(covered_on)).days
+                    weights[covered_on] = 0.5 ** (age / half_life_days)
+                scores[name] = scores.get(name, 0) + entries * weights[covered_on]
+        else:
+            for name, (score, as_of) in decay.items():
+                age = (day - datetime.date.fromisoformat(as_of)).days
+                scores[name] = score * 0.5 ** (age / half_life_days)
+        return {name: round(score * DECAY_SCORE_UNITS) for name, score in scores.items()}, DECAY_SCORE_UNITS
+
+    if metric == 'rolling':
+        start = (pd.Timestamp(day) - pd.offsets.BDay(max(window_days, 1) - 1)).date()
+    else:
+        started = [datetime.date.fromisoformat(term) for term in term_starts
+                   if datetime.date.fromisoformat(term) <= day]
+        start = max(started) if started else school_year_start(day)
+    for _, name, entries in tracker.daily_counts(start.isoformat(), date):
+        scores[name] = scores.get(name, 0) + entries
+    return scores, 1
+
+
+# --- ARCHIVE ---
+
+ARCHIVE_MANIFEST_VERSION = 1
+_ISO_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}$')
+
+
+def _is_closed_date(date, cutoff):
+    """True for ISO dates before `cutoff`; other date values always stay live."""
+    return isinstance(date, str) and bool(_ISO_DATE_PATTERN.match(date)) and date < cutoff
+
+
+def _report_date(name):
+    """The date in a coverage_{date} report file name written by save_coverage_plan(), or None."""
+    stem, extension = os.path.splitext(name)
+    if stem.startswith('coverage_') and extension in {ext for _, ext in COVERAGE_RENDERERS.values()}:
+        return stem[len('coverage_'):]
+    return None
+
+
+def school_year_label(date):
+    """'2025-2026' for any ISO date in that school year."""
+    start = school_year_start(datetime.date.fromisoformat(date))
+    return f"{start.year}-{start.year + 1}"
+
+
+class CoverageArchive:
+    """
+    Closed school years of coverage history, as read-only, compressed segment
+    files (zip) plus a small manifest.json. A segment holds a school year's
+    cover and unfilled events (coverage.jsonl) and its daily coverage_{date}.txt reports
+    (reports/); archiving a year again later adds another part rather than
+    rewriting one. The archive sits next to the tracker path it is named
+    after, e.g. coverage_tracker.json -> coverage_tracker.archive/.
+    """
+
+    def __init__(self, tracker_path):
+        self.path = os.path.splitext(str(tracker_path))[0] + '.archive'
+        self.manifest_path = os.path.join(self.path, 'manifest.json')
+        self.archived_before = None     # School year start the last archiving run used
+        self.segments = []
+
+    def load(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            self.archived_before = manifest.get('archived_before')
+            self.segments = manifest['segments']
+        except FileNotFoundError:
+            self.archived_before, self.segments = None, []
+        return self
+
+    def save(self):
+        """Writes the manifest."""
+        os.makedirs(self.path, exist_ok=True)
+        manifest = {
+            'version': ARCHIVE_MANIFEST_VERSION,
+            'archived_before': self.archived_before,
+            'segments': self.segments,
+        }
+        _write_file_atomic(self.manifest_path, json.dumps(manifest, indent=4))
+
+    def archived_reports(self):
+        return {name for segment in self.segments for name in segment['reports']}
+
+    def add_segment(self, school_year, covers, reports, source):
+        """Writes one read-only segment for `school_year`; `reports` maps file names to text."""
+        os.makedirs(self.path, exist_ok=True)
+        parts = sum(segment['school_year'] == school_year for segment in self.segments)
+        file_name = f"{school_year}.zip" if not parts else f"{school_year}-{parts + 1}.zip"
+        segment_path = os.path.join(self.path, file_name)
+        temp_path = segment_path + '.tmp'
+        with zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('coverage.jsonl', ''.join(json.dumps(event) + '\n' for event in covers))
+            for name, text in sorted(reports.items()):
+                archive.writestr(f"reports/{name}", text)
+        with open(temp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, segment_path)
+        os.chmod(segment_path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+
+        dates = sorted(str(event['date']) for event in covers) or sorted(_report_date(name) for name in reports)
+        self.segments.append({
+            'file': file_name,
+            'school_year': school_year,
+            'first_date': dates[0],
+            'last_date': dates[-1],
+            'covers': sum(event['event'] == 'cover' for event in covers),
+            'reports': sorted(reports),
+            'source': source,
+        })
+
+    def _segments_between(self, start_date, end_date):
+        for segment in self.segments:
+            if (start_date is None or segment['last_date'] >= start_date) and \
+                    (end_date is None or segment['first_date'] <= end_date):
+                yield segment
+
+    def iter_events(self, start_date=None, end_date=None):
+        """Streams archived cover and unfilled events, reading only segments that overlap the date bounds."""
+        for segment in self._segments_between(start_date, end_date):
+            with zipfile.ZipFile(os.path.join(self.path, segment['file'])) as archive:
+                with archive.open('coverage.jsonl') as f:
+                    for line in f:
+                        event = json.loads(line)
+                        if (start_date is None or event['date'] >= start_date) and \
+                                (end_date is None or event['date'] <= end_date):
+                            yield event
+
+    def coverage_log(self, teacher_name):
+        """A teacher's archived coverage_log entries ({'date', 'covered_for', 'period'}), oldest first."""
+        return [
+            {'date': event['date'], 'covered_for': event['covered_for'], 'period': event['period']}
+            for event in self.iter_events() if event['event'] == 'cover' and event['teacher'] == teacher_name
+        ]
+
+    def covered_for(self, teacher_out_name, start_date=None, end_date=None):
+        """Archived cover events for an absent teacher, optionally within inclusive date bounds."""
+        return [event for event in self.iter_events(start_date, end_date)
+                if event['event'] == 'cover' and event['covered_for'] == teacher_out_name]
+
+    def report(self, date, extension='.txt'):
+        """The archived coverage_{date}.txt (or .csv/.json) text, or None."""
+        name = f"coverage_{date}{extension}"
+        for segment in self._segments_between(date, date):
+            if name in segment['reports']:
+                with zipfile.ZipFile(os.path.join(self.path, segment['file'])) as archive:
+                    return archive.read(f"reports/{name}").decode('utf-8')
+        return None
+
+
+def archive_carry_from(cutoff, window_days=60, half_life_days=30):
+    """
+    First date (ISO) whose daily counts fairness can still read once the
+    school year starting on `cutoff` is under way: the start of the
+    'rolling' window or of the 'decay' horizon, whichever reaches further back.
+    """
+    day = datetime.date.fromisoformat(cutoff)
+    rolling_start = (pd.Timestamp(day) - pd.offsets.BDay(max(window_days, 1) - 1)).date()
+    decay_start = day - datetime.timedelta(days=int(half_life_days * DECAY_HORIZON_HALF_LIVES))
+    return min(rolling_start, decay_start).isoformat()
+
+
+def archive_closed_years(coverage_tracker_json, tracker_backend=None, reports_dir=None, today=None,
+                         window_days=60, half_life_days=30):
+    """
+    Moves every school year that ended before `today`'s into the archive:
+    its cover events and coverage_{date}.txt reports (from `reports_dir`,
+    default APP_DATA_DIR) go into per-year segments, and the live tracker
+    keeps only the counts and the daily counts fairness still needs for
+    FAIRNESS_WINDOW_DAYS / FAIRNESS_HALF_LIFE_DAYS (see archive_carry_from).
+    Returns the school years archived. Once a school year has been handled this only
+    lists `reports_dir`, so it is cheap to call on every start. A run
+    interrupted before the tracker was updated is finished without
+    archiving its events twice.
+    """
+    cutoff = school_year_start(today or datetime.date.today()).isoformat()
+    carry_from = archive_carry_from(cutoff, window_days, half_life_days)
+    reports_dir = str(reports_dir or APP_DATA_DIR)
+
+    def closed_reports():
+        return [
+            name for name in os.listdir(reports_dir)
+            if _is_closed_date(_report_date(name), cutoff)
+        ]
+
+    if CoverageArchive(coverage_tracker_json).load().archived_before == cutoff and not closed_reports():
+        return []
+
+    with TrackerLock(coverage_tracker_json):
+        archive = CoverageArchive(coverage_tracker_json).load()
+        tracker = open_coverage_tracker(coverage_tracker_json, tracker_backend)
+        closed_covers = [event for event in tracker.iter_events()
+                         if event.get('event') in ('cover', 'unfilled') and _is_closed_date(event.get('date'), cutoff)]
+        archived_reports = archive.archived_reports()
+        report_names = closed_reports()
+
+        covers = closed_covers
+        source = hashlib.sha256(json.dumps(covers, sort_keys=True).encode('utf-8')).hexdigest()
+        if covers and any(segment['source'] == source for segment in archive.segments):
+            # Already written by a run that stopped before trimming the tracker
+            covers = []
+        years = {}
+        for event in covers:
+            years.setdefault(school_year_label(event['date']), ([], {}))[0].append(event)
+        for name in report_names:
+            if name not in archived_reports:
+                with open(os.path.join(reports_dir, name), 'r') as f:
+                    years.setdefault(school_year_label(_report_date(name)), ([], {}))[1][name] = f.read()
+        for school_year, (year_covers, reports) in sorted(years.items()):
+            archive.add_segment(school_year, year_covers, reports, source)
+        archive.archived_before = cutoff
+        archive.save()
+
+        if closed_covers:
+            tracker.archive_before(cutoff, carry_from)
+        for name in report_names:
+            os.remove(os.path.join(reports_dir, name))
+    return sorted(years)
+
+
+def _periods_to_cover(teacher_out_obj):
+    """Returns the absent teacher's (period, is_ct) pairs to cover, filtered and sorted."""
+    all_periods_to_cover_raw = []
+    # Filter periods based on time preference
+    filtered_periods = _filter_periods_by_time_preference(
+        teacher_out_obj.periods_need_covered,
+        teacher_out_obj.coverage_time_preference
+    )
+    for period in filtered_periods:
+        all_periods_to_cover_raw.append((period, False)) 
+    
+    # Filter CT periods based on time preference
+    filtered_ct_periods = _filter_periods_by_time_preference(
+        teacher_out_obj.periods_need_covered_CT,
+        teacher_out_obj.coverage_time_preference
+    )
+    for period in filtered_ct_periods:
+        all_periods_to_cover_raw.append((period, True)) 
+    
+    return sort_periods(all_periods_to_cover_raw)
 
+
+def _assign_greedy(teachers, teachers_out, available_queue, evenDay, masks=None, free_index=None):
+    """
+    Covers each absent teacher's periods in turn with the least-used free teacher.
+    Returns {teacher_out_name: [(period, is_ct, assigned_name, iss_covered, otherDuty_covered)]}.
+    """
+    plan = {}
+    for teacher_out_name in teachers_out:
+        lines = plan[teacher_out_name] = []
+        for period, is_ct in _periods_to_cover(teachers[teacher_out_name]):
             if '/' in period:
                 period1, period2 = period.split('/')
                 assigned_teacher_name, iss_covered, otherDuty_covered = find_and_assign(
-                    period1, teachers, sorted_available_teachers, coverage_data, evenDay, period2
+                    period1, teachers, available_queue, None, evenDay, period2,
+                    masks=masks, free_index=free_index
                 )
             else:
                 assigned_teacher_name, iss_covered, otherDuty_covered = find_and_assign(
-                    period, teachers, sorted_available_teachers, coverage_data, evenDay
+                    period, teachers, available_queue, None, evenDay,
+                    masks=masks, free_index=free_index
                 )
-            
             if assigned_teacher_name:
-                duty_tag = ""
-                if iss_covered:
-                    duty_tag = " (Close ISS)"
-                elif otherDuty_covered: 
-                    duty_tag = " (OTHER DUTY)"
-                
-                # Check if this period was originally CT (either from CT list or converted CT)
-                is_converted_ct = hasattr(teacher_out_obj, 'converted_ct_periods') and period in teacher_out_obj.converted_ct_periods
-                period_display = f"{period} (CT)" if (is_ct or is_converted_ct) else period
-                outputString += f"   {period_display} {assigned_teacher_name}{duty_tag}\n"
-
-                coverage_data[assigned_teacher_name]['times_covered'] += 1
-                new_log_entry = {
-                    'date': date,
-                    'covered_for': teacher_out_name,
-                    'period': period
-                }
-                coverage_data[assigned_teacher_name]['coverage_log'].append(new_log_entry)
+                available_queue.increment(assigned_teacher_name)
+            lines.append((period, is_ct, assigned_teacher_name, iss_covered, otherDuty_covered))
+    return plan
+
+
+# --- OPTIMAL ASSIGNMENT (MIN-COST FLOW) ---
+
+# Wall-clock limit for the 'optimal' engine; past it the best plan found so far is used
+OPTIMAL_TIME_BUDGET = 10.0
+
+# Duty tiers in order of preference, as find_and_assign tries them
+COVERAGE_TIERS = ('standard', 'iss', 'other')
+
+
+class _MinCostFlow:
+    """
+    Min-cost max-flow by successive shortest paths with integer costs: Dijkstra
+    with potentials finds the current shortest distance, then a blocking flow
+    is pushed along every arc that lies on some shortest path before searching
+    again, so teachers with equal costs are filled in one phase.
+    """
+
+    def __init__(self):
+        self.graph = []
+
+    def add_node(self):
+        self.graph.append([])
+        return len(self.graph) - 1
+
+    def add_edge(self, u, v, cap, cost):
+        """Adds an arc and returns a handle for flow_on()."""
+        self.graph[u].append([v, cap, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return u, len(self.graph[u]) - 1
+
+    def flow_on(self, handle):
+        u, i = handle
+        v, _, _, rev = self.graph[u][i]
+        return self.graph[v][rev][1]
+
+    def solve(self, source, sink, deadline=None):
+        """
+        Pushes as much flow as possible at minimum cost (all costs must start
+        non-negative). Returns (flow, cost), or None if the deadline passes.
+        """
+        graph = self.graph
+        potential = [0] * len(graph)
+        flow = cost = 0
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            dist = [None] * len(graph)
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                for v, cap, arc_cost, _ in graph[u]:
+                    if cap <= 0:
+                        continue
+                    nd = d + arc_cost + potential[u] - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+            if dist[sink] is None:
+                return flow, cost
+            for node, d in enumerate(dist):
+                if d is not None:
+                    potential[node] += d
+            pushed, pushed_cost = self._blocking_flow(source, sink, potential)
+            flow += pushed
+            cost += pushed_cost
+
+    def _blocking_flow(self, source, sink, potential):
+        """Saturates the arcs with zero reduced cost, layered so the search stays acyclic."""
+        graph = self.graph
+        level = [-1] * len(graph)
+        level[source] = 0
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for u in frontier:
+                for v, cap, arc_cost, _ in graph[u]:
+                    if cap > 0 and level[v] < 0 and arc_cost + potential[u] - potential[v] == 0:
+                        level[v] = level[u] + 1
+                        next_frontier.append(v)
+            frontier = next_frontier
+
+        next_arc = [0] * len(graph)
+        flow = cost = 0
+        path = []
+        u = source
+        while True:
+            if u == sink:
+                push = min(graph[w][i][1] for w, i in path)
+                for w, i in path:
+                    arc = graph[w][i]
+                    arc[1] -= push
+                    graph[arc[0]][arc[3]][1] += push
+                    cost += push * arc[2]
+                flow += push
+                path = []
+                u = source
+                continue
+            edges = graph[u]
+            while next_arc[u] < len(edges):
+                v, cap, arc_cost, _ = edges[next_arc[u]]
+                if cap > 0 and level[v] == level[u] + 1 and arc_cost + potential[u] - potential[v] == 0:
+                    break
+                next_arc[u] += 1
+            if next_arc[u] < len(edges):
+                path.append((u, next_arc[u]))
+                u = edges[next_arc[u]][0]
+            elif path:
+                # Dead end: drop the node and retreat
+                level[u] = -1
+                u, _ = path.pop()
+                next_arc[u] += 1
+            else:
+                return flow, cost
+
+
+class _OptimalCoverage:
+    """
+    Solves the whole day at once: fill as many periods as possible, then
+    prefer the standard > ISS > other-duty tiers, then spread coverage as
+    evenly as possible: each assignment costs the teacher's coverage count
+    so far, so the least used go first (ties lean to tracker order, like the
+    greedy engine).
+
+    Periods needing cover are grouped into keys ('3' or ('5', '6')); each key
+    sends its demand through (key, teacher, tier) arcs to the teachers, whose
+    outgoing arcs carry increasing per-assignment costs. A split period must
+    take the same teacher for both halves, which a flow cannot express, so
+    the flow is a relaxation: each split gets its own arc capped by the
+    teacher's spare copies of both halves, and overlaps with single periods
+    are resolved by branch-and-bound (forbid the split on that teacher, or
+    fix it there). The greedy plan is the starting incumbent, so hitting
+    the time budget never does worse than greedy.
+    """
+
+    def __init__(self, teachers, teachers_out, available_queue, evenDay):
+        self.teachers = teachers
+        self.teachers_out = teachers_out
+        self.evenDay = evenDay
+        self.queue = available_queue
+        self.names = [name for name, _ in available_queue]
+        self.index = _FreeTeacherIndex(teachers, self.names, evenDay)
+
+        self.demands = [
+            (teacher_out_name, period, is_ct)
+            for teacher_out_name in teachers_out
+            for period, is_ct in _periods_to_cover(teachers[teacher_out_name])
+        ]
+        self.demand_counts = {}
+        for _, period, _ in self.demands:
+            key = self.key(period)
+            self.demand_counts[key] = self.demand_counts.get(key, 0) + 1
+        self.total_demand = len(self.demands)
+
+        # Integer weights that make the objective lexicographic: tier first, then fairness
+        max_count = max((count for _, count in available_queue), default=0)
+        self.tier_weight = (max_count + self.total_demand * available_queue.step + 1) * self.total_demand + 1
+
+        # Candidate (cost, tracker order, name, tier) entries per key, best first
+        self.entries = {}
+        for key in self.demand_counts:
+            entries = []
+            for tier_rank, tier in enumerate(COVERAGE_TIERS):
+                for name in self.index.free_teachers(tier, self.key_periods(key)):
+                    entries.append((tier_rank * self.tier_weight + self.fairness(name, 0),
+                                    self.queue.rank(name)[1], name, tier))
+            entries.sort()
+            self.entries[key] = entries
+
+    @staticmethod
+    def key(period):
+        return tuple(period.split('/')) if '/' in period else period
+
+    @staticmethod
+    def key_periods(key):
+        return key if isinstance(key, tuple) else (key,)
+
+    def fairness(self, name, units_before):
+        """
+        Cost of a teacher's next assignment after `units_before` today: convex in
+        the count. Ties between equally used teachers are left to candidate
+        order (tracker order), which keeps equal costs together in one phase.
+        """
+        count, _ = self.queue.rank(name)
+        return count + units_before * self.queue.step
+
+    def tier_cost(self, tier):
+        return COVERAGE_TIERS.index(tier) * self.tier_weight
+
+    def objective(self, assignments):
+        """(unfilled, cost) for a list of (key, name, tier) assignments; lower is better."""
+        cost = 0
+        units = {}
+        for _, name, tier in assignments:
+            cost += self.tier_cost(tier) + self.fairness(name, units.get(name, 0))
+            units[name] = units.get(name, 0) + 1
+        return self.total_demand - len(assignments), cost
+
+    def solve_node(self, forbidden, fixed, deadline):
+        """
+        Solves the flow relaxation with `forbidden` (key, name, tier) arcs removed
+        and `fixed` split assignments made. Returns (objective, assignments, conflict)
+        where conflict is None when the relaxation is feasible, or None on timeout.
+        """
+        used = {}
+        fixed_units = {}
+        remaining = dict(self.demand_counts)
+        for key, name, tier in fixed:
+            remaining[key] -= 1
+            fixed_units[name] = fixed_units.get(name, 0) + 1
+            for period in self.key_periods(key):
+                used[(name, tier, period)] = used.get((name, tier, period), 0) + 1
+
+        def spare(name, tier, period):
+            return self.index.copies(name, tier, period) - used.get((name, tier, period), 0)
+
+        network = _MinCostFlow()
+        source, sink = network.add_node(), network.add_node()
+        teacher_nodes = {}
+        teacher_caps = {}
+        arcs = []
+        for key, demand in remaining.items():
+            if demand <= 0:
+                continue
+            key_node = network.add_node()
+            network.add_edge(source, key_node, demand, 0)
+            # Only the best total_demand distinct teachers per key can matter: any
+            # assignment to a worse one could move to an idle one among those
+            distinct = set()
+            for _, _, name, tier in self.entries[key]:
+                if len(distinct) >= self.total_demand and name not in distinct:
+                    break
+                if (key, name, tier) in forbidden:
+                    continue
+                capacity = min(spare(name, tier, period) for period in self.key_periods(key))
+                if capacity <= 0:
+                    continue
+                distinct.add(name)
+                if name not in teacher_nodes:
+                    teacher_nodes[name] = network.add_node()
+                capacity = min(capacity, demand)
+                teacher_caps[name] = teacher_caps.get(name, 0) + capacity
+                arcs.append(((key, name, tier), network.add_edge(key_node, teacher_nodes[name], capacity, self.tier_cost(tier))))
+
+        for name, node in teacher_nodes.items():
+            before = fixed_units.get(name, 0)
+            for unit in range(min(teacher_caps[name], self.total_demand)):
+                network.add_edge(node, sink, 1, self.fairness(name, before + unit))
+
+        if network.solve(source, sink, deadline) is None:
+            return None
+
+        assignments = list(fixed)
+        usage = dict(used)
+        for arc, handle in arcs:
+            units = network.flow_on(handle)
+            assignments.extend([arc] * units)
+            key, name, tier = arc
+            for period in self.key_periods(key):
+                usage[(name, tier, period)] = usage.get((name, tier, period), 0) + units
+
+        conflict = None
+        for (name, tier, period), count in usage.items():
+            if count > self.index.copies(name, tier, period):
+                # Branch on a split using this slot (single periods alone stay within capacity)
+                for key, arc_name, arc_tier in assignments:
+                    if (arc_name, arc_tier) == (name, tier) and isinstance(key, tuple) \
+                            and period in key and (key, name, tier) not in fixed:
+                        conflict = (key, name, tier)
+                        break
+                if conflict:
+                    break
+        return self.objective(assignments), assignments, conflict
+
+    def solve(self, time_budget=None):
+        """Returns the plan in _assign_greedy's format."""
+        deadline = time.monotonic() + (OPTIMAL_TIME_BUDGET if time_budget is None else time_budget)
+
+        # The greedy plan (run on masks so the teacher lists stay untouched) is the incumbent
+        greedy_queue = _LeastUsedQueue(list(self.queue))
+        greedy_plan = _assign_greedy(
+            self.teachers, self.teachers_out, greedy_queue, self.evenDay,
+            masks=_AvailabilityMasks(self.teachers, self.evenDay),
+            free_index=_FreeTeacherIndex(self.teachers, self.names, self.evenDay)
+        )
+        best = self.plan_assignments(greedy_plan)
+        best_objective = self.objective(best)
+
+        timed_out = False
+        frontier = []
+        counter = itertools.count()
+        node = ((frozenset(), ()), self.solve_node(frozenset(), (), deadline))
+        while True:
+            (forbidden, fixed), result = node
+            if result is None:
+                timed_out = True
+                break
+            objective, assignments, conflict = result
+            if objective < best_objective:
+                if conflict is None:
+                    best, best_objective = assignments, objective
+                else:
+                    # Either the split never uses this teacher and tier, or it is fixed there
+                    heapq.heappush(frontier, (objective, next(counter), forbidden | {conflict}, fixed))
+                    heapq.heappush(frontier, (objective, next(counter), forbidden, fixed + (conflict,)))
+            if not frontier or frontier[0][0] >= best_objective:
+                break
+            _, _, forbidden, fixed = heapq.heappop(frontier)
+            node = ((forbidden, fixed), self.solve_node(forbidden, fixed, deadline))
+
+        if timed_out:
+            print(f"Warning: Optimal coverage hit its {OPTIMAL_TIME_BUDGET if time_budget is None else time_budget}s "
+                  "time budget. Using the best plan found so far.")
+        return self.build_plan(best)
+
+    def plan_assignments(self, plan):
+        """Turns a plan back into (key, name, tier) assignments."""
+        assignments = []
+        for lines in plan.values():
+            for period, _, name, iss_covered, otherDuty_covered in lines:
+                if name:
+                    tier = 'iss' if iss_covered else 'other' if otherDuty_covered else 'standard'
+                    assignments.append((self.key(period), name, tier))
+        return assignments
+
+    def build_plan(self, assignments):
+        """Hands each key's assigned teachers to its periods in order, best tier first."""
+        by_key = {}
+        for key, name, tier in assignments:
+            by_key.setdefault(key, []).append((COVERAGE_TIERS.index(tier), self.queue.rank(name), name, tier))
+        for units in by_key.values():
+            units.sort(reverse=True)
+
+        plan = {teacher_out_name: [] for teacher_out_name in self.teachers_out}
+        for teacher_out_name, period, is_ct in self.demands:
+            units = by_key.get(self.key(period))
+            if units:
+                _, _, name, tier = units.pop()
+                plan[teacher_out_name].append((period, is_ct, name, tier == 'iss', tier == 'other'))
+            else:
+                plan[teacher_out_name].append((period, is_ct, None, False, False))
+        return plan
+
+
+def _assign_optimal(teachers, teachers_out, available_queue, evenDay, time_budget=None):
+    """
+    Plans the day with _OptimalCoverage and claims the assigned periods from the
+    teacher lists. Returns the plan in _assign_greedy's format.
+    """
+    plan = _OptimalCoverage(teachers, teachers_out, available_queue, evenDay).solve(time_budget)
+    for lines in plan.values():
+        for period, _, name, iss_covered, otherDuty_covered in lines:
+            if name:
+                tier = 'iss' if iss_covered else 'other' if otherDuty_covered else 'standard'
+                _claim_periods(teachers[name], tier, period.split('/'), evenDay)
+                available_queue.increment(name)
+    return plan
+
+
+# --- COVERAGE PLAN ---
+
+# One period that needed cover. `teacher` and `duty` are None when nobody could take it;
+# `is_ct` is set for CT periods, including ones converted to regular coverage.
+CoverageAssignment = collections.namedtuple('CoverageAssignment', 'covered_for period is_ct teacher duty')
+
+
+class CoveragePlan:
+    """
+    The day's coverage as data: the absent teachers in order and one
+    CoverageAssignment per period, grouped by absent teacher. The renderers
+    below turn it into text, CSV or JSON; plans compare equal when they
+    assign the same periods the same way.
+    """
+    def __init__(self, date, absent, assignments):
+        self.date = date
+        self.absent = tuple(absent)
+        self.assignments = tuple(assignments)
+
+    def __iter__(self):
+        return iter(self.assignments)
+
+    def __len__(self):
+        return len(self.assignments)
+
+    def __eq__(self, other):
+        if not isinstance(other, CoveragePlan):
+            return NotImplemented
+        return (self.date, self.absent, self.assignments) == (other.date, other.absent, other.assignments)
+
+    def __hash__(self):
+        return hash((self.date, self.absent, self.assignments))
+
+    def for_teacher(self, teacher_out_name):
+        """The absent teacher's assignments, in period order."""
+        return [assignment for assignment in self.assignments if assignment.covered_for == teacher_out_name]
+
+    def unfilled(self):
+        """Assignments nobody could take."""
+        return [assignment for assignment in self.assignments if assignment.teacher is None]
+
+
+# Duty tags shown after the covering teacher in the text output
+_DUTY_TAGS = {'iss': ' (Close ISS)', 'other': ' (OTHER DUTY)'}
+
+# Columns of the CSV output, in CoverageAssignment order after the date
+COVERAGE_CSV_COLUMNS = ['date', 'covered_for', 'period', 'ct', 'teacher', 'duty']
+
+
+def render_coverage_text(plan):
+    """The plain-text output shown in the results window and saved as coverage_{date}.txt."""
+    lines = [f"Date: {plan.date}\n"]
+    by_teacher = {name: [] for name in plan.absent}
+    for assignment in plan.assignments:
+        by_teacher.setdefault(assignment.covered_for, []).append(assignment)
+    for teacher_out_name, assignments in by_teacher.items():
+        lines.append(f"{teacher_out_name}:\n")
+        for assignment in assignments:
+            period_display = f"{assignment.period} (CT)" if assignment.is_ct else assignment.period
+            if assignment.teacher:
+                lines.append(f"   {period_display} {assignment.teacher}{_DUTY_TAGS.get(assignment.duty, '')}\n")
             else:
-                period_display = f"{period} (CT)" if is_ct else period
-                outputString += f"   {period_display} No available teacher\n"
+                lines.append(f"   {period_display} No available teacher\n")
+    return "".join(lines)
 
-    with open(coverage_tracker_json, 'w') as f:
-        json.dump(coverage_data, f, indent=4)
 
-    # Save coverage output to app data directory
-    output_file = APP_DATA_DIR / f"coverage_{date}.txt"
-    with open(output_file, 'w') as f:
-        f.write(outputString)
+def render_coverage_csv(plan):
+    """One row per period: date, covered_for, period, ct, teacher and duty (both blank when unfilled)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(COVERAGE_CSV_COLUMNS)
+    for assignment in plan.assignments:
+        writer.writerow([plan.date, assignment.covered_for, assignment.period, int(assignment.is_ct),
+                         assignment.teacher or '', assignment.duty or ''])
+    return buffer.getvalue()
 
-    return outputString
+
+def render_coverage_json(plan):
+    """The plan as a JSON document with the date, the absent teachers and the assignments."""
+    return json.dumps({
+        'date': plan.date,
+        'absent': list(plan.absent),
+        'assignments': [assignment._asdict() for assignment in plan.assignments],
+    }, indent=2)
+
+
+def parse_coverage_json(text):
+    """Reads a render_coverage_json() document back into a CoveragePlan."""
+    document = json.loads(text)
+    return CoveragePlan(document['date'], document['absent'],
+                        [CoverageAssignment(**assignment) for assignment in document['assignments']])
+
+
+def copy_coverage_to_clipboard(plan, renderer=render_coverage_text):
+    """Puts the rendered plan on the clipboard; needs a running DearPyGui context."""
+    dpg.set_clipboard_text(renderer(plan))
+
+
+COVERAGE_RENDERERS = {
+    'text': (render_coverage_text, '.txt'),
+    'csv': (render_coverage_csv, '.csv'),
+    'json': (render_coverage_json, '.json'),
+}
+
+
+def save_coverage_plan(plan, formats=('text',), output_dir=None):
+    """
+    Writes the plan as coverage_{date}.txt/.csv/.json in `output_dir`
+    (default: the app data directory), one file per format. Returns the paths.
+    """
+    output_dir = Path(output_dir) if output_dir else APP_DATA_DIR
+    written = []
+    for output_format in formats:
+        if output_format not in COVERAGE_RENDERERS:
+            print(f"Warning: Unknown coverage output format '{output_format}'. Skipping it.")
+            continue
+        renderer, extension = COVERAGE_RENDERERS[output_format]
+        output_file = output_dir / f"coverage_{plan.date}{extension}"
+        with open(output_file, 'w', newline='') as f:
+            f.write(renderer(plan))
+        written.append(str(output_file))
+    return written
+
+
+def plan_coverage(teachers, date, scores, evenDay, engine=None, step=1):
+    """
+    Assigns the absent teachers' periods and returns the CoveragePlan. `scores`
+    is {name: usage score} in tracker order, as from fairness_scores(); the
+    assigned periods are claimed from the teachers' lists, but nothing is
+    recorded or written. `engine` is one of ASSIGNMENT_ENGINES (default 'lists').
+    """
+    if isinstance(teachers, ScheduleModel):
+        teachers = teachers.teachers
+    if engine and engine not in ASSIGNMENT_ENGINES:
+        print(f"Warning: Unknown assignment engine '{engine}'. Using 'lists'.")
+        engine = 'lists'
+
+    teachers_out = [name for name, teacher in teachers.items() if teacher.is_out]
+    teachers_out_set = set(teachers_out)
+    # Built once in tracker order (the tie-break order) and updated per assignment
+    available_queue = _LeastUsedQueue(
+        ((name, score) for name, score in scores.items() if name not in teachers_out_set and name in teachers),
+        step=step
+    )
+
+    if engine == 'optimal':
+        plan = _assign_optimal(teachers, teachers_out, available_queue, evenDay)
+    else:
+        # The bitmask engine tests availability itself; the list engine looks candidates up in the free index
+        masks = _AvailabilityMasks(teachers, evenDay) if engine == 'bitmask' else None
+        free_index = _FreeTeacherIndex(teachers, [name for name, _ in available_queue], evenDay) if masks is None else None
+        plan = _assign_greedy(teachers, teachers_out, available_queue, evenDay, masks=masks, free_index=free_index)
+        if masks is not None:
+            masks.write_back(teachers)
+
+    assignments = []
+    for teacher_out_name in teachers_out:
+        converted_ct = getattr(teachers[teacher_out_name], 'converted_ct_periods', ())
+        for period, is_ct, assigned_teacher_name, iss_covered, otherDuty_covered in plan[teacher_out_name]:
+            duty = None
+            if assigned_teacher_name:
+                duty = 'iss' if iss_covered else 'other' if otherDuty_covered else 'standard'
+                # A converted co-taught period is only marked once someone covers it
+                is_ct = is_ct or period in converted_ct
+            assignments.append(CoverageAssignment(teacher_out_name, period, is_ct, assigned_teacher_name, duty))
+    return CoveragePlan(date, teachers_out, assignments)
+
+
+def record_coverage_plan(tracker, plan):
+    """Records each covered and unfilled period of the plan with the tracker (saved by the caller)."""
+    for assignment in plan.assignments:
+        if assignment.teacher:
+            tracker.record(plan.date, assignment.teacher, assignment.covered_for, assignment.period, assignment.duty)
+        else:
+            tracker.record_unfilled(plan.date, assignment.covered_for, assignment.period)
+
+
+def determineCoverage(teachers, date, coverage_tracker_json, evenDay, engine=None, tracker_backend=None,
+                      fairness_metric=None, fairness_options=None, record=True):
+    """
+    Plans the day's coverage against the tracker's counts, records it in the
+    tracker and returns the CoveragePlan. With record=False nothing is saved.
+    The coverage_{date} files are left to the caller (save_coverage_plan or a
+    BackgroundWriter). `teachers` may be the teacher dict or the
+    ScheduleModel that owns it. `engine` is one of ASSIGNMENT_ENGINES
+    (default 'lists'). 'lists' and 'bitmask' make the same greedy assignments;
+    'optimal' plans the whole day at once and can fill periods greedy misses.
+    `tracker_backend` is one of TRACKER_BACKENDS (default 'journal').
+    `fairness_metric` is one of FAIRNESS_METRICS (default 'all_time'), with
+    `fairness_options` passed on to fairness_scores(). Re-running a date
+    replaces the entries recorded for it before instead of counting them twice.
+    """
+    if isinstance(teachers, ScheduleModel):
+        teachers = teachers.teachers
+
+    # Held from reading the counts to appending the day's entries, so overlapping runs take turns
+    with TrackerLock(coverage_tracker_json):
+        tracker = open_coverage_tracker(coverage_tracker_json, tracker_backend)
+        # Roll back an earlier run for this date first so the new plan sees the corrected counts
+        rolled_back = tracker.undo_date(date)
+        if rolled_back:
+            print(f"Replacing {rolled_back} coverage entries already recorded for {date}.")
+        tracker.register(teachers.keys())
+
+        scores, step = fairness_scores(tracker, date, fairness_metric, **(fairness_options or {}))
+        plan = plan_coverage(teachers, date, scores, evenDay, engine, step)
+        if record:
+            record_coverage_plan(tracker, plan)
+            tracker.save()
+    return plan
+
+
+def determineCoverage_and_save(teachers, date, coverage_tracker_json, evenDay, engine=None, tracker_backend=None,
+                               fairness_metric=None, fairness_options=None):
+    """
+    Calculates and records coverage with determineCoverage(), saves it to
+    coverage_{date}.txt in the app data directory, and returns the text.
+    """
+    plan = determineCoverage(teachers, date, coverage_tracker_json, evenDay, engine, tracker_backend,
+                             fairness_metric, fairness_options)
+    save_coverage_plan(plan)
+    return render_coverage_text(plan)
+
+class BackgroundWriter:
+    """
+    Writes the coverage_{date} files of recorded plans on a worker thread so
+    the results window can open as soon as a plan is made. The tracker is
+    not touched here: determineCoverage() records the plan under the same
+    lock hold that read the counts it was planned against. Each job is
+    written to `queue_dir` (default <app data>/pending_writes) before it is
+    queued and deleted once its files are written, so a crash or a failed
+    write leaves it to be replayed the next time a writer starts. Only the
+    newest job for a date is kept. `on_result(job_path, error)` is called
+    from the worker after each job, with error None on success. close() (also run
+    at exit) waits for queued jobs.
+    """
+
+    def __init__(self, queue_dir=None, on_result=None):
+        self.queue_dir = Path(queue_dir) if queue_dir else APP_DATA_DIR / "pending_writes"
+        self.queue_dir.mkdir(parents=True, exist_ok=True)
+        self.on_result = on_result
+        self.completed = {}  # {job path: error message or None} for finished jobs
+        self._jobs = queue.Queue()
+        self._sequence = itertools.count()
+        self._thread = threading.Thread(target=self._run, name="coverage-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        # Replay jobs an earlier run queued but never finished, oldest first; a date's
+        # older jobs were overtaken by its newest and are dropped instead
+        latest = {}
+        for job_path in sorted(self.queue_dir.glob('*.json')):
+            latest[self._job_date(job_path)] = job_path
+        for job_path in sorted(self.queue_dir.glob('*.json')):
+            if latest[self._job_date(job_path)] == job_path:
+                self._jobs.put(job_path)
+            else:
+                self._remove_job(job_path)
+
+    @staticmethod
+    def _job_date(job_path):
+        # Job files are named <time>-<sequence>-<date>.json
+        return job_path.stem.split('-', 2)[-1]
+
+    @staticmethod
+    def _remove_job(job_path):
+        try:
+            os.remove(job_path)
+        except FileNotFoundError:
+            pass
+
+    def discard(self, date):
+        """Drops the jobs still pending for `date`; their files are not written. Returns how many."""
+        stale = [job_path for job_path in self.queue_dir.glob(f'*-{date}.json') if self._job_date(job_path) == date]
+        for job_path in stale:
+            self._remove_job(job_path)
+        return len(stale)
+
+    def submit(self, plan, formats=('text',), output_dir=None):
+        """
+        Durably queues save_coverage_plan() for the plan and returns the job
+        file's path. Jobs still pending for the same date are dropped first.
+        """
+        job = {
+            'plan': json.loads(render_coverage_json(plan)),
+            'formats': list(formats or ('text',)),
+            'output_dir': str(output_dir) if output_dir else None,
+        }
+        self.discard(plan.date)
+        job_path = self.queue_dir / f"{time.time_ns():020d}-{next(self._sequence):04d}-{plan.date}.json"
+        _write_file_atomic(str(job_path), json.dumps(job))
+        self._jobs.put(job_path)
+        return job_path
+
+    def _run(self):
+        while True:
+            job_path = self._jobs.get()
+            try:
+                if job_path is None:
+                    return
+                self._persist(job_path)
+            finally:
+                self._jobs.task_done()
+
+    def _persist(self, job_path):
+        date = self._job_date(job_path)
+        try:
+            with open(job_path, 'r') as f:
+                job = json.load(f)
+        except FileNotFoundError:
+            # Dropped by discard() since it was queued
+            return
+        try:
+            save_coverage_plan(parse_coverage_json(json.dumps(job['plan'])), job['formats'], job['output_dir'])
+            self._remove_job(job_path)
+        except Exception as e:
+            message = (f"Could not save coverage for {date}: {e}. "
+                       f"It is kept in {self.queue_dir} and will be saved the next time the app starts.")
+            print(f"Warning: {message}")
+            error = message
+        else:
+            error = None
+        self.completed[job_path] = error
+        if self.on_result:
+            self.on_result(job_path, error)
+
+    def wait(self):
+        """Blocks until every queued job has been saved or has failed."""
+        self._jobs.join()
+
+    def close(self):
+        """Waits for queued jobs, then stops the worker. Safe to call more than once."""
+        if self._thread.is_alive():
+            self._jobs.put(None)
+            self._thread.join()
+        atexit.unregister(self.close)
+
+
+# --- LIVE PREVIEW ---
+
+# Seconds the preview waits after the last change before re-planning
+PREVIEW_DEBOUNCE_SECONDS = 0.3
+
+
+class PreviewCancelled(Exception):
+    """Raised inside preview_coverage() when a newer preview request makes this one stale."""
+
+
+def _dry_run_teachers(teachers, selected, time_preferences):
+    """
+    Copies of the teachers, with their period lists copied too, marked out
+    (with time preferences) as in the GUI. The engine claims periods from
+    these lists, so the originals stay ready for the real run.
+    """
+    copies = {}
+    for name, teacher in teachers.items():
+        twin = copy.copy(teacher)
+        for attribute, value in vars(teacher).items():
+            if isinstance(value, list):
+                setattr(twin, attribute, list(value))
+        twin.is_out = name in selected
+        twin.coverage_time_preference = time_preferences.get(name) if twin.is_out else None
+        copies[name] = twin
+    return copies
+
+
+def preview_coverage(schedule, date, selected, time_preferences, evenDay, coverage_tracker_json, engine=None,
+                     tracker_backend=None, fairness_metric=None, fairness_options=None, cancelled=None):
+    """
+    Dry run of the submit path for the live preview: marks `selected` out on
+    copies of the schedule's teachers, runs check_coteachers and plans against
+    the tracker's current counts, with the date's earlier run rolled back in
+    memory. Returns the CoveragePlan; nothing is recorded or saved. Raises
+    PreviewCancelled between steps once cancelled() is true.
+    """
+    def check_cancelled():
+        if cancelled is not None and cancelled():
+            raise PreviewCancelled()
+
+    teachers = _dry_run_teachers(schedule.teachers, selected, time_preferences)
+    check_cancelled()
+    check_coteachers(teachers, schedule)
+    # Opening can migrate or import history on first use, so it waits its turn like a run;
+    # the rollback and registration below are in memory only and never saved
+    with TrackerLock(coverage_tracker_json):
+        tracker = open_coverage_tracker(coverage_tracker_json, tracker_backend)
+    tracker.undo_date(date)
+    tracker.register(teachers.keys())
+    scores, step = fairness_scores(tracker, date, fairness_metric, **(fairness_options or {}))
+    check_cancelled()
+    return plan_coverage(teachers, date, scores, evenDay, engine, step)
+
+
+class CoveragePreviewer:
+    """
+    Re-plans on a worker thread as the GUI's selections change. request() is
+    cheap enough to call on every click: the worker waits until
+    PREVIEW_DEBOUNCE_SECONDS pass without a newer request and then plans only
+    the latest one. A run overtaken by a newer request is cancelled or its
+    plan dropped, so `on_result(request, plan, error)` only ever sees the
+    newest request. It is called from the worker thread.
+    """
+
+    # Marks "no request waiting"; None is a real request (nothing to plan)
+    _NO_REQUEST = object()
+
+    def __init__(self, compute, on_result, debounce=None):
+        self._compute = compute       # compute(request, cancelled) -> CoveragePlan
+        self._on_result = on_result
+        self._debounce = PREVIEW_DEBOUNCE_SECONDS if debounce is None else debounce
+        self._condition = threading.Condition()
+        self._latest = self._NO_REQUEST  # Newest request not yet picked up
+        self._generation = 0          # Bumped per request; a run is stale once it moves on
+        self._requested_at = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="coverage-preview", daemon=True)
+        self._thread.start()
+
+    def request(self, request):
+        """Asks for a preview of `request`, replacing any not yet started."""
+        with self._condition:
+            self._latest = request
+            self._generation += 1
+            self._requested_at = time.monotonic()
+            self._condition.notify()
+
+    def _next_request(self):
+        """Waits for a request to go quiet for the debounce interval; None once closed."""
+        with self._condition:
+            while not self._closed:
+                if self._latest is self._NO_REQUEST:
+                    self._condition.wait()
+                    continue
+                remaining = self._requested_at + self._debounce - time.monotonic()
+                if remaining <= 0:
+                    request, self._latest = self._latest, self._NO_REQUEST
+                    return request, self._generation
+                self._condition.wait(remaining)
+            return None
+
+    def _run(self):
+        while True:
+            next_request = self._next_request()
+            if next_request is None:
+                return
+            request, generation = next_request
+            is_stale = lambda: self._closed or self._generation != generation
+            try:
+                plan, error = self._compute(request, is_stale), None
+            except PreviewCancelled:
+                continue
+            except Exception as e:
+                plan, error = None, f"{type(e).__name__}: {e}"
+            if not is_stale():
+                self._on_result(request, plan, error)
+
+    def close(self):
+        """Stops the worker without waiting; a run in progress finishes but its result is dropped."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+
+def undo_coverage_run(date, coverage_tracker_json, tracker_backend=None, writer=None):
+    """
+    Removes every coverage entry recorded for `date` from the tracker and
+    returns how many were removed. The date's coverage text file is kept.
+    Pass the app's BackgroundWriter so files it has not written yet for the
+    date are dropped rather than written after the undo.
+    """
+    if writer is not None:
+        writer.discard(date)
+    with TrackerLock(coverage_tracker_json):
+        tracker = open_coverage_tracker(coverage_tracker_json, tracker_backend)
+        rolled_back = tracker.undo_date(date)
+        tracker.save()
+    return rolled_back
 
 def display_fatal_error_gui(error_message):
-    dpg.create_context()
-    
-    dpg.set_global_font_scale(2.0)
-            
-    dpg.create_viewport(title='Critical Error', width=600, height=250)
+    items_before = begin_screen()
     
-    with dpg.window(label="Error", modal=True, no_resize=True, no_close=True, width=600, height=250):
+    with dpg.window(tag="fatal_error_window", label="Error", no_resize=True, no_close=True, width=600, height=250):
         dpg.add_text("A critical error occurred during schedule file loading.", color=(255, 100, 100, 255))
         dpg.add_spacer(height=10)
         dpg.add_text(error_message, wrap=550)
         dpg.add_spacer(height=10)
         dpg.add_button(label="Exit Application", callback=lambda: dpg.stop_dearpygui(), width=-1)
         
-    dpg.setup_dearpygui()
-    dpg.show_viewport()
-    dpg.start_dearpygui()
-    dpg.destroy_context()
+    run_screen("fatal_error_window", 'Critical Error', 600, 250, items_before)
 
-def display_results_gui(results_text, date):
+def display_results_gui(results, date, writer=None, job=None):
     """
     Displays the coverage results in a new DearPyGui window with modern theme.
+    `results` is the CoveragePlan, or a message when no plan was made. When
+    `job` (from BackgroundWriter.submit) is saving the plan's files, a status
+    line shows when that job is done or warns if it failed.
     """
-    dpg.create_context()
-    dpg.set_global_font_scale(1.5) 
+    plan = results if isinstance(results, CoveragePlan) else None
+    results_text = render_coverage_text(plan) if plan else results
+    items_before = begin_screen()
 
-    # Modern theme for results window
-    with dpg.theme(tag="results_modern_theme"):
-        with dpg.theme_component(dpg.mvAll):
-            dpg.add_theme_color(dpg.mvThemeCol_WindowBg, (15, 23, 42, 255))
-            dpg.add_theme_color(dpg.mvThemeCol_Text, (241, 245, 249, 255))
-            dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (30, 41, 59, 255))
-            dpg.add_theme_color(dpg.mvThemeCol_Button, (14, 165, 233, 255))
-            dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (56, 189, 248, 255))
-            dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (2, 132, 199, 255))
-            dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 8)
-            dpg.add_theme_style(dpg.mvStyleVar_WindowRounding, 12)
-            dpg.add_theme_style(dpg.mvStyleVar_WindowPadding, 20, 20)
-
-    def copy_results_to_clipboard():
-        dpg.set_clipboard_text(dpg.get_value("results_text_output"))
+    def copy_results_to_clipboard(sender, app_data, renderer):
+        if plan:
+            copy_coverage_to_clipboard(plan, renderer)
+        else:
+            dpg.set_clipboard_text(dpg.get_value("results_text_output"))
         with dpg.window(label="Copied", modal=True, no_resize=True, no_close=True, width=250) as popup:
             dpg.add_text("Results copied to clipboard!")
             dpg.add_button(label="OK", callback=lambda: dpg.delete_item(popup))
             
-    dpg.create_viewport(title=f'Coverage Results - {date}', width=650, height=800)
-    
     with dpg.window(tag="results_window", label="Coverage Results", no_move=True, no_resize=True, no_title_bar=True, pos=(0, 0), width=650, height=800):
         dpg.add_text("✓ Coverage Calculated Successfully!", color=(52, 211, 153, 255))
+        if writer is not None and job is not None:
+            dpg.add_text("Saving coverage...", tag="results_save_status", color=(148, 163, 184, 255), wrap=600)
         dpg.add_spacer(height=15)
         
         # Results in a card-like container
@@ -1156,25 +4221,66 @@ def display_results_gui(results_text, date):
         dpg.add_spacer(height=15)
 
         with dpg.group(horizontal=True):
-            copy_btn = dpg.add_button(label="Copy to Clipboard", callback=copy_results_to_clipboard, width=300)
+            copy_btn = dpg.add_button(label="Copy to Clipboard", callback=copy_results_to_clipboard,
+                                      user_data=render_coverage_text, width=195)
             dpg.bind_item_theme(copy_btn, "secondary_btn_theme")
             dpg.add_spacer(width=10)
-            close_btn = dpg.add_button(label="Close and Exit", callback=lambda: dpg.stop_dearpygui(), width=300)
+            # Spreadsheet-friendly copy for pasting into the front-office sheet
+            copy_csv_btn = dpg.add_button(label="Copy as CSV", callback=copy_results_to_clipboard,
+                                          user_data=render_coverage_csv, width=195, enabled=plan is not None)
+            dpg.bind_item_theme(copy_csv_btn, "secondary_btn_theme")
+            dpg.add_spacer(width=10)
+            close_btn = dpg.add_button(label="Close and Exit", callback=lambda: dpg.stop_dearpygui(), width=195)
             dpg.bind_item_theme(close_btn, "primary_btn_theme")
 
+    def show_save_result(saved_job, error):
+        if saved_job != job or not dpg.does_item_exist("results_save_status"):
+            return
+        if error:
+            dpg.set_value("results_save_status", f"Warning: {error}")
+            dpg.configure_item("results_save_status", color=(248, 113, 113, 255))
+        else:
+            dpg.set_value("results_save_status", "Coverage saved.")
+            dpg.configure_item("results_save_status", color=(52, 211, 153, 255))
+
+    if writer is not None and job is not None:
+        # Called from the writer's thread; the job may also have finished before the window existed
+        writer.on_result = show_save_result
+        if job in writer.completed:
+            show_save_result(job, writer.completed[job])
+
     dpg.bind_item_theme("results_window", "results_modern_theme")
-    dpg.set_primary_window("results_window", True)
-    dpg.setup_dearpygui()
-    dpg.show_viewport()
-    dpg.start_dearpygui()
-    dpg.destroy_context()
+    run_screen("results_window", f'Coverage Results - {date}', 650, 800, items_before, font_scale=1.5)
+    if writer is not None:
+        writer.on_result = None
 
 def main():
     
     # --- Reworked main loop to handle file path setting ---
     
-    # This loop ensures the app re-runs if the user selects a new file path 
-    # from the main GUI's "Change Schedule File" button.
+    # Saves tracker updates and coverage files off the UI thread; replays any an earlier run didn't finish
+    writer = BackgroundWriter()
+
+    # Roll any school year that has ended into the archive before the tracker is read
+    config = load_config()
+    try:
+        archive_closed_years(str(APP_DATA_DIR / "coverage_tracker.json"), config.get("TRACKER_BACKEND"),
+                             window_days=config.get("FAIRNESS_WINDOW_DAYS"),
+                             half_life_days=config.get("FAIRNESS_HALF_LIFE_DAYS"))
+    except TimeoutError as e:
+        print(f"Warning: Closed school years were not archived this time. {e}")
+
+    # All screens share one DearPyGui context and viewport. This loop re-runs
+    # the file selection when the chosen schedule can't be read.
+    try:
+        run_app(writer)
+    finally:
+        stop_gui()
+        # Don't exit with the day's coverage unsaved
+        writer.close()
+
+
+def run_app(writer):
     while True:
         # 1. Get the schedule file path (from config or user selection)
         schedule_file_path, initial_error = get_initial_file_path()
@@ -1184,45 +4290,64 @@ def main():
             print(f"Exiting application: {initial_error}")
             return
 
-        if not schedule_file_path:
+        if not schedule_file_path or gui_closed():
             # Should not happen if get_initial_file_path works correctly, but safe guard.
             return
 
         # 2. Initialize the application object with the (potentially new) path
-        app = TeacherCoverageApp(schedule_file_path)
-        
+        app = TeacherCoverageApp(schedule_file_path, writer=writer)
+
+        # 3. Run the main input GUI; it parses the schedule in the background
+        app.create_gui()
+
+        if gui_closed():
+            # The user closed the main window
+            return
+
         if app.critical_error_message:
             # Error reading the file at the chosen path
             display_fatal_error_gui(app.critical_error_message)
+            if gui_closed():
+                return
             # After showing the error, the user must re-select the file, 
             # so the loop continues to get_initial_file_path()
             continue 
 
-        # 3. Run the main input GUI
-        app.create_gui()
-
-        # If the user changed the schedule file, loop to reload with the new path
-        if app.file_changed:
-            continue
-
         # Check if the user closed the main GUI (app.date will be empty)
         if not app.date:
             return
 
         # 4. Run coverage logic
-        check_coteachers(app.teacherObjects, schedule_file_path)
+        check_coteachers(app.teacherObjects, app.schedule_model)
 
         # Use app data directory for coverage tracker
         coverage_file = str(APP_DATA_DIR / "coverage_tracker.json")
-        coverage_results_text = determineCoverage_and_save(app.teacherObjects, app.date, coverage_file, app.evenDay)
-
-        # 5. Display the results in a new GUI window
-        display_results_gui(coverage_results_text, app.date)
+        config = load_config()
+        try:
+            coverage_results = determineCoverage(
+                app.schedule_model, app.date, coverage_file, app.evenDay,
+                engine=config.get("ASSIGNMENT_ENGINE"), tracker_backend=config.get("TRACKER_BACKEND"),
+                fairness_metric=config.get("FAIRNESS_METRIC"),
+                fairness_options={
+                    'window_days': config.get("FAIRNESS_WINDOW_DAYS"),
+                    'term_starts': config.get("TERM_STARTS"),
+                    'half_life_days': config.get("FAIRNESS_HALF_LIFE_DAYS"),
+                }
+            )
+            # Recorded above under the tracker lock; only the coverage files are written while the results show
+            save_job = writer.submit(coverage_results, config.get("OUTPUT_FORMATS"))
+        except TimeoutError as e:
+            # Another run held the tracker the whole time; nothing was assigned or saved
+            print(f"Error: {e}")
+            coverage_results = f"Date: {app.date}\nCoverage was not calculated.\n{e}\n"
+            save_job = None
+
+        # 5. Display the results in the same window
+        display_results_gui(coverage_results, app.date, writer, save_job)
         
-        # If the app reaches here, it means the user submitted data and viewed results. 
-        # Since display_results_gui() ends with dpg.stop_dearpygui() (Exit), the program returns here.
-        # We break the main loop to exit the program completely.
-        break 
+        # If the app reaches here, the user submitted data and viewed results;
+        # the results screen's Exit (or closing the window) ends the program.
+        return
 
 
 if __name__ == "__main__":
@@ -4,10 +4,17 @@ Test fixtures and utilities for Valley Teacher Coverage App tests
 
 import pytest
 import pandas as pd
+import glob
 import tempfile
 import os
 from main import Teacher, add_ordinal_suffix
 
+@pytest.fixture(autouse=True)
+def isolated_schedule_cache(tmp_path, monkeypatch):
+    """Keep the parsed-schedule cache out of the real app data directory"""
+    import main
+    monkeypatch.setattr(main, 'SCHEDULE_CACHE_FILENAME', str(tmp_path / 'schedule_cache.pickle'))
+
 @pytest.fixture
 def sample_schedule_df():
     """Create a sample schedule DataFrame for testing"""
@@ -60,8 +67,9 @@ def temp_coverage_tracker():
     temp_file.write('{}')
     temp_file.close()
     yield temp_file.name
-    # Cleanup
-    os.unlink(temp_file.name)
+    # Cleanup, including the journal and snapshot the tracker writes alongside
+    for path in glob.glob(os.path.splitext(temp_file.name)[0] + '*'):
+        os.unlink(path)
 
 @pytest.fixture
 def mock_gui_app():
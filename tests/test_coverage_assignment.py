@@ -171,3 +171,322 @@ class TestCoverageEdgeCases:
             
         finally:
             os.unlink(temp_file.name)
+
+class TestLeastUsedQueue:
+    """Test the incremental least-used ordering"""
+    
+    def test_matches_stable_sort(self):
+        """Test queue order matches re-sorting after every assignment"""
+        import random
+        from main import _LeastUsedQueue
+        
+        rng = random.Random(7)
+        counts = {f'Teacher {i}': rng.randint(0, 4) for i in range(40)}
+        queue = _LeastUsedQueue(counts.items())
+        
+        for _ in range(200):
+            expected = sorted(counts.items(), key=lambda x: x[1])
+            assert list(queue) == expected
+            name = rng.choice(expected[:5])[0]
+            counts[name] += 1
+            queue.increment(name)
+    
+    def test_ties_break_by_tracker_order(self, temp_coverage_tracker):
+        """Test equal counts are assigned in tracker order, then rotate"""
+        import json
+        with open(temp_coverage_tracker, 'w') as f:
+            json.dump({
+                'Teacher C': {'times_covered': 0, 'coverage_log': []},
+                'Teacher B': {'times_covered': 0, 'coverage_log': []},
+            }, f)
+        teachers = {
+            'Teacher A': Teacher('Teacher A', ['1', '2', '3']),
+            'Teacher B': Teacher('Teacher B', []),
+            'Teacher C': Teacher('Teacher C', []),
+        }
+        teachers['Teacher B'].periods_available = ['1', '2', '3']
+        teachers['Teacher C'].periods_available = ['1', '2', '3']
+        teachers['Teacher A'].is_out = True
+        
+        result = determineCoverage_and_save(teachers, '2026-02-20', temp_coverage_tracker, False)
+        
+        assert '   1 Teacher C\n' in result
+        assert '   2 Teacher B\n' in result
+        assert '   3 Teacher C\n' in result
+
+class TestBitmaskEngine:
+    """Test the bitmask assignment engine against the list-based one"""
+    
+    def _run(self, engine, evenDay, tracker):
+        teachers = {
+            'Teacher A': Teacher('Teacher A', ['1', '5/6', '9']),
+            'Teacher B': Teacher('Teacher B', []),
+            'Teacher C': Teacher('Teacher C', []),
+            'Teacher D': Teacher('Teacher D', []),
+        }
+        teachers['Teacher A'].is_out = True
+        teachers['Teacher B'].periods_available = ['1', '5']
+        teachers['Teacher B'].evenDayPeriods_available = ['6']
+        teachers['Teacher C'].periods_available = ['5', '6', '9']
+        teachers['Teacher C'].oddDayPeriods_available = ['1']
+        # Listed twice by two duty cells: list.remove only drops one copy
+        teachers['Teacher D'].iss_periods_available = ['9', '9']
+        teachers['Teacher D'].otherDutyPeriods_available = ['1']
+        
+        result = determineCoverage_and_save(teachers, '2026-02-20', tracker, evenDay, engine=engine)
+        lists = {name: (t.periods_available, t.evenDayPeriods_available, t.oddDayPeriods_available,
+                        t.iss_periods_available, t.otherDutyPeriods_available)
+                 for name, t in teachers.items()}
+        return result, lists
+    
+    @pytest.mark.parametrize("evenDay", [True, False])
+    def test_same_assignments_as_lists(self, tmp_path, evenDay):
+        """Test both engines produce the same output and leave the same availability"""
+        expected = self._run('lists', evenDay, str(tmp_path / 'lists_tracker.json'))
+        assert self._run('bitmask', evenDay, str(tmp_path / 'bitmask_tracker.json')) == expected
+    
+    def test_masks_decide_availability(self, tmp_path, monkeypatch):
+        """Test the bitmask engine picks teachers by its own mask test, not the free-teacher index"""
+        import main
+        expected = self._run('lists', True, str(tmp_path / 'lists_tracker.json'))
+        monkeypatch.setattr(main, '_FreeTeacherIndex', lambda *args: pytest.fail("built the free-teacher index"))
+
+        assert self._run('bitmask', True, str(tmp_path / 'bitmask_tracker.json')) == expected
+    
+    def test_split_period_is_one_mask(self):
+        """Test a split period needs every bit free and claims them together"""
+        from main import _AvailabilityMasks
+        
+        teacher = Teacher('Teacher B', [])
+        teacher.periods_available = ['5', '9', '9']
+        teacher.evenDayPeriods_available = ['6']
+        masks = _AvailabilityMasks({'Teacher B': teacher}, evenDay=True)
+        
+        assert masks.mask(['5', '6']) == masks.mask(['5']) | masks.mask(['6'])
+        assert masks.claim('Teacher B', 'standard', ['5', '6'])
+        assert not masks.claim('Teacher B', 'standard', ['5'])
+        assert masks.claim('Teacher B', 'standard', ['9'])
+        assert masks.claim('Teacher B', 'standard', ['9'])
+        assert not masks.claim('Teacher B', 'standard', ['9'])
+        
+        masks.write_back({'Teacher B': teacher})
+        assert teacher.periods_available == []
+        assert teacher.evenDayPeriods_available == []
+    
+    def test_unknown_engine_falls_back(self, temp_coverage_tracker, capsys):
+        """Test an unknown engine name warns and uses the list engine"""
+        teachers = {'Teacher A': Teacher('Teacher A', ['1']), 'Teacher B': Teacher('Teacher B', [])}
+        teachers['Teacher A'].is_out = True
+        teachers['Teacher B'].periods_available = ['1']
+        
+        result = determineCoverage_and_save(teachers, '2026-02-20', temp_coverage_tracker, False, engine='abacus')
+        
+        assert '   1 Teacher B\n' in result
+        assert "Unknown assignment engine 'abacus'" in capsys.readouterr().out
+
+class TestFreeTeacherIndex:
+    """Test the period -> free-teacher index"""
+    
+    def _teachers(self):
+        teachers = {name: Teacher(name, []) for name in ('Teacher A', 'Teacher B', 'Teacher C')}
+        teachers['Teacher A'].periods_available = ['5']
+        teachers['Teacher A'].evenDayPeriods_available = ['6']
+        teachers['Teacher B'].periods_available = ['5', '6']
+        teachers['Teacher C'].iss_periods_available = ['5', '5']
+        return teachers
+    
+    def test_free_teachers_by_tier(self):
+        """Test lookups only return teachers free in every requested period"""
+        from main import _FreeTeacherIndex
+        index = _FreeTeacherIndex(self._teachers(), ['Teacher A', 'Teacher B', 'Teacher C'], evenDay=True)
+        
+        assert index.free_teachers('standard', ['5', '6']) == {'Teacher A', 'Teacher B'}
+        assert index.free_teachers('iss', ['5']) == {'Teacher C'}
+        assert index.free_teachers('other', ['5']) == set()
+        
+        odd_index = _FreeTeacherIndex(self._teachers(), ['Teacher A', 'Teacher B'], evenDay=False)
+        assert odd_index.free_teachers('standard', ['5', '6']) == {'Teacher B'}
+    
+    def test_claims_consume_slots(self):
+        """Test assignments through the index pick the least used and update it"""
+        from main import _FreeTeacherIndex, _LeastUsedQueue
+        teachers = self._teachers()
+        queue = _LeastUsedQueue([('Teacher B', 0), ('Teacher A', 0), ('Teacher C', 0)])
+        index = _FreeTeacherIndex(teachers, [name for name, _ in queue], evenDay=True)
+        
+        assert find_and_assign('5', teachers, queue, {}, True, '6', free_index=index)[0] == 'Teacher B'
+        assert teachers['Teacher B'].periods_available == []
+        assert index.free_teachers('standard', ['5']) == {'Teacher A'}
+        
+        # Both ISS copies of period 5 have to be used up before Teacher C drops out
+        assert find_and_assign('5', teachers, queue, {}, True, free_index=index)[0] == 'Teacher A'
+        assert find_and_assign('5', teachers, queue, {}, True, free_index=index)[:2] == ('Teacher C', True)
+        assert find_and_assign('5', teachers, queue, {}, True, free_index=index)[:2] == ('Teacher C', True)
+        assert find_and_assign('5', teachers, queue, {}, True, free_index=index)[0] is None
+
+class TestOptimalEngine:
+    """Test the min-cost-flow assignment engine"""
+    
+    def _contended_day(self, tracker):
+        import json
+        with open(tracker, 'w') as f:
+            json.dump({
+                'Teacher X': {'times_covered': 0, 'coverage_log': []},
+                'Teacher Y': {'times_covered': 1, 'coverage_log': []},
+            }, f)
+        teachers = {
+            'Teacher A': Teacher('Teacher A', ['5']),
+            'Teacher B': Teacher('Teacher B', ['5/6']),
+            'Teacher X': Teacher('Teacher X', []),
+            'Teacher Y': Teacher('Teacher Y', []),
+        }
+        teachers['Teacher A'].is_out = True
+        teachers['Teacher B'].is_out = True
+        teachers['Teacher X'].periods_available = ['5', '6']
+        teachers['Teacher Y'].periods_available = ['5']
+        return teachers
+    
+    def test_greedy_misses_split(self, temp_coverage_tracker):
+        """Test the greedy engine uses up the only teacher free for a later split"""
+        teachers = self._contended_day(temp_coverage_tracker)
+        result = determineCoverage_and_save(teachers, '2026-02-20', temp_coverage_tracker, False)
+        
+        assert '   5 Teacher X\n' in result
+        assert '   5/6 No available teacher\n' in result
+    
+    def test_optimal_fills_split(self, temp_coverage_tracker):
+        """Test the optimal engine covers both periods and updates tracker and lists"""
+        from main import CoverageTracker
+        teachers = self._contended_day(temp_coverage_tracker)
+        result = determineCoverage_and_save(teachers, '2026-02-20', temp_coverage_tracker, False, engine='optimal')
+        
+        assert '   5 Teacher Y\n' in result
+        assert '   5/6 Teacher X\n' in result
+        assert teachers['Teacher X'].periods_available == []
+        assert teachers['Teacher Y'].periods_available == []
+        counts = CoverageTracker(temp_coverage_tracker).load().counts
+        assert counts['Teacher X'] == 1
+        assert counts['Teacher Y'] == 2
+    
+    def test_prefers_tiers_then_least_used(self):
+        """Test a standard slot beats ISS, and the least used teacher is picked"""
+        from main import _assign_optimal, _LeastUsedQueue
+        teachers = {name: Teacher(name, []) for name in ('Out', 'Busy', 'Fresh', 'Duty')}
+        teachers['Out'].is_out = True
+        teachers['Out'].periods_need_covered = ['2', '3']
+        teachers['Busy'].periods_available = ['2', '3']
+        teachers['Fresh'].periods_available = ['2']
+        teachers['Duty'].iss_periods_available = ['3']
+        queue = _LeastUsedQueue([('Busy', 4), ('Fresh', 0), ('Duty', 0)])
+        
+        plan = _assign_optimal(teachers, ['Out'], queue, False)
+        
+        assert plan['Out'] == [('2', False, 'Fresh', False, False), ('3', False, 'Busy', False, False)]
+    
+    def test_never_worse_than_greedy(self):
+        """Test random days: the optimal plan is feasible and fills at least as many periods"""
+        import random
+        from main import _OptimalCoverage, _assign_greedy, _LeastUsedQueue, _FreeTeacherIndex
+        
+        rng = random.Random(11)
+        periods = [str(p) for p in range(1, 8)]
+        for _ in range(100):
+            teachers = {}
+            for i in range(8):
+                teacher = Teacher(f'T{i}', rng.sample(periods + ['2/3', '5/6'], rng.randint(0, 3)))
+                teacher.is_out = i < 3
+                teacher.periods_available = rng.sample(periods, rng.randint(0, 3))
+                teacher.iss_periods_available = rng.sample(periods, rng.randint(0, 1))
+                teacher.otherDutyPeriods_available = rng.sample(periods, rng.randint(0, 1))
+                teachers[teacher.name] = teacher
+            teachers_out = ['T0', 'T1', 'T2']
+            queue = _LeastUsedQueue((name, rng.randint(0, 2)) for name in teachers if name not in teachers_out)
+            solver = _OptimalCoverage(teachers, teachers_out, queue, False)
+            
+            greedy = _assign_greedy(teachers, teachers_out, _LeastUsedQueue(list(queue)), False,
+                                    free_index=_FreeTeacherIndex(teachers, solver.names, False))
+            optimal = solver.solve()
+            
+            optimal_assignments = solver.plan_assignments(optimal)
+            assert solver.objective(optimal_assignments) <= solver.objective(solver.plan_assignments(greedy))
+            used = {}
+            for key, name, tier in optimal_assignments:
+                for period in solver.key_periods(key):
+                    used[(name, tier, period)] = used.get((name, tier, period), 0) + 1
+                    assert used[(name, tier, period)] <= solver.index.copies(name, tier, period)
+
+class TestCoveragePlan:
+    """Test the structured plan and its renderers"""
+
+    def make_teachers(self):
+        teachers = {
+            'Teacher A': Teacher('Teacher A', ['1', '5/6']),
+            'Teacher B': Teacher('Teacher B', []),
+            'Teacher C': Teacher('Teacher C', []),
+        }
+        teachers['Teacher A'].is_out = True
+        teachers['Teacher A'].periods_need_covered_CT = ['2']
+        teachers['Teacher B'].periods_available = ['1']
+        teachers['Teacher C'].iss_periods_available = ['2']
+        return teachers
+
+    def test_plan_records(self):
+        """Test the plan holds one record per period, without touching a tracker"""
+        from main import plan_coverage, CoverageAssignment
+
+        plan = plan_coverage(self.make_teachers(), '2026-02-20', {'Teacher B': 0, 'Teacher C': 0}, False)
+
+        assert plan.absent == ('Teacher A',)
+        assert list(plan) == [
+            CoverageAssignment('Teacher A', '1', False, 'Teacher B', 'standard'),
+            CoverageAssignment('Teacher A', '2', True, 'Teacher C', 'iss'),
+            CoverageAssignment('Teacher A', '5/6', False, None, None),
+        ]
+        assert plan.unfilled() == [plan.assignments[2]]
+        assert plan == plan_coverage(self.make_teachers(), '2026-02-20', {'Teacher B': 0, 'Teacher C': 0}, False)
+
+    def test_converted_ct_marked_only_when_covered(self):
+        """Test a converted co-taught period is marked CT when covered but not when unfilled"""
+        from main import plan_coverage, render_coverage_text
+
+        teachers = self.make_teachers()
+        teachers['Teacher A'].converted_ct_periods = ['1', '5/6']
+        plan = plan_coverage(teachers, '2026-02-20', {'Teacher B': 0, 'Teacher C': 0}, False)
+
+        assert [(a.period, a.is_ct) for a in plan] == [('1', True), ('2', True), ('5/6', False)]
+        assert "   1 (CT) Teacher B\n" in render_coverage_text(plan)
+        assert "   5/6 No available teacher\n" in render_coverage_text(plan)
+
+    def test_renderers(self, temp_coverage_tracker):
+        """Test the text output is unchanged and CSV/JSON carry the same records"""
+        import csv
+        import io
+        import json
+        from main import determineCoverage, render_coverage_text, render_coverage_csv, render_coverage_json
+
+        plan = determineCoverage(self.make_teachers(), '2026-02-20', temp_coverage_tracker, False)
+
+        assert render_coverage_text(plan) == (
+            "Date: 2026-02-20\n"
+            "Teacher A:\n"
+            "   1 Teacher B\n"
+            "   2 (CT) Teacher C (Close ISS)\n"
+            "   5/6 No available teacher\n"
+        )
+        rows = list(csv.DictReader(io.StringIO(render_coverage_csv(plan))))
+        assert [(row['period'], row['ct'], row['teacher'], row['duty']) for row in rows] == [
+            ('1', '0', 'Teacher B', 'standard'), ('2', '1', 'Teacher C', 'iss'), ('5/6', '0', '', '')]
+        document = json.loads(render_coverage_json(plan))
+        assert document['absent'] == ['Teacher A']
+        assert document['assignments'][1] == {
+            'covered_for': 'Teacher A', 'period': '2', 'is_ct': True, 'teacher': 'Teacher C', 'duty': 'iss'}
+
+    def test_save_formats(self, tmp_path, capsys):
+        """Test each requested format is written next to the others and unknown ones are skipped"""
+        from main import plan_coverage, save_coverage_plan
+
+        plan = plan_coverage(self.make_teachers(), '2026-02-20', {'Teacher B': 0, 'Teacher C': 0}, False)
+        written = save_coverage_plan(plan, ['text', 'csv', 'json', 'pdf'], output_dir=tmp_path)
+
+        assert written == [str(tmp_path / f'coverage_2026-02-20{ext}') for ext in ('.txt', '.csv', '.json')]
+        assert "Unknown coverage output format 'pdf'" in capsys.readouterr().out
@@ -0,0 +1,159 @@
+"""
+Unit tests for the coverage analytics report
+"""
+
+import time
+import pandas as pd
+import pytest
+import main
+import coverage_report
+from main import Teacher, determineCoverage_and_save
+
+
+def make_teachers():
+    """Teacher A is out 1, 2 and 5/6: B covers 1, C covers 2 from ISS, nobody is free for 5/6."""
+    teachers = {
+        'Teacher A': Teacher('Teacher A', ['1', '2', '5/6']),
+        'Teacher B': Teacher('Teacher B', []),
+        'Teacher C': Teacher('Teacher C', []),
+    }
+    teachers['Teacher A'].is_out = True
+    teachers['Teacher B'].periods_available = ['1']
+    teachers['Teacher C'].iss_periods_available = ['2']
+    return teachers
+
+
+@pytest.fixture
+def tracker_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'APP_DATA_DIR', tmp_path)
+    return str(tmp_path / 'coverage_tracker.json')
+
+
+class TestLoadHistory:
+    """Test loading tracker history into a frame"""
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_outcomes_recorded(self, tracker_path, backend):
+        """Test every period's outcome, including the duty slot and unfilled periods, is in the history"""
+        determineCoverage_and_save(make_teachers(), '2026-03-02', tracker_path, False, tracker_backend=backend)
+
+        history = coverage_report.load_history(tracker_path, backend)
+
+        assert list(history.columns) == coverage_report.HISTORY_COLUMNS
+        rows = history.astype(object).where(history.notna(), None)[['teacher', 'period', 'duty', 'filled']]
+        assert rows.values.tolist() == [
+            ['Teacher B', '1', 'standard', True],
+            ['Teacher C', '2', 'iss', True],
+            [None, '5/6', None, False],
+        ]
+        assert history['date'].dt.strftime('%Y-%m-%d').unique().tolist() == ['2026-03-02']
+
+    def test_rerun_replaces_unfilled(self, tracker_path):
+        """Test re-running a date replaces its unfilled periods too"""
+        determineCoverage_and_save(make_teachers(), '2026-03-02', tracker_path, False)
+        teachers = make_teachers()
+        teachers['Teacher B'].periods_available = ['1', '5', '6']
+        determineCoverage_and_save(teachers, '2026-03-02', tracker_path, False)
+
+        history = coverage_report.load_history(tracker_path)
+
+        assert len(history) == 3
+        assert history['filled'].all()
+
+    def test_archive_included(self, tracker_path, tmp_path):
+        """Test archived school years are part of the history unless left out"""
+        determineCoverage_and_save(make_teachers(), '2025-03-02', tracker_path, False)
+        determineCoverage_and_save(make_teachers(), '2025-09-02', tracker_path, False)
+        main.archive_closed_years(tracker_path, reports_dir=tmp_path, today=main.datetime.date(2025, 10, 1))
+
+        assert len(coverage_report.load_history(tracker_path)) == 6
+        assert len(coverage_report.load_history(tracker_path, include_archive=False)) == 3
+
+
+class TestAggregates:
+    """Test the report tables"""
+
+    def test_rates(self, tracker_path):
+        """Test totals and rates per month, period and teacher"""
+        determineCoverage_and_save(make_teachers(), '2026-03-02', tracker_path, False)
+        determineCoverage_and_save(make_teachers(), '2026-04-01', tracker_path, False)
+
+        tables = coverage_report.coverage_aggregates(coverage_report.load_history(tracker_path))
+
+        summary = tables['summary'].loc['all']
+        assert (summary['periods'], summary['covered'], summary['no_available_teacher']) == (6, 4, 2)
+        assert summary['no_available_rate'] == pytest.approx(1 / 3)
+        assert summary['iss_fallback_rate'] == pytest.approx(0.5)
+        assert tables['by_month'].index.tolist() == ['2026-03', '2026-04']
+        assert tables['by_period'].index.tolist() == ['1', '2', '5/6']
+        assert tables['by_period'].loc['5/6', 'no_available_rate'] == 1.0
+        assert tables['by_teacher'].loc['Teacher C', 'iss_fallback'] == 2
+        assert tables['by_teacher_month'].loc['Teacher B'].tolist() == [1, 1]
+        assert 'by_department' not in tables
+
+    def test_departments(self, tracker_path):
+        """Test department totals: needed by the absent teacher's, covered by the coverer's"""
+        determineCoverage_and_save(make_teachers(), '2026-03-02', tracker_path, False)
+        departments = {'Teacher A': 'English', 'Teacher B': 'Math', 'Teacher C': 'English'}
+
+        by_department = coverage_report.coverage_aggregates(
+            coverage_report.load_history(tracker_path), departments)['by_department']
+
+        assert by_department.loc['English', 'periods'] == 3
+        assert by_department.loc['English', 'covered_by_department'] == 1
+        assert by_department.loc['Math', 'covered_by_department'] == 1
+        assert by_department.loc['Math', 'periods'] == 0
+
+    def test_large_history_fast(self):
+        """Test aggregating several years of history stays well under a second"""
+        rows = 300_000
+        dates = pd.date_range('2022-08-15', periods=rows // 60, freq='B').repeat(60)[:rows]
+        history = pd.DataFrame({
+            'date': dates,
+            'teacher': pd.Categorical([f'Teacher{i % 400:03d}' for i in range(rows)]),
+            'covered_for': pd.Categorical([f'Teacher{(i * 7) % 400:03d}' for i in range(rows)]),
+            'period': pd.Categorical([str(i % 11 + 1) for i in range(rows)]),
+            'duty': pd.Categorical(['standard', 'iss', 'other', 'standard'] * (rows // 4)),
+            'filled': [i % 9 != 0 for i in range(rows)],
+        })
+        departments = {f'Teacher{i:03d}': f'Dept{i % 12}' for i in range(400)}
+
+        start = time.perf_counter()
+        tables = coverage_report.coverage_aggregates(history, departments)
+        elapsed = time.perf_counter() - start
+
+        assert tables['summary'].loc['all', 'periods'] == rows
+        assert elapsed < 1.0
+
+
+class TestOutput:
+    """Test writing the report and reading departments"""
+
+    def test_xlsx_and_csv(self, tracker_path, tmp_path):
+        """Test an .xlsx gets one sheet per table and anything else one CSV per table"""
+        determineCoverage_and_save(make_teachers(), '2026-03-02', tracker_path, False)
+        tables = coverage_report.coverage_aggregates(coverage_report.load_history(tracker_path))
+
+        xlsx = str(tmp_path / 'report.xlsx')
+        assert coverage_report.write_report(tables, xlsx) == [xlsx]
+        assert pd.ExcelFile(xlsx).sheet_names == list(tables)
+
+        written = coverage_report.write_report(tables, str(tmp_path / 'report.csv'))
+        assert written == [str(tmp_path / f'report_{name}.csv') for name in tables]
+        assert pd.read_csv(written[0], index_col=0).loc['all', 'periods'] == 3
+
+    def test_departments_from_template_column(self, tmp_path):
+        """Test departments come from the unlabeled column after Name, as in the district template"""
+        path = str(tmp_path / 'schedule.xlsx')
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            frame = pd.DataFrame([['Smith, John (Rm 4)', 'English', 'Class'], ['Doe, Jane', 'Math', 'Plan']])
+            frame.to_excel(writer, index=False, header=['Name', '', '1st'])
+
+        assert coverage_report.load_departments(path) == {'Smith, John': 'English', 'Doe, Jane': 'Math'}
+
+    def test_departments_from_named_column(self, tmp_path):
+        """Test a 'Department' column is used wherever it is"""
+        path = str(tmp_path / 'schedule.csv')
+        pd.DataFrame({'Name': ['Smith, John'], '1st': ['Class'], 'Department': ['Science']}).to_csv(path, index=False)
+
+        assert coverage_report.load_departments(path) == {'Smith, John': 'Science'}
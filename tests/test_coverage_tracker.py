@@ -0,0 +1,874 @@
+"""
+Unit tests for the journaled coverage tracker
+"""
+
+import json
+import os
+import pytest
+import main
+from main import CoverageTracker, determineCoverage_and_save, Teacher
+
+
+def write_legacy(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+def make_teachers():
+    teachers = {
+        'Teacher A': Teacher('Teacher A', ['1', '2']),
+        'Teacher B': Teacher('Teacher B', []),
+        'Teacher C': Teacher('Teacher C', []),
+    }
+    teachers['Teacher A'].is_out = True
+    teachers['Teacher B'].periods_available = ['1', '2']
+    teachers['Teacher C'].periods_available = ['1', '2']
+    return teachers
+
+
+class TestLegacyMigration:
+    """Test the one-time migration from coverage_tracker.json"""
+
+    def test_counts_and_order_preserved(self, tmp_path):
+        """Test counts (including hand edits) and tracker order survive migration"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_legacy(path, {
+            'Teacher C': {'times_covered': 2, 'coverage_log': [
+                {'date': '2026-01-06', 'covered_for': 'Teacher A', 'period': '3'},
+                {'date': '2026-01-05', 'covered_for': 'Teacher A', 'period': '1'},
+            ]},
+            'Teacher B': {'times_covered': 5, 'coverage_log': []},
+        })
+
+        tracker = CoverageTracker(path).load()
+
+        assert list(tracker.counts.items()) == [('Teacher C', 2), ('Teacher B', 5)]
+        assert os.path.exists(tracker.snapshot_path)
+        covers = [event for event in tracker.iter_events() if event['event'] == 'cover']
+        assert [event['date'] for event in covers] == ['2026-01-05', '2026-01-06']
+
+    def test_migrates_once(self, tmp_path):
+        """Test later edits to the legacy file are ignored once the journal exists"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_legacy(path, {'Teacher B': {'times_covered': 1, 'coverage_log': []}})
+        CoverageTracker(path).load()
+
+        write_legacy(path, {'Teacher B': {'times_covered': 9, 'coverage_log': []}})
+
+        assert CoverageTracker(path).load().counts == {'Teacher B': 1}
+
+
+class TestJournal:
+    """Test appending and compaction"""
+
+    def test_run_appends_only_new_events(self, tmp_path):
+        """Test a run appends its day's events and leaves earlier lines untouched"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-02-19', path, False)
+        tracker = CoverageTracker(path)
+        with open(tracker.journal_path, 'rb') as f:
+            first_day = f.read()
+
+        determineCoverage_and_save(make_teachers(), '2026-02-20', path, False)
+
+        with open(tracker.journal_path, 'rb') as f:
+            both_days = f.read()
+        assert both_days.startswith(first_day)
+        new_events = [json.loads(line) for line in both_days[len(first_day):].splitlines()]
+        assert [event['event'] for event in new_events] == ['run', 'cover', 'cover']
+        assert {event['date'] for event in new_events} == {'2026-02-20'}
+        assert tracker.load().counts == {'Teacher A': 0, 'Teacher B': 2, 'Teacher C': 2}
+
+    def test_load_reads_only_the_tail(self, tmp_path):
+        """Test events covered by the snapshot are not parsed again"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        tracker = CoverageTracker(path).load()
+        tracker.register(['Teacher B'])
+        tracker.record('2026-02-19', 'Teacher B', 'Teacher A', '1')
+        tracker.save()
+        tracker.compact()
+        tracker.record('2026-02-20', 'Teacher B', 'Teacher A', '2')
+        tracker.save()
+
+        # Corrupt the compacted part of the journal in place; a tail-only load never sees it
+        with open(tracker.journal_path, 'r+b') as f:
+            f.write(b'#')
+
+        assert CoverageTracker(path).load().counts == {'Teacher B': 2}
+
+    def test_compaction_threshold(self, tmp_path, monkeypatch):
+        """Test the snapshot is rewritten once the tail grows past the threshold"""
+        # Each save appends a run header plus its cover
+        monkeypatch.setattr(main, 'JOURNAL_COMPACT_EVENTS', 6)
+        path = str(tmp_path / 'coverage_tracker.json')
+        tracker = CoverageTracker(path).load()
+        tracker.register(['Teacher B'])
+        tracker.save()
+
+        for period in ('1', '2', '3'):
+            tracker.record('2026-02-20', 'Teacher B', 'Teacher A', period)
+            tracker.save()
+
+        with open(tracker.snapshot_path) as f:
+            snapshot = json.load(f)
+        assert snapshot['times_covered'] == {'Teacher B': 3}
+        assert snapshot['journal_size'] == os.path.getsize(tracker.journal_path)
+
+    def test_missing_snapshot_rebuilds(self, tmp_path):
+        """Test the counts are rebuilt from the whole journal without a snapshot"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-02-20', path, False)
+        tracker = CoverageTracker(path)
+        os.unlink(tracker.snapshot_path)
+
+        assert tracker.load().counts == {'Teacher A': 0, 'Teacher B': 1, 'Teacher C': 1}
+
+    def test_torn_last_line_ignored(self, tmp_path):
+        """Test a partially written final event is skipped and later appends stay readable"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        tracker = CoverageTracker(path).load()
+        tracker.register(['Teacher B'])
+        tracker.save()
+        with open(tracker.journal_path, 'ab') as f:
+            f.write(b'{"event": "cover", "teacher": "Tea')
+
+        tracker = CoverageTracker(path).load()
+        assert tracker.counts == {'Teacher B': 0}
+        tracker.record('2026-02-20', 'Teacher B', 'Teacher A', '1')
+        tracker.save()
+
+        assert CoverageTracker(path).load().counts == {'Teacher B': 1}
+
+
+class TestSQLiteTracker:
+    """Test the SQLite tracker backend"""
+
+    def test_same_coverage_as_journal(self, tmp_path):
+        """Test both backends produce the same runs and counts"""
+        results = {}
+        for backend in ('journal', 'sqlite'):
+            path = str(tmp_path / f'{backend}_tracker.json')
+            write_legacy(path, {'Teacher C': {'times_covered': 1, 'coverage_log': []}})
+            runs = [determineCoverage_and_save(make_teachers(), date, path, False, tracker_backend=backend)
+                    for date in ('2026-02-19', '2026-02-20')]
+            results[backend] = runs, main.open_coverage_tracker(path, backend).counts
+
+        assert results['sqlite'] == results['journal']
+        assert list(results['sqlite'][1].items()) == [('Teacher C', 3), ('Teacher A', 0), ('Teacher B', 2)]
+
+    def test_imports_existing_journal(self, tmp_path):
+        """Test switching backends keeps the history recorded in the journal"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-02-20', path, False)
+
+        tracker = main.SQLiteCoverageTracker(path).load()
+
+        assert tracker.counts == {'Teacher A': 0, 'Teacher B': 1, 'Teacher C': 1}
+        assert len(list(tracker.iter_events())) == 2
+
+    def test_covered_for_lookup(self, tmp_path):
+        """Test history lookups by absent teacher and date range use an index"""
+        import sqlite3
+        path = str(tmp_path / 'coverage_tracker.json')
+        tracker = main.SQLiteCoverageTracker(path).load()
+        tracker.register(['Teacher B'])
+        for date, covered_for in (('2026-02-27', 'Teacher A'), ('2026-03-02', 'Teacher A'),
+                                  ('2026-03-03', 'Teacher C'), ('2026-04-01', 'Teacher A')):
+            tracker.record(date, 'Teacher B', covered_for, '1')
+        tracker.save()
+
+        march = tracker.covered_for('Teacher A', '2026-03-01', '2026-03-31')
+
+        assert [event['date'] for event in march] == ['2026-03-02']
+        assert len(tracker.covered_for('Teacher A')) == 3
+        connection = sqlite3.connect(tracker.db_path)
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM coverage_log WHERE covered_for = ? AND date >= ? AND date <= ?",
+            ('Teacher A', '2026-03-01', '2026-03-31')
+        ).fetchall()
+        journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        connection.close()
+        assert any('coverage_log_covered_for' in str(row) for row in plan)
+        assert journal_mode == 'wal'
+
+    def test_unknown_backend_falls_back(self, tmp_path, capsys):
+        """Test an unknown backend name warns and uses the journal"""
+        tracker = main.open_coverage_tracker(str(tmp_path / 'coverage_tracker.json'), 'mongo')
+
+        assert isinstance(tracker, CoverageTracker)
+        assert "Unknown tracker backend 'mongo'" in capsys.readouterr().out
+
+
+
+class TestRerunAndUndo:
+    """Test re-running a date and undoing a date's coverage"""
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_rerun_replaces_date(self, tmp_path, backend, capsys):
+        """Test running a date again replaces its entries instead of counting them twice"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-04-01', path, False, tracker_backend=backend)
+        determineCoverage_and_save(make_teachers(), '2026-04-02', path, False, tracker_backend=backend)
+
+        # A late callout: Teacher C is no longer free on the 2nd
+        teachers = make_teachers()
+        teachers['Teacher C'].periods_available = []
+        determineCoverage_and_save(teachers, '2026-04-02', path, False, tracker_backend=backend)
+
+        tracker = main.open_coverage_tracker(path, backend)
+        assert tracker.counts == {'Teacher A': 0, 'Teacher B': 3, 'Teacher C': 1}
+        covers = [event for event in tracker.iter_events() if event['event'] == 'cover']
+        assert [(event['date'], event['teacher']) for event in covers] == [
+            ('2026-04-01', 'Teacher B'), ('2026-04-01', 'Teacher C'),
+            ('2026-04-02', 'Teacher B'), ('2026-04-02', 'Teacher B'),
+        ]
+        assert "Replacing 2 coverage entries already recorded for 2026-04-02" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_undo_run(self, tmp_path, backend):
+        """Test undoing a date removes only that date's entries"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-04-01', path, False, tracker_backend=backend)
+        determineCoverage_and_save(make_teachers(), '2026-04-02', path, False, tracker_backend=backend)
+
+        assert main.undo_coverage_run('2026-04-01', path, backend) == 2
+        assert main.undo_coverage_run('2026-04-01', path, backend) == 0
+
+        tracker = main.open_coverage_tracker(path, backend)
+        assert tracker.counts == {'Teacher A': 0, 'Teacher B': 1, 'Teacher C': 1}
+        assert {event['date'] for event in tracker.covered_for('Teacher A')} == {'2026-04-02'}
+
+    def test_undo_reads_only_that_date(self, tmp_path, capsys):
+        """Test undo seeks to the date's indexed runs instead of scanning the journal"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-04-01', path, False)
+        tracker = CoverageTracker(path)
+        first_day_size = os.path.getsize(tracker.journal_path)
+        determineCoverage_and_save(make_teachers(), '2026-04-02', path, False)
+
+        # Garble the whole first day in place; reading any of it would warn
+        with open(tracker.journal_path, 'r+b') as f:
+            f.write(b'#' * (first_day_size - 1))
+
+        assert main.undo_coverage_run('2026-04-02', path) == 2
+        assert "unreadable" not in capsys.readouterr().out
+        assert CoverageTracker(path).load().counts == {'Teacher A': 0, 'Teacher B': 1, 'Teacher C': 1}
+
+    def test_index_survives_rebuild(self, tmp_path):
+        """Test the per-date index is rebuilt from the journal when the snapshot is lost"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-04-01', path, False)
+        determineCoverage_and_save(make_teachers(), '2026-04-02', path, False)
+        main.undo_coverage_run('2026-04-01', path)
+        tracker = CoverageTracker(path)
+        os.unlink(tracker.snapshot_path)
+
+        tracker.load()
+        assert tracker.counts == {'Teacher A': 0, 'Teacher B': 1, 'Teacher C': 1}
+        assert not tracker.has_run('2026-04-01')
+        assert tracker.undo_date('2026-04-02') == 2
+
+    def test_legacy_dates_indexed(self, tmp_path):
+        """Test dates migrated from a legacy tracker can be undone"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_legacy(path, {
+            'Teacher B': {'times_covered': 2, 'coverage_log': [
+                {'date': '2026-01-05', 'covered_for': 'Teacher A', 'period': '1'},
+                {'date': '2026-01-06', 'covered_for': 'Teacher A', 'period': '2'},
+            ]},
+        })
+
+        assert main.undo_coverage_run('2026-01-05', path) == 1
+        assert CoverageTracker(path).load().counts == {'Teacher B': 1}
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_unsaved_undo_leaves_daily_counts(self, tmp_path, backend):
+        """Test a date undone in memory drops out of the per-day counts before it is saved"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-04-01', path, False, tracker_backend=backend)
+        tracker = main.open_coverage_tracker(path, backend)
+
+        tracker.undo_date('2026-04-01')
+
+        assert list(tracker.daily_counts('2026-04-01', '2026-04-01')) == []
+
+
+def write_history(path, backend, covers):
+    """Records (date, teacher) covers for Teacher A through the given backend."""
+    tracker = main.open_coverage_tracker(path, backend)
+    tracker.register(['Teacher A', 'Teacher B', 'Teacher C'])
+    for date, teacher in covers:
+        tracker.record(date, teacher, 'Teacher A', '1')
+    tracker.save()
+
+
+class TestFairnessMetrics:
+    """Test the selectable fairness metrics used for ranking"""
+
+    # Teacher B covered a lot last school year, Teacher C a little this term
+    HISTORY = [('2025-05-0%d' % day, 'Teacher B') for day in range(1, 6)] + [('2026-04-06', 'Teacher C')]
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    @pytest.mark.parametrize("metric, expected", [
+        ('all_time', {'Teacher A': 0, 'Teacher B': 5, 'Teacher C': 1}),
+        ('rolling', {'Teacher A': 0, 'Teacher B': 0, 'Teacher C': 1}),
+        ('term', {'Teacher A': 0, 'Teacher B': 0, 'Teacher C': 1}),
+    ])
+    def test_window_scores(self, tmp_path, backend, metric, expected):
+        """Test windowed metrics count only covers inside the window"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_history(path, backend, self.HISTORY)
+        tracker = main.open_coverage_tracker(path, backend)
+
+        assert main.fairness_scores(tracker, '2026-04-08', metric) == (expected, 1)
+
+    def test_rolling_counts_school_days(self, tmp_path):
+        """Test the rolling window is measured in weekdays"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        # Friday 2026-04-03 is the 3rd school day back from Wednesday 2026-04-08
+        write_history(path, 'journal', [('2026-04-02', 'Teacher B'), ('2026-04-03', 'Teacher C')])
+        tracker = CoverageTracker(path).load()
+
+        scores, _ = main.fairness_scores(tracker, '2026-04-08', 'rolling', window_days=4)
+        assert (scores['Teacher B'], scores['Teacher C']) == (0, 1)
+
+    def test_term_starts(self, tmp_path):
+        """Test 'term' counts from the latest configured term start on or before the date"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_history(path, 'journal', [('2026-01-05', 'Teacher B'), ('2026-03-02', 'Teacher C')])
+        tracker = CoverageTracker(path).load()
+
+        scores, _ = main.fairness_scores(tracker, '2026-03-10', 'term', term_starts=['2025-08-15', '2026-01-20'])
+        assert (scores['Teacher B'], scores['Teacher C']) == (0, 1)
+
+    def test_decay(self, tmp_path):
+        """Test old covers fade: five covers 11 months ago weigh less than one yesterday"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_history(path, 'journal', self.HISTORY)
+        tracker = CoverageTracker(path).load()
+
+        scores, step = main.fairness_scores(tracker, '2026-04-07', 'decay', half_life_days=30)
+        assert step == main.DECAY_SCORE_UNITS
+        assert scores['Teacher C'] == round(0.5 ** (1 / 30) * step)
+        assert scores['Teacher B'] < scores['Teacher C']
+
+    @staticmethod
+    def expected_decay(covers, date, half_life_days):
+        """Decay scores summed cover by cover, as fairness_scores() would rank them on `date`."""
+        day = main.datetime.date.fromisoformat(date)
+        scores = {'Teacher A': 0.0, 'Teacher B': 0.0, 'Teacher C': 0.0}
+        for covered_on, name in covers:
+            age = (day - main.datetime.date.fromisoformat(covered_on)).days
+            scores[name] += 0.5 ** (age / half_life_days)
+        return {name: round(score * main.DECAY_SCORE_UNITS) for name, score in scores.items()}
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_decay_kept_incrementally(self, tmp_path, backend, monkeypatch):
+        """Test decayed scores are saved and kept up to date by record and undo, without rescanning the days"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_history(path, backend, self.HISTORY)
+        tracker = main.open_coverage_tracker(path, backend)
+        assert main.fairness_scores(tracker, '2026-04-07', 'decay', half_life_days=30)[0] == \
+            self.expected_decay(self.HISTORY, '2026-04-07', 30)
+        tracker.save()
+
+        tracker_class = type(tracker)
+        monkeypatch.setattr(tracker_class, 'daily_counts', lambda *args: pytest.fail("rescanned daily counts"))
+        tracker = main.open_coverage_tracker(path, backend)
+        tracker.record('2026-04-07', 'Teacher B', 'Teacher A', '1')
+        tracker.record('2026-04-08', 'Teacher C', 'Teacher A', '2')
+        tracker.save()
+        tracker = main.open_coverage_tracker(path, backend)
+        covers = self.HISTORY + [('2026-04-07', 'Teacher B'), ('2026-04-08', 'Teacher C')]
+        assert main.fairness_scores(tracker, '2026-04-09', 'decay', half_life_days=30)[0] == \
+            self.expected_decay(covers, '2026-04-09', 30)
+
+        tracker.undo_date('2026-04-06')
+        del covers[5]
+        assert main.fairness_scores(tracker, '2026-04-09', 'decay', half_life_days=30)[0] == \
+            self.expected_decay(covers, '2026-04-09', 30)
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_decay_half_life_change_rebuilds(self, tmp_path, backend):
+        """Test a new half-life rebuilds the scores once and is saved with them"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_history(path, backend, self.HISTORY)
+        tracker = main.open_coverage_tracker(path, backend)
+        main.fairness_scores(tracker, '2026-04-07', 'decay', half_life_days=30)
+        tracker.save()
+
+        tracker = main.open_coverage_tracker(path, backend)
+        scores, _ = main.fairness_scores(tracker, '2026-04-07', 'decay', half_life_days=90)
+        tracker.save()
+
+        assert scores == self.expected_decay(self.HISTORY, '2026-04-07', 90)
+        assert main.open_coverage_tracker(path, backend).decay_half_life == 90
+
+    def test_decay_before_later_covers(self, tmp_path):
+        """Test planning a date before later covers leaves those covers out"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_history(path, 'journal', self.HISTORY)
+        tracker = CoverageTracker(path).load()
+
+        scores, _ = main.fairness_scores(tracker, '2025-05-03', 'decay', half_life_days=30)
+        assert scores == self.expected_decay(self.HISTORY[:3], '2025-05-03', 30)
+
+    @pytest.mark.parametrize("engine", ["lists", "optimal"])
+    def test_metric_drives_assignment(self, tmp_path, engine):
+        """Test the selected metric decides who covers"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_history(path, 'journal', self.HISTORY)
+        teachers = make_teachers()
+        teachers['Teacher A'].periods_need_covered = ['1']
+
+        output = determineCoverage_and_save(teachers, '2026-04-08', path, False, engine=engine,
+                                            fairness_metric='decay', fairness_options={'half_life_days': 30})
+
+        assert "1 Teacher B" in output
+
+    def test_daily_counts_follow_undo(self, tmp_path):
+        """Test per-date counts drop a date when it is undone, in both backends"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_history(path, 'journal', self.HISTORY)
+        main.undo_coverage_run('2026-04-06', path)
+        main.undo_coverage_run('2025-05-01', path, 'sqlite')
+
+        journal = sorted(CoverageTracker(path).load().daily_counts())
+        sqlite = sorted(main.SQLiteCoverageTracker(path).load().daily_counts())
+        assert journal == [('2025-05-0%d' % day, 'Teacher B', 1) for day in range(1, 6)]
+        assert sqlite == journal[1:]
+
+    def test_unknown_metric_falls_back(self, tmp_path, capsys):
+        """Test an unknown metric warns and ranks by all-time counts"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        write_history(path, 'journal', self.HISTORY)
+        tracker = CoverageTracker(path).load()
+
+        assert main.fairness_scores(tracker, '2026-04-08', 'median') == (tracker.counts, 1)
+        assert "Unknown fairness metric 'median'" in capsys.readouterr().out
+
+def _stress_worker(path, backend, app_data_dir, month, runs):
+    """Runs several coverage days back to back against a shared tracker (in a child process)."""
+    from pathlib import Path
+    main.APP_DATA_DIR = Path(app_data_dir)
+    for run in range(runs):
+        date = f'2026-{month:02d}-{run + 1:02d}'
+        determineCoverage_and_save(make_teachers(), date, path, False, tracker_backend=backend)
+
+
+class TestConcurrentRuns:
+    """Test locking around the tracker read-assign-write cycle"""
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_no_lost_increments(self, tmp_path, monkeypatch, backend):
+        """Test many processes running at once never lose a count"""
+        import multiprocessing
+        monkeypatch.setattr(main, 'JOURNAL_COMPACT_EVENTS', 7)
+        path = str(tmp_path / 'coverage_tracker.json')
+        processes, runs = 6, 5
+
+        # Each process covers its own dates; re-running a date would replace it instead of adding
+        workers = [multiprocessing.Process(target=_stress_worker, args=(path, backend, str(tmp_path), month, runs))
+                   for month in range(1, processes + 1)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=120)
+            assert worker.exitcode == 0
+
+        tracker = main.open_coverage_tracker(path, backend)
+        # Every run covers periods 1 and 2 for Teacher A; serialized runs alternate B and C evenly
+        assert tracker.counts == {'Teacher A': 0, 'Teacher B': processes * runs, 'Teacher C': processes * runs}
+        covers = [event for event in tracker.iter_events() if event['event'] == 'cover']
+        assert len(covers) == 2 * processes * runs
+
+    def test_lock_timeout(self, tmp_path):
+        """Test a run gives up with TimeoutError while another holds the lock"""
+        path = str(tmp_path / 'coverage_tracker.json')
+
+        with main.TrackerLock(path):
+            with pytest.raises(TimeoutError):
+                with main.TrackerLock(path, timeout=0.2):
+                    pass
+
+        with main.TrackerLock(path, timeout=0.2):
+            pass
+
+
+class TestCountOnlyLoading:
+    """Test runs load counts only, independent of history length"""
+
+    def test_journal_load_bounded_by_compaction(self, tmp_path, monkeypatch):
+        """Test a fresh load applies at most JOURNAL_COMPACT_EVENTS journal events"""
+        monkeypatch.setattr(main, 'JOURNAL_COMPACT_EVENTS', 4)
+        path = str(tmp_path / 'coverage_tracker.json')
+        for day in range(1, 21):
+            determineCoverage_and_save(make_teachers(), f'2026-03-{day:02d}', path, False)
+
+        applied = []
+        tracker = CoverageTracker(path)
+        original_apply = tracker._apply
+        monkeypatch.setattr(tracker, '_apply', lambda event, offset: applied.append(event) or original_apply(event, offset))
+        tracker.load()
+
+        assert len(applied) < 4
+        assert tracker.counts == {'Teacher A': 0, 'Teacher B': 20, 'Teacher C': 20}
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_logs_loaded_on_request(self, tmp_path, backend):
+        """Test full coverage logs are only read through coverage_log()"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-03-02', path, False, tracker_backend=backend)
+
+        tracker = main.open_coverage_tracker(path, backend)
+
+        assert tracker.coverage_log('Teacher B') == [
+            {'date': '2026-03-02', 'covered_for': 'Teacher A', 'period': '1'}
+        ]
+
+    def test_sqlite_running_counts_upgrade(self, tmp_path):
+        """Test databases without running counts are upgraded from their log"""
+        import sqlite3
+        path = str(tmp_path / 'coverage_tracker.json')
+        tracker = main.SQLiteCoverageTracker(path)
+        connection = sqlite3.connect(tracker.db_path)
+        connection.executescript("""
+            CREATE TABLE teachers (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE,
+                                   base_covered INTEGER NOT NULL DEFAULT 0);
+            CREATE TABLE coverage_log (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT, teacher TEXT NOT NULL,
+                                       covered_for TEXT, period TEXT);
+            INSERT INTO teachers (name, base_covered) VALUES ('Teacher B', 1);
+            INSERT INTO coverage_log (date, teacher, covered_for, period) VALUES ('2026-03-02', 'Teacher B', 'Teacher A', '1');
+        """)
+        connection.close()
+
+        assert tracker.load().counts == {'Teacher B': 2}
+        tracker.record('2026-03-03', 'Teacher B', 'Teacher A', '2')
+        tracker.save()
+        assert main.SQLiteCoverageTracker(path).load().counts == {'Teacher B': 3}
+
+
+def write_years(tmp_path, backend):
+    """A closed 2024-2025 school year plus the current one, with their daily reports."""
+    path = str(tmp_path / 'coverage_tracker.json')
+    write_history(path, backend, [('2025-03-03', 'Teacher B'), ('2025-06-02', 'Teacher C'),
+                                  ('2025-09-01', 'Teacher B')])
+    for date in ('2025-03-03', '2025-06-02', '2025-09-01'):
+        (tmp_path / f'coverage_{date}.txt').write_text(f"Date: {date}\n")
+    return path
+
+
+class TestArchive:
+    """Test rolling closed school years into archive segments"""
+
+    TODAY = main.datetime.date(2025, 10, 1)
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_closed_year_archived(self, tmp_path, backend):
+        """Test a closed year moves to the archive and the live tracker keeps its counts"""
+        path = write_years(tmp_path, backend)
+
+        assert main.archive_closed_years(path, backend, tmp_path, self.TODAY, half_life_days=10) == ['2024-2025']
+
+        tracker = main.open_coverage_tracker(path, backend)
+        assert tracker.counts == {'Teacher A': 0, 'Teacher B': 2, 'Teacher C': 1}
+        assert [event['date'] for event in tracker.iter_events() if event['event'] == 'cover'] == ['2025-09-01']
+        # Only daily counts within the decay horizon (10 half-lives) of the new school year stay live
+        assert sorted(tracker.daily_counts()) == [('2025-06-02', 'Teacher C', 1), ('2025-09-01', 'Teacher B', 1)]
+        assert sorted(os.listdir(tmp_path / 'coverage_tracker.archive')) == ['2024-2025.zip', 'manifest.json']
+        assert (tmp_path / 'coverage_2025-09-01.txt').exists()
+        assert not (tmp_path / 'coverage_2025-03-03.txt').exists()
+
+        archive = main.CoverageArchive(path).load()
+        assert [event['date'] for event in archive.covered_for('Teacher A')] == ['2025-03-03', '2025-06-02']
+        assert archive.coverage_log('Teacher C') == [
+            {'date': '2025-06-02', 'covered_for': 'Teacher A', 'period': '1'}
+        ]
+        assert archive.report('2025-03-03') == "Date: 2025-03-03\n"
+        assert archive.report('2025-09-01') is None
+
+    @pytest.mark.parametrize("window_days, half_life_days, carry_from", [
+        (60, 30, '2024-10-05'),
+        (250, 10, '2024-08-19'),
+        (5, 1, '2025-07-22'),
+    ])
+    def test_carry_follows_fairness_settings(self, window_days, half_life_days, carry_from):
+        """Test the kept daily counts reach back to the longer of the rolling window and the decay horizon"""
+        assert main.archive_carry_from('2025-08-01', window_days, half_life_days) == carry_from
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_carried_counts_expire(self, tmp_path, backend):
+        """Test daily counts carried by one archive are dropped by a later one once out of range"""
+        path = write_years(tmp_path, backend)
+        main.archive_closed_years(path, backend, tmp_path, self.TODAY, half_life_days=30)
+        assert len(list(main.open_coverage_tracker(path, backend).daily_counts())) == 3
+
+        main.archive_closed_years(path, backend, tmp_path, main.datetime.date(2026, 10, 1), half_life_days=10)
+
+        tracker = main.open_coverage_tracker(path, backend)
+        assert list(tracker.daily_counts()) == []
+        assert tracker.counts == {'Teacher A': 0, 'Teacher B': 2, 'Teacher C': 1}
+
+    def test_csv_and_json_reports_archived(self, tmp_path):
+        """Test a closed year's .csv and .json reports are archived alongside the .txt ones"""
+        path = write_years(tmp_path, 'journal')
+        (tmp_path / 'coverage_2025-03-03.csv').write_text("date,covered_for\n")
+        (tmp_path / 'coverage_2025-03-03.json').write_text("{}")
+
+        assert main.archive_closed_years(path, None, tmp_path, self.TODAY) == ['2024-2025']
+
+        archive = main.CoverageArchive(path).load()
+        assert archive.report('2025-03-03', '.csv') == "date,covered_for\n"
+        assert archive.report('2025-03-03', '.json') == "{}"
+        assert not (tmp_path / 'coverage_2025-03-03.json').exists()
+
+    def test_segments_read_only(self, tmp_path):
+        """Test segment files are written without write permission"""
+        path = write_years(tmp_path, 'journal')
+        main.archive_closed_years(path, None, tmp_path, self.TODAY)
+
+        mode = os.stat(tmp_path / 'coverage_tracker.archive' / '2024-2025.zip').st_mode
+        assert mode & 0o222 == 0
+
+    def test_archived_year_skips_tracker(self, tmp_path, monkeypatch):
+        """Test later runs in the same school year only list the reports directory"""
+        path = write_years(tmp_path, 'journal')
+        main.archive_closed_years(path, None, tmp_path, self.TODAY)
+
+        def fail(*args):
+            raise AssertionError("tracker opened")
+        monkeypatch.setattr(main, 'open_coverage_tracker', fail)
+
+        assert main.archive_closed_years(path, None, tmp_path, self.TODAY) == []
+
+    def test_interrupted_run_not_archived_twice(self, tmp_path, monkeypatch):
+        """Test a run that stopped before trimming the tracker is finished without duplicates"""
+        path = write_years(tmp_path, 'journal')
+        original = CoverageTracker.archive_before
+
+        def crash(self, cutoff, carry_from):
+            raise OSError("disk full")
+        monkeypatch.setattr(CoverageTracker, 'archive_before', crash)
+        with pytest.raises(OSError):
+            main.archive_closed_years(path, None, tmp_path, self.TODAY)
+
+        monkeypatch.setattr(CoverageTracker, 'archive_before', original)
+        main.archive_closed_years(path, None, tmp_path, self.TODAY)
+
+        archive = main.CoverageArchive(path).load()
+        assert [segment['file'] for segment in archive.segments] == ['2024-2025.zip']
+        assert len(list(archive.iter_events())) == 2
+        assert CoverageTracker(path).load().counts == {'Teacher A': 0, 'Teacher B': 2, 'Teacher C': 1}
+
+    def test_late_entries_add_a_part(self, tmp_path, monkeypatch):
+        """Test a closed-year date run after archiving is archived as a second part"""
+        path = write_years(tmp_path, 'journal')
+        main.archive_closed_years(path, None, tmp_path, self.TODAY)
+        monkeypatch.setattr(main, 'APP_DATA_DIR', tmp_path)
+        determineCoverage_and_save(make_teachers(), '2025-05-01', path, False)
+
+        assert main.archive_closed_years(path, None, tmp_path, self.TODAY) == ['2024-2025']
+
+        archive = main.CoverageArchive(path).load()
+        assert [segment['file'] for segment in archive.segments] == ['2024-2025.zip', '2024-2025-2.zip']
+        assert archive.report('2025-05-01').startswith("Date: 2025-05-01")
+        assert len(archive.covered_for('Teacher A', '2025-05-01', '2025-05-01')) == 2
+
+
+class TestBackgroundWriter:
+    """Test writing coverage files on the background writer"""
+
+    def test_saves_plan(self, tmp_path):
+        """Test a submitted plan's files are written once the writer has caught up"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        results = []
+        writer = main.BackgroundWriter(tmp_path / 'pending', on_result=lambda job, error: results.append((job, error)))
+
+        plan = main.determineCoverage(make_teachers(), '2026-02-20', path, False)
+        job_path = writer.submit(plan, ('text', 'json'), output_dir=tmp_path)
+        writer.close()
+
+        assert (tmp_path / 'coverage_2026-02-20.txt').read_text() == main.render_coverage_text(plan)
+        assert main.parse_coverage_json((tmp_path / 'coverage_2026-02-20.json').read_text()) == plan
+        assert not job_path.exists()
+        assert results == [(job_path, None)]
+
+    def test_failed_write_kept_and_replayed(self, tmp_path, capsys):
+        """Test a failed write warns, keeps its job, and is written by the next writer"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        missing_dir = tmp_path / 'reports'
+        writer = main.BackgroundWriter(tmp_path / 'pending')
+        plan = main.determineCoverage(make_teachers(), '2026-02-20', path, False)
+        job_path = writer.submit(plan, output_dir=missing_dir)
+        writer.close()
+
+        assert 'Could not save coverage for 2026-02-20' in writer.completed[job_path]
+        assert 'Warning: Could not save coverage for 2026-02-20' in capsys.readouterr().out
+        assert job_path.exists()
+
+        missing_dir.mkdir()
+        replay = main.BackgroundWriter(tmp_path / 'pending')
+        replay.close()
+
+        assert not job_path.exists()
+        assert (missing_dir / 'coverage_2026-02-20.txt').read_text() == main.render_coverage_text(plan)
+        assert sum(CoverageTracker(path).load().counts.values()) == 2
+
+    def test_newer_run_supersedes_kept_job(self, tmp_path):
+        """Test a kept job is dropped by a later run for its date, and only a date's newest job is replayed"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        missing_dir = tmp_path / 'reports'
+        writer = main.BackgroundWriter(tmp_path / 'pending')
+        old_plan = main.determineCoverage(make_teachers(), '2026-02-20', path, False)
+        kept = writer.submit(old_plan, output_dir=missing_dir)
+        writer.wait()
+        assert kept.exists()
+
+        missing_dir.mkdir()
+        teachers = make_teachers()
+        teachers['Teacher B'].periods_available = ['1', '5', '6']
+        new_plan = main.determineCoverage(teachers, '2026-02-20', path, False)
+        new_job = writer.submit(new_plan, output_dir=missing_dir)
+        writer.close()
+        assert not kept.exists()
+        # The earlier job's failure is its own; the new run's job reports separately
+        assert writer.completed[kept] and writer.completed[new_job] is None
+
+        # A job left behind next to a newer one for its date (e.g. by a crash) is never replayed
+        (missing_dir / 'coverage_2026-02-20.txt').unlink()
+        stale = tmp_path / 'pending' / f"{0:020d}-0000-2026-02-20.json"
+        stale.write_text(json.dumps({'plan': json.loads(main.render_coverage_json(old_plan)),
+                                     'formats': ['text'], 'output_dir': str(missing_dir)}))
+        newest = tmp_path / 'pending' / f"{1:020d}-0000-2026-02-20.json"
+        newest.write_text(json.dumps({'plan': json.loads(main.render_coverage_json(new_plan)),
+                                      'formats': ['text'], 'output_dir': str(missing_dir)}))
+        main.BackgroundWriter(tmp_path / 'pending').close()
+
+        assert not stale.exists() and not newest.exists()
+        assert (missing_dir / 'coverage_2026-02-20.txt').read_text() == main.render_coverage_text(new_plan)
+
+    def test_undo_drops_pending_job(self, tmp_path):
+        """Test undoing a date drops its pending job, so a later start doesn't bring the run back"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        missing_dir = tmp_path / 'reports'
+        writer = main.BackgroundWriter(tmp_path / 'pending')
+        plan = main.determineCoverage(make_teachers(), '2026-02-20', path, False)
+        job_path = writer.submit(plan, output_dir=missing_dir)
+        writer.wait()
+
+        assert main.undo_coverage_run('2026-02-20', path, writer=writer) == 2
+        writer.close()
+        missing_dir.mkdir()
+        main.BackgroundWriter(tmp_path / 'pending').close()
+
+        assert not job_path.exists()
+        assert not (missing_dir / 'coverage_2026-02-20.txt').exists()
+        assert not CoverageTracker(path).load().has_run('2026-02-20')
+
+
+class TestPreview:
+    """Test the dry-run preview and its debounced worker"""
+
+    @pytest.mark.parametrize("backend", ["journal", "sqlite"])
+    def test_preview_matches_submit(self, tmp_path, backend):
+        """Test the preview plans what submit would, without recording or touching the schedule's teachers"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        determineCoverage_and_save(make_teachers(), '2026-04-01', path, False, tracker_backend=backend)
+        teachers = make_teachers()
+        teachers['Teacher A'].is_out = False
+        schedule = main.ScheduleModel('schedule.xlsx', teachers, {}, {})
+        before = main.open_coverage_tracker(path, backend).counts
+
+        preview = main.preview_coverage(schedule, '2026-04-01', {'Teacher A'}, {}, False, path,
+                                        tracker_backend=backend, fairness_metric='rolling')
+
+        assert main.open_coverage_tracker(path, backend).counts == before
+        assert not teachers['Teacher A'].is_out
+        assert teachers['Teacher B'].periods_available == ['1', '2']
+        submitted = main.determineCoverage(make_teachers(), '2026-04-01', path, False, tracker_backend=backend,
+                                           fairness_metric='rolling')
+        assert preview == submitted
+
+    def test_preview_applies_time_preference(self, tmp_path):
+        """Test an absent teacher's AM/PM choice is applied to the copies"""
+        teachers = make_teachers()
+        teachers['Teacher A'].is_out = False
+        teachers['Teacher A'].periods_need_covered = ['1', '6']
+        schedule = main.ScheduleModel('schedule.xlsx', teachers, {}, {})
+
+        plan = main.preview_coverage(schedule, '2026-04-01', {'Teacher A'}, {'Teacher A': 'AM'}, False,
+                                     str(tmp_path / 'coverage_tracker.json'))
+
+        assert [assignment.period for assignment in plan] == ['1']
+        assert teachers['Teacher A'].coverage_time_preference is None
+
+    def test_cancelled_preview(self, tmp_path):
+        """Test a preview that turns stale stops with PreviewCancelled"""
+        schedule = main.ScheduleModel('schedule.xlsx', make_teachers(), {}, {})
+        with pytest.raises(main.PreviewCancelled):
+            main.preview_coverage(schedule, '2026-04-01', {'Teacher A'}, {}, False,
+                                  str(tmp_path / 'coverage_tracker.json'), cancelled=lambda: True)
+
+    def test_previewer_debounces_and_drops_stale(self):
+        """Test a burst of requests plans only the last, and a run overtaken mid-way is never reported"""
+        import threading
+        computed, results = [], []
+        release = threading.Event()
+        done = threading.Event()
+
+        def compute(request, cancelled):
+            computed.append(request)
+            if request == 'slow':
+                release.wait(5)
+            return request
+
+        def on_result(request, plan, error):
+            results.append(plan)
+            done.set()
+
+        previewer = main.CoveragePreviewer(compute, on_result, debounce=0.05)
+        for request in ['a', 'b', 'c']:
+            previewer.request(request)
+        assert done.wait(5)
+        assert computed == ['c'] and results == ['c']
+
+        done.clear()
+        previewer.request('slow')
+        while computed[-1] != 'slow':
+            main.time.sleep(0.01)
+        previewer.request('fast')
+        release.set()
+        assert done.wait(5)
+        previewer.close()
+        assert computed == ['c', 'slow', 'fast'] and results == ['c', 'fast']
+
+    def test_previewer_plans_empty_request(self):
+        """Test a None request (nothing selected) still runs, so the old plan is cleared"""
+        import threading
+        computed, results = [], []
+        done = threading.Event()
+
+        def on_result(request, plan, error):
+            results.append((request, plan))
+            done.set()
+
+        previewer = main.CoveragePreviewer(lambda request, cancelled: computed.append(request) or request,
+                                           on_result, debounce=0.01)
+        previewer.request('A')
+        assert done.wait(5)
+        done.clear()
+        previewer.request(None)
+        assert done.wait(5)
+        previewer.close()
+        assert computed == ['A', None] and results == [('A', 'A'), (None, None)]
+
+    def test_preview_waits_for_tracker_lock(self, tmp_path, monkeypatch):
+        """Test the preview opens the tracker only while no run holds its lock"""
+        path = str(tmp_path / 'coverage_tracker.json')
+        schedule = main.ScheduleModel('schedule.xlsx', make_teachers(), {}, {})
+        monkeypatch.setattr(main, 'TRACKER_LOCK_TIMEOUT', 0.2)
+
+        with main.TrackerLock(path):
+            with pytest.raises(TimeoutError):
+                main.preview_coverage(schedule, '2026-04-01', {'Teacher A'}, {}, False, path)
+        assert isinstance(main.preview_coverage(schedule, '2026-04-01', {'Teacher A'}, {}, False, path), main.CoveragePlan)
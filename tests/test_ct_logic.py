@@ -224,3 +224,57 @@ class TestCTErrorHandling:
         finally:
             import os
             os.unlink(temp_file.name)
+
+class TestCTGraph:
+    """Test co-teacher resolution at parse time"""
+    
+    def _parse(self, schedule_df):
+        import tempfile
+        import os
+        from main import parseScheduleModel
+        temp_file = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False)
+        temp_file.close()
+        schedule_df.to_excel(temp_file.name, index=False)
+        try:
+            schedule, error = parseScheduleModel(temp_file.name)
+            assert error is None
+            return schedule
+        finally:
+            os.unlink(temp_file.name)
+    
+    def test_partners_resolved_when_parsed(self):
+        """Test CT partners are stored per (teacher, period)"""
+        schedule = self._parse(create_test_schedule_with_real_teachers())
+        
+        assert schedule.ct_partners[('Barr, Ryann', '2')] == 'Costello, Elizabeth'
+        assert schedule.ct_partners[('Barr, Ryann', '10')] == 'Costello, Elizabeth'
+        assert schedule.coteacher_for('Costello, Elizabeth', '1') == 'Barr, Ryann'
+        assert schedule.coteacher_for('Smith, John', '7') is None
+    
+    def test_check_coteachers_uses_graph(self, monkeypatch):
+        """Test CT validation is a lookup, not a rescan of the period columns"""
+        import main
+        schedule = self._parse(create_test_schedule_with_real_teachers())
+        monkeypatch.setattr(main, '_is_ct_entry', lambda *args: pytest.fail("rescanned CT entries"))
+        
+        teachers = schedule.teachers
+        teachers['Barr, Ryann'].is_out = True
+        check_coteachers(teachers, schedule)
+        
+        assert teachers['Barr, Ryann'].periods_need_covered_CT == []
+    
+    def test_unresolved_entries_are_diagnostics(self):
+        """Test CT entries naming nobody are reported once at parse time"""
+        import pandas as pd
+        from main import add_ordinal_suffix
+        
+        columns = ['Name', 'Need Coverage'] + [add_ordinal_suffix(i) for i in range(1, 12)]
+        data = [
+            ['Barr, Ryann', '1 CT-2'] + ['Class', 'Class CT Nobody'] + ['Class'] * 9,
+            ['Costello, Elizabeth', '1,3'] + ['Class'] * 11,
+        ]
+        schedule = self._parse(pd.DataFrame(data, columns=columns))
+        
+        assert ('Barr, Ryann', '2') not in schedule.ct_partners
+        assert any("Class CT Nobody" in message for message in schedule.diagnostics)
+        assert any("Barr, Ryann" in message and "2" in message for message in schedule.diagnostics)
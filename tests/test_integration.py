@@ -5,7 +5,7 @@ Integration tests for end-to-end workflows
 import pytest
 import tempfile
 import os
-from main import parseSchedule, check_coteachers, determineCoverage_and_save
+from main import parseSchedule, parseScheduleModel, check_coteachers, determineCoverage_and_save
 
 class TestEndToEndWorkflow:
     """Test complete workflow from file parsing to coverage calculation"""
@@ -52,6 +52,24 @@ class TestEndToEndWorkflow:
         assert 'Date: 2026-02-20' in result
         assert 'Brown, Bob' in result
     
+    def test_complete_workflow_with_model(self, temp_schedule_file, temp_coverage_tracker, monkeypatch):
+        """Test that the whole run reads the schedule file exactly once"""
+        import main
+        loads = []
+        real_iter = main._iter_schedule_chunks
+        monkeypatch.setattr(main, '_iter_schedule_chunks', lambda path, *args: loads.append(path) or real_iter(path, *args))
+        
+        schedule, error = parseScheduleModel(temp_schedule_file)
+        assert error is None
+        assert schedule.name_index['smith, john'] == ['Smith, John']
+        
+        schedule.teachers['Brown, Bob'].is_out = True
+        check_coteachers(schedule.teachers, schedule)
+        result = determineCoverage_and_save(schedule, '2026-02-20', temp_coverage_tracker, False)
+        
+        assert 'Brown, Bob' in result
+        assert loads == [temp_schedule_file]
+    
     def test_workflow_with_ct_scenarios(self, temp_coverage_tracker):
         """Test workflow with various CT scenarios - simplified"""
         # Skip complex CT scenario testing - covered by unit tests
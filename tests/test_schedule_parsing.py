@@ -195,3 +195,261 @@ class TestEdgeCases:
             
         finally:
             os.unlink(temp_file.name)
+
+class TestScheduleCache:
+    """Test the persistent parsed-schedule cache"""
+    
+    def test_unchanged_file_skips_parsing(self, temp_schedule_file, monkeypatch):
+        """Test that a second parse of the same file is served from the cache"""
+        import main
+        first, error = parseSchedule(temp_schedule_file)
+        assert error is None
+        
+        def fail_load(filepath, *args):
+            raise AssertionError("schedule file should not be re-read")
+        monkeypatch.setattr(main, '_iter_schedule_chunks', fail_load)
+        
+        second, error = parseSchedule(temp_schedule_file)
+        assert error is None
+        assert list(second) == list(first)
+        assert second['Brown, Bob'].periods_need_covered_CT == first['Brown, Bob'].periods_need_covered_CT
+        assert second['Smith, John'] is not first['Smith, John']  # Fresh objects per load
+    
+    def test_touched_file_is_still_a_hit(self, temp_schedule_file, monkeypatch):
+        """Test that a new mtime with identical contents reuses the cache"""
+        import main
+        parseSchedule(temp_schedule_file)
+        stat = os.stat(temp_schedule_file)
+        os.utime(temp_schedule_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        monkeypatch.setattr(main, '_iter_schedule_chunks', lambda filepath, *args: pytest.fail("cache miss"))
+        
+        teachers, error = parseSchedule(temp_schedule_file)
+        assert error is None
+        assert len(teachers) == 4
+    
+    def test_modified_file_is_reparsed(self, sample_schedule_df, temp_schedule_file):
+        """Test that changing the schedule invalidates the cache"""
+        parseSchedule(temp_schedule_file)
+        
+        df = sample_schedule_df.copy()
+        df.loc[0, 'Need Coverage'] = '7'
+        df.to_excel(temp_schedule_file, index=False)
+        
+        teachers, error = parseSchedule(temp_schedule_file)
+        assert error is None
+        assert teachers['Smith, John'].periods_need_covered == ['7']
+
+class TestColumnarParsing:
+    """Test that the columnar parser matches the per-row helpers"""
+    
+    @staticmethod
+    def _parse_rows_one_by_one(df):
+        from main import _detect_ct_periods_from_row
+        rows = []
+        for _, row in df.iterrows():
+            name = _parse_name(row.get('Name'))
+            if not name:
+                continue
+            regular, ct = _parse_coverage(str(row.get('Need Coverage', '')).strip())
+            if not ct and regular:
+                regular, ct = _detect_ct_periods_from_row(row, regular)
+            rows.append((name, regular, ct))
+        return rows
+    
+    def test_matches_row_parser_on_fixtures(self, sample_schedule_df):
+        """Test fixture schedules parse identically column-wise and row-wise"""
+        from main import _parse_teacher_rows
+        from tests.fixtures import create_test_schedule_with_real_teachers
+        
+        for df in (sample_schedule_df, create_test_schedule_with_real_teachers()):
+            assert _parse_teacher_rows(df) == self._parse_rows_one_by_one(df)
+    
+    def test_matches_row_parser_on_messy_cells(self):
+        """Test skipped names, sanitizing, duplicates and CT auto-detection"""
+        from main import _parse_teacher_rows
+        df = pd.DataFrame({
+            'Name': ['Smith, John (Sub)', 'Duty 1st', None, 'A', '  Doe, Jane  ', 'Plan B', 'Lee, Ann'],
+            'Need Coverage': ['1, 1, 3 / 4', '2', '3', '4', '2,5,', None, '5 CT -2, 3'],
+            '1st': ['Class', '', '', '', 'Class', '', ''],
+            '2nd': ['Class', '', '', '', '*CT   Smith', '', 'Class CT Doe'],
+            '5th': ['Class', '', '', '', '(CT) Smith', '', ''],
+        })
+        
+        rows = _parse_teacher_rows(df)
+        assert rows == self._parse_rows_one_by_one(df)
+        assert rows == [
+            ('Smith, John', ['1', '3/4'], []),
+            ('Doe, Jane', [], ['2', '5']),
+            ('Lee, Ann', ['5'], ['2', '3']),
+        ]
+
+class TestStreamingLoader:
+    """Test the chunked read-only loader against the whole-sheet pandas path"""
+    
+    @staticmethod
+    def _snapshot(schedule):
+        return {
+            name: (t.periods_need_covered, t.periods_need_covered_CT, t.periods_available,
+                   t.iss_periods_available, t.otherDutyPeriods_available,
+                   t.evenDayPeriods_available, t.oddDayPeriods_available)
+            for name, t in schedule.teachers.items()
+        }
+    
+    @pytest.mark.parametrize("suffix", ['.xlsx', '.csv'])
+    def test_streaming_matches_pandas(self, sample_schedule_df, suffix, monkeypatch):
+        """Test both loaders build the same model, even with tiny chunks"""
+        import main
+        from main import parseScheduleModel
+        monkeypatch.setattr(main, 'SCHEDULE_CHUNK_ROWS', 2)
+        
+        df = pd.concat([sample_schedule_df, sample_schedule_df.assign(**{'Need Coverage': '7,8'})], ignore_index=True)
+        df['Duty 3rd'] = ['Smith, John', None, 'ISS Doe, Jane', None, None, 'Wilson, Alice - hall', None, None]
+        temp_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+        temp_file.close()
+        if suffix == '.csv':
+            df.to_csv(temp_file.name, index=False)
+        else:
+            df.to_excel(temp_file.name, index=False)
+        
+        try:
+            streamed, error = parseScheduleModel(temp_file.name, use_cache=False)
+            assert error is None
+            whole, error = parseScheduleModel(temp_file.name, streaming=False, use_cache=False)
+            assert error is None
+            
+            assert self._snapshot(streamed) == self._snapshot(whole)
+            assert streamed.period_grid == whole.period_grid
+            assert streamed.duty_grid == whole.duty_grid
+            assert streamed.teachers['Smith, John'].periods_need_covered == ['1', '3', '5', '7', '8']
+        finally:
+            os.unlink(temp_file.name)
+    
+    def test_numeric_need_coverage_matches(self):
+        """Test a number typed in Need Coverage gives the same period through both loaders"""
+        from main import parseScheduleModel
+
+        df = pd.DataFrame({
+            'Name': ['Smith, John', 'Doe, Jane'],
+            'Need Coverage': [5, None],
+            '5th': ['Class', 'Plan'],
+        })
+        temp_file = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False)
+        temp_file.close()
+        df.to_excel(temp_file.name, index=False)
+
+        try:
+            streamed, error = parseScheduleModel(temp_file.name, use_cache=False)
+            assert error is None
+            whole, error = parseScheduleModel(temp_file.name, streaming=False, use_cache=False)
+            assert error is None
+
+            assert self._snapshot(streamed) == self._snapshot(whole)
+            assert whole.teachers['Smith, John'].periods_need_covered == ['5']
+        finally:
+            os.unlink(temp_file.name)
+    
+    def test_excel_header_names(self):
+        """Test blank and repeated headers are named like pandas names them"""
+        from main import _excel_header_names
+        assert _excel_header_names(['Name', None, 'Name', '1st']) == ['Name', 'Unnamed: 1', 'Name.1', '1st']
+
+class TestParseProgress:
+    """Test the progress counters the loading screen polls"""
+
+    def test_counts_rows_teachers_and_duties(self, sample_schedule_df, monkeypatch):
+        """Test a parse reports every row, teacher and duty cell it got through"""
+        import main
+        from main import parseScheduleModel, ScheduleParseProgress
+        monkeypatch.setattr(main, 'SCHEDULE_CHUNK_ROWS', 3)
+        df = sample_schedule_df.assign(**{'Duty 3rd': ['Smith, John', None, 'ISS Doe, Jane', None]})
+        temp_file = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+        temp_file.close()
+        df.to_csv(temp_file.name, index=False)
+
+        try:
+            progress = ScheduleParseProgress()
+            schedule, error = parseScheduleModel(temp_file.name, progress=progress)
+            assert error is None
+            assert (progress.stage, progress.rows_read, progress.teachers_found) == ('done', 4, 4)
+            assert progress.duties_resolved == progress.duty_cells == 2
+            assert progress.describe() == "Loaded 4 teachers"
+
+            cached = ScheduleParseProgress()
+            parseScheduleModel(temp_file.name, progress=cached)
+            assert (cached.stage, cached.teachers_found) == ('done', 4)
+        finally:
+            os.unlink(temp_file.name)
+
+    def test_error_leaves_progress_unfinished(self):
+        """Test a missing file returns the error without marking the parse done"""
+        from main import parseScheduleModel, ScheduleParseProgress
+        progress = ScheduleParseProgress()
+        schedule, error = parseScheduleModel('/nonexistent/schedule.xlsx', progress=progress)
+        assert schedule is None and 'File not found' in error
+        assert progress.stage == 'reading'
+
+    def test_app_reports_failure_after_reading(self, sample_schedule_df, monkeypatch, tmp_path):
+        """Test an error past the row reader still reaches the app as a critical error"""
+        import time
+        import main
+        monkeypatch.setattr(main, 'SCHEDULE_CACHE_FILENAME', str(tmp_path / 'cache.pickle'))
+        monkeypatch.setattr(main, '_build_ct_graph', lambda schedule: 1 / 0)
+        path = str(tmp_path / 'schedule.csv')
+        sample_schedule_df.to_csv(path, index=False)
+
+        app = main.TeacherCoverageApp(path)
+        app.start_parsing()
+        deadline = time.monotonic() + 10
+        while app._parse_result is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert not app.load_schedule()
+        assert 'ZeroDivisionError' in app.critical_error_message
+
+
+class TestDutyNameIndex:
+    """Test duty-cell name resolution through the name index"""
+    
+    @staticmethod
+    def _parse_duties_by_scanning(teachers, duty_grid):
+        """Reference implementation: one str.find per teacher per cell"""
+        from main import _classify_duty
+        found = []
+        for period, cells in duty_grid.items():
+            for duty_raw in cells:
+                for name in teachers:
+                    match_pos = duty_raw.find(name.lower())
+                    if match_pos == -1:
+                        continue
+                    end_pos = match_pos + len(name)
+                    if end_pos < len(duty_raw) and duty_raw[end_pos].isalpha():
+                        continue
+                    found.append((name, _classify_duty(duty_raw), str(period)))
+        return sorted(found)
+    
+    def test_matches_scanning_semantics(self):
+        """Test overlapping names, word boundaries and first-occurrence-only matching"""
+        from main import ScheduleModel, Teacher, _parse_duties
+        names = ['Lee, Ann', 'Lee, Anna', 'Ann', 'Smith, Jo', 'Jo']
+        duty_grid = {
+            1: ['lee, anna - hall', 'iss lee, ann'],
+            2: ['smith, john even days', 'jo and smith, jo'],
+            3: ['annex ann', 'odd days: ann, lee, ann'],
+        }
+        teachers = {name: Teacher(name, []) for name in names}
+        _parse_duties(ScheduleModel('test.xlsx', teachers, {}, duty_grid))
+        
+        found = sorted(
+            (name, duty_type, period)
+            for name, teacher in teachers.items()
+            for duty_type, periods in [('standard', teacher.periods_available),
+                                       ('iss', teacher.iss_periods_available),
+                                       ('other', teacher.otherDutyPeriods_available),
+                                       ('even', teacher.evenDayPeriods_available),
+                                       ('odd', teacher.oddDayPeriods_available)]
+            for period in periods
+        )
+        assert found == self._parse_duties_by_scanning(teachers, duty_grid)
+        # "annex ann": the first "ann" runs into a word, so the later one is not considered
+        assert '3' not in teachers['Ann'].periods_available
+        assert teachers['Lee, Ann'].iss_periods_available == ['1']
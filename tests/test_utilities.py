@@ -3,7 +3,7 @@ Unit tests for utility functions
 """
 
 import pytest
-from main import add_ordinal_suffix, unique_and_ordered, sort_periods
+from main import add_ordinal_suffix, unique_and_ordered, sort_periods, TeacherSearchIndex, _teacher_list_window
 
 class TestOrdinalSuffix:
     """Test ordinal suffix generation"""
@@ -121,3 +121,51 @@ class TestSortPeriods:
         """Test sorting with tuple periods (for CT tracking)"""
         result = sort_periods([(3, True), (1, False), (2, True), "5/6"])
         assert result == [(1, False), (2, True), (3, True), "5/6"]
+
+
+class TestTeacherSearchIndex:
+    """Test the teacher list's name search"""
+
+    names = ['Smith, John', 'Johnson, Amy', 'Doe, Jane', 'Adams, Smitty']
+
+    def test_blank_query_returns_everyone(self):
+        """Test a blank query shows the whole roster"""
+        assert TeacherSearchIndex(self.names).search('  ') == self.names
+
+    def test_short_query_matches_word_prefixes(self):
+        """Test one or two characters match the start of any word in the name"""
+        index = TeacherSearchIndex(self.names)
+        assert index.search('sm') == ['Smith, John', 'Adams, Smitty']
+        assert index.search('J') == ['Smith, John', 'Johnson, Amy', 'Doe, Jane']
+        assert index.search('hn') == []
+
+    def test_long_query_matches_substrings(self):
+        """Test longer queries match anywhere in the name, in roster order"""
+        index = TeacherSearchIndex(self.names)
+        assert index.search('ohn') == ['Smith, John', 'Johnson, Amy']
+        assert index.search('h, j') == ['Smith, John']
+        assert index.search('mitz') == []
+
+    def test_matches_linear_scan(self):
+        """Test results equal a plain substring scan on a large roster"""
+        names = [f'Teacher{i:05d}, Dept {i % 7}' for i in range(5000)]
+        index = TeacherSearchIndex(names)
+        for query in ['00012', 'r0499', 'dept 3', '9, d']:
+            assert index.search(query) == [name for name in names if query in name.lower()]
+
+
+class TestTeacherListWindow:
+    """Test which rows the virtualized teacher list shows"""
+
+    def test_top(self):
+        """Test an unscrolled list starts at row 0 with no spacer above"""
+        assert _teacher_list_window(0, 1000, pool_rows=10, row_height=40) == (0, 0, 990 * 40)
+
+    def test_scrolled(self):
+        """Test the pool starts at the row under the scroll offset"""
+        assert _teacher_list_window(4010, 1000, pool_rows=10, row_height=40) == (100, 4000, 890 * 40)
+
+    def test_end_and_small_lists(self):
+        """Test the pool stops at the last row and short lists need no spacers"""
+        assert _teacher_list_window(10 ** 6, 1000, pool_rows=10, row_height=40) == (990, 990 * 40, 0)
+        assert _teacher_list_window(500, 3, pool_rows=10, row_height=40) == (0, 0, 0)